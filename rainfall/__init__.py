@@ -0,0 +1 @@
+"""Reusable processing pipeline behind the GHMC rainfall dashboard and notebook."""
@@ -0,0 +1,240 @@
+"""Benchmarks of the analysis stages on synthetic GHMC-shaped data.
+
+Datasets come from ``rainfall.synthetic`` at a scale given in years of
+record for the full 157-station network (``1x`` is one year, about 1.3
+million hourly rows).  Each benchmark replays the dashboard's ingest and
+analysis on the whole dataset, one ``StageTimer`` stage per step:
+
+* ``read_csv``       ``pd.read_csv`` and header cleaning
+* ``stations``       the station dimension
+* ``timestamps``     ``Date_&_Time`` alone, and ``timestamps_pandas`` with ``pd.to_datetime``
+* ``parse``          typed columns and timestamp parsing (``ingest.normalize``)
+* ``quality``        dense-grid screening and the long hourly view
+* ``daily``          daily table on the grid, and ``daily_frame`` from the long frame
+* ``events``         default events on the grid, and ``events_frame`` from the long frame
+* ``spells``         wet/dry spells and their per-station summary
+* ``storms``         default events linked into storms across neighbouring stations
+* ``figures``        the dashboard's daily, box and event figures, serialized to JSON
+
+Timings are the best of ``repeat`` untraced runs; peak memory per stage comes
+from one further run under ``tracemalloc``.  ``--mode pipeline`` times the
+batch pipeline (``rainfall.pipeline.run``) instead, streaming when a chunk
+size is given, which is the way to run scales that do not fit in memory.
+
+Results are written as JSON and can be compared with a baseline; the command
+exits with status 1 when a stage is slower than the baseline by more than
+the tolerance::
+
+    python -m rainfall.benchmark --scales 1x 10x -o bench_results
+    python -m rainfall.benchmark --scales 1x -o bench_new --baseline bench_results
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from . import quality, synthetic
+from .boxstats import box_summary
+from .daily import build_daily
+from .downsample import downsample
+from .events import build_events
+from .ingest import clean_columns, normalize
+from .pipeline import run as run_pipeline
+from .profiling import StageTimer
+from .spells import build_spells, spell_summary
+from .stations import build_stations
+from .storms import build_storms
+from .timestamps import AWS_FORMAT, parse_aws
+
+# Scale name -> years of record for the full station network.
+SCALES = {'1x': 1, '10x': 10, '100x': 100}
+DATA_FOLDER = 'bench_data'
+OUTPUT_FOLDER = 'bench_results'
+# A stage counts as a regression when it is this much slower than the baseline ...
+TOLERANCE = 0.25
+# ... and slower by at least this many seconds, so timer noise on tiny stages is ignored.
+MIN_SLOWDOWN_S = 0.05
+
+
+def dataset(scale, folder=DATA_FOLDER, seed=0):
+    """Paths of the synthetic CSVs of one scale, generated on first use."""
+    return synthetic.write_dataset(os.path.join(folder, f'{scale}_seed{seed}'), SCALES[scale], seed=seed)
+
+
+def figures(hourly, daily, events):
+    """Build and serialize the dashboard's main charts of the whole dataset."""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    series = downsample(daily, 'Date', 'Daily_Rainfall', by='AWS_ID')
+    line = px.line(series, x='Date', y='Daily_Rainfall', color='AWS_ID')
+    stats, outliers = box_summary(daily, 'Daily_Rainfall', ['Month'])
+    box = go.Figure(go.Box(x=stats['Month'], q1=stats['Q1'], median=stats['Median'], q3=stats['Q3'],
+                           lowerfence=stats['Lower_Whisker'], upperfence=stats['Upper_Whisker'],
+                           mean=stats['Mean']))
+    box.add_trace(go.Scatter(x=outliers['Month'], y=outliers['Daily_Rainfall'], mode='markers'))
+    scatter = px.scatter(downsample(events, 'Start', 'Total_Rain'), x='Start', y='Total_Rain',
+                         size='Duration_hrs', color='Average_Intensity')
+    hourly_line = px.line(downsample(hourly, 'DateTime', 'Hourly_Rain', by='AWS_ID'),
+                          x='DateTime', y='Hourly_Rain', color='AWS_ID')
+    return [fig.to_json() for fig in (line, box, scatter, hourly_line)]
+
+
+def dashboard_stages(paths, timer):
+    """Replay the dashboard's ingest and analysis of ``paths`` under ``timer``; returns the hourly row count."""
+    with timer.stage('read_csv'):
+        raw = clean_columns(pd.concat([pd.read_csv(p) for p in paths], ignore_index=True))
+    with timer.stage('stations', len(raw)):
+        stations = build_stations(raw)
+    with timer.stage('timestamps', len(raw)):
+        parse_aws(raw['Date_&_Time'])
+    with timer.stage('timestamps_pandas', len(raw)):
+        pd.to_datetime(raw['Date_&_Time'], format=AWS_FORMAT, errors='coerce')
+    with timer.stage('parse', len(raw)):
+        typed, _ = normalize(raw, screen=False)
+    del raw
+    with timer.stage('quality', len(typed)):
+        hourly, grid, _ = quality.assess(typed)
+    del typed
+    with timer.stage('daily', grid.rain.size):
+        daily = grid.daily()
+    with timer.stage('daily_frame', len(hourly)):
+        build_daily(hourly)
+    with timer.stage('events', grid.rain.size):
+        events = grid.events()
+    with timer.stage('events_frame', len(hourly)):
+        build_events(hourly)
+    with timer.stage('spells', len(daily)):
+        spell_summary(build_spells(daily))
+    with timer.stage('storms', len(events)):
+        build_storms(events, stations)
+    with timer.stage('figures', len(hourly) + len(daily) + len(events)):
+        figures(hourly, daily, events)
+    return len(hourly)
+
+
+def pipeline_stages(paths, timer, chunksize=None):
+    with tempfile.TemporaryDirectory() as output:
+        _, n_rows, _, _ = run_pipeline(paths, output, workers=1, timer=timer, chunksize=chunksize)
+    return n_rows
+
+
+def measure(paths, mode='dashboard', repeat=1, chunksize=None):
+    """Stage records (see ``StageTimer.records``) with best-of-``repeat`` times and traced peak memory."""
+    def once(timer):
+        if mode == 'pipeline':
+            return pipeline_stages(paths, timer, chunksize)
+        return dashboard_stages(paths, timer)
+
+    best = {}
+    for _ in range(repeat):
+        timer = StageTimer()
+        n_rows = once(timer)
+        for name, seconds in timer.stages.items():
+            best[name] = min(best.get(name, np.inf), seconds)
+    traced = StageTimer(trace_memory=True)
+    once(traced)
+    records = traced.records()
+    for record in records:
+        record['seconds'] = best.get(record['stage'], record['seconds'])
+    return records, n_rows
+
+
+def benchmark(scale, folder=DATA_FOLDER, seed=0, mode='dashboard', repeat=1, chunksize=None):
+    """Generate (or reuse) the dataset of ``scale`` and benchmark it; returns the JSON-ready result."""
+    paths = dataset(scale, folder, seed)
+    records, n_rows = measure(paths, mode, repeat, chunksize)
+    return {
+        'scale': scale,
+        'years': SCALES[scale],
+        'seed': seed,
+        'mode': mode,
+        'chunksize': chunksize,
+        'repeat': repeat,
+        'stations': synthetic.STATIONS,
+        'hourly_rows': int(n_rows),
+        'input_mb': sum(os.path.getsize(p) for p in paths) / 2**20,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': {'python': platform.python_version(), 'numpy': np.__version__,
+                        'pandas': pd.__version__, 'machine': platform.machine(), 'cpus': os.cpu_count()},
+        'stages': records,
+        'total_seconds': sum(r['seconds'] for r in records),
+    }
+
+
+def result_path(folder, scale, mode='dashboard'):
+    return os.path.join(folder, f'benchmark_{mode}_{scale}.json')
+
+
+def compare(result, baseline, tolerance=TOLERANCE, min_slowdown=MIN_SLOWDOWN_S):
+    """Stages of ``result`` slower than in ``baseline`` beyond the tolerance, as (stage, before, after) triples."""
+    before = {r['stage']: r['seconds'] for r in baseline['stages']}
+    return [(r['stage'], before[r['stage']], r['seconds']) for r in result['stages']
+            if r['stage'] in before
+            and r['seconds'] > before[r['stage']] * (1 + tolerance)
+            and r['seconds'] - before[r['stage']] >= min_slowdown]
+
+
+def format_result(result):
+    width = max(len(r['stage']) for r in result['stages'])
+    lines = [f"{result['scale']} ({result['years']} yr, {result['hourly_rows']:,} hourly rows, "
+             f"{result['input_mb']:.0f} MB CSV), {result['mode']}:"]
+    for r in result['stages']:
+        peak = f"{r['peak_mb']:9.1f} MB" if r['peak_mb'] is not None else ' ' * 12
+        rows = f"{r['rows']:>13,} rows" if r['rows'] else ''
+        lines.append(f"  {r['stage']:<{width}}  {r['seconds']:8.3f} s {peak} {rows}")
+    lines.append(f"  {'total':<{width}}  {result['total_seconds']:8.3f} s")
+    return "\n".join(lines)
+
+
+# =========================
+# COMMAND LINE
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the rainfall analysis on synthetic GHMC data.")
+    parser.add_argument('--scales', nargs='+', default=['1x'], choices=list(SCALES),
+                        help="dataset sizes in years of record (default: %(default)s)")
+    parser.add_argument('--data', default=DATA_FOLDER, help="folder for the generated CSVs (default: %(default)s)")
+    parser.add_argument('-o', '--output', default=OUTPUT_FOLDER,
+                        help="folder for the JSON results (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="generator seed (default: 0)")
+    parser.add_argument('--mode', choices=['dashboard', 'pipeline'], default='dashboard',
+                        help="stages to time (default: %(default)s)")
+    parser.add_argument('--chunksize', type=int, default=None, help="stream the pipeline mode in chunks")
+    parser.add_argument('--repeat', type=int, default=1, help="untraced runs to take the best time of (default: 1)")
+    parser.add_argument('--baseline', default=None, help="folder of earlier results to compare against")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="allowed slowdown as a fraction (default: %(default)s)")
+    parser.add_argument('--generate-only', action='store_true', help="only write the datasets")
+    args = parser.parse_args(argv)
+
+    regressions = []
+    for scale in args.scales:
+        if args.generate_only:
+            paths = dataset(scale, args.data, args.seed)
+            print(f"{scale}: {len(paths)} files in {os.path.dirname(paths[0])}")
+            continue
+        result = benchmark(scale, args.data, args.seed, args.mode, args.repeat, args.chunksize)
+        os.makedirs(args.output, exist_ok=True)
+        with open(result_path(args.output, scale, args.mode), 'w') as f:
+            json.dump(result, f, indent=2)
+        print(format_result(result))
+
+        baseline_path = args.baseline and result_path(args.baseline, scale, args.mode)
+        if baseline_path and os.path.exists(baseline_path):
+            with open(baseline_path) as f:
+                slower = compare(result, json.load(f), args.tolerance)
+            for stage, before, after in slower:
+                print(f"  REGRESSION {stage}: {before:.3f} s -> {after:.3f} s")
+            regressions += slower
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
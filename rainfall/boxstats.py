@@ -0,0 +1,92 @@
+"""Compact per-group distribution summaries for whole-network box and bar plots.
+
+A box plot of every station-day row ships each row to the browser.  Here the
+rows are sorted once with a lexsort on ``(value, group)`` and each group is
+reduced to its count, sum, mean, quartiles, whiskers and a bounded set of the
+most extreme outliers, so a figure carries one box per group whatever the
+length of the record.
+"""
+import numpy as np
+import pandas as pd
+
+BOX_COLS = ['Count', 'Sum', 'Mean', 'Min', 'Q1', 'Median', 'Q3', 'Max',
+            'Lower_Whisker', 'Upper_Whisker', 'Outliers']
+
+# Outliers kept at each end of a group's distribution; the rest are only counted.
+MAX_OUTLIERS = 20
+
+# Whiskers reach the furthest value within this many IQRs of the box (Tukey).
+WHISKER_IQR = 1.5
+
+
+def group_codes(frame, by):
+    """Integer group code per row and the frame of group keys (sorted) it indexes."""
+    grouped = frame.groupby(by, observed=True, sort=True)
+    keys = grouped.size().index.to_frame(index=False)
+    return grouped.ngroup().to_numpy(), keys
+
+
+def quantile(values, starts, counts, q):
+    """Linearly interpolated quantile ``q`` of each sorted group ``values[start:start + count]``."""
+    position = q * (counts - 1)
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, counts - 1)
+    frac = position - low
+    return values[starts + low] * (1 - frac) + values[starts + high] * frac
+
+
+def box_summary(frame, value, by, max_outliers=MAX_OUTLIERS):
+    """Distribution of ``value`` per group of the ``by`` columns.
+
+    Returns ``(stats, outliers)``: ``stats`` has one row per group with the
+    ``by`` columns followed by ``BOX_COLS`` (``Outliers`` counts every value
+    beyond the whiskers), and ``outliers`` holds the ``by`` columns and
+    ``value`` for up to ``max_outliers`` of the lowest and of the highest
+    outliers of each group.  Missing values are ignored.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    frame = frame.loc[frame[value].notna(), by + [value]]
+    if frame.empty:
+        return pd.DataFrame(columns=by + BOX_COLS), pd.DataFrame(columns=by + [value])
+
+    codes, keys = group_codes(frame, by)
+    values = frame[value].to_numpy(dtype=np.float64)
+    order = np.lexsort((values, codes))
+    values, codes = values[order], codes[order]
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    counts = np.diff(np.r_[starts, len(values)])
+    q1 = quantile(values, starts, counts, 0.25)
+    q3 = quantile(values, starts, counts, 0.75)
+    iqr = q3 - q1
+    lower = np.repeat(q1 - WHISKER_IQR * iqr, counts)
+    upper = np.repeat(q3 + WHISKER_IQR * iqr, counts)
+    inside = (values >= lower) & (values <= upper)
+    total = np.add.reduceat(values, starts)
+
+    stats = keys.copy()
+    stats['Count'] = counts
+    stats['Sum'] = total
+    stats['Mean'] = total / counts
+    stats['Min'] = values[starts]
+    stats['Q1'] = q1
+    stats['Median'] = quantile(values, starts, counts, 0.5)
+    stats['Q3'] = q3
+    stats['Max'] = values[starts + counts - 1]
+    # Values are sorted within each group, so the whiskers are the first and last inside values.
+    stats['Lower_Whisker'] = np.minimum.reduceat(np.where(inside, values, np.inf), starts)
+    stats['Upper_Whisker'] = np.maximum.reduceat(np.where(inside, values, -np.inf), starts)
+    stats['Outliers'] = counts - np.add.reduceat(inside.astype(np.int64), starts)
+
+    rank = np.arange(len(values)) - np.repeat(starts, counts)
+    from_top = np.repeat(counts, counts) - 1 - rank
+    shown = ~inside & (((values < lower) & (rank < max_outliers)) | ((values > upper) & (from_top < max_outliers)))
+    outliers = keys.iloc[codes[shown]].reset_index(drop=True)
+    outliers[value] = values[shown]
+    return stats, outliers
+
+
+def group_totals(frame, value, by):
+    """Sum and count of ``value`` per group of the ``by`` columns (one bar segment per group)."""
+    by = [by] if isinstance(by, str) else list(by)
+    return frame.groupby(by, observed=True, sort=True)[value].agg(Sum='sum', Count='count').reset_index()
@@ -0,0 +1,101 @@
+"""Columnar station-day aggregation of the hourly rainfall series.
+
+Rows are keyed by a single integer code ``station * n_days + day`` and reduced
+in one grouped pass with ``ufunc.reduceat``; no per-group Python callbacks run.
+"""
+import numpy as np
+import pandas as pd
+
+from .events import hour_index
+
+DAILY_COLS = ['AWS_ID', 'Year', 'Month', 'Date',
+              'Daily_Rainfall', 'Max_Hourly_Rain', 'Min_Hourly_Rain', 'Hours_Rained', 'Daily_Intensity',
+              'Hours_Recorded']
+
+
+def station_day_codes(station, hours):
+    """Per-row integer station/day key.
+
+    Returns ``(key, station_values, first_day, n_days)``; a key decodes as
+    ``station_values[key // n_days]`` and day ``key % n_days + first_day``.
+    """
+    station_codes, station_values = pd.factorize(station, sort=True)
+    day = hours // 24
+    first_day = int(day.min()) if len(day) else 0
+    n_days = int(day.max()) - first_day + 1 if len(day) else 1
+    key = station_codes.astype(np.int64) * n_days + (day - first_day)
+    return key, np.asarray(station_values), first_day, n_days
+
+
+def aggregate(key, rain):
+    """Reduce ``rain`` over runs of equal ``key``.
+
+    Returns the unique keys and per-group sum, max, smallest positive value
+    (``inf`` when the group is dry), wet-hour count and row count.  All five
+    reductions are associative, so partial results from separate chunks can be
+    merged.
+    """
+    if len(key) > 1 and (np.diff(key) < 0).any():
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+        rain = rain[order]
+
+    if len(key) == 0:
+        empty = np.empty(0)
+        return key[:0], empty, empty, empty, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    wet = rain > 0
+    total = np.add.reduceat(rain, starts)
+    peak = np.maximum.reduceat(rain, starts)
+    low = np.minimum.reduceat(np.where(wet, rain, np.inf), starts)
+    wet_hours = np.add.reduceat(wet.astype(np.int64), starts)
+    return key[starts], total, peak, low, wet_hours, np.diff(np.r_[starts, len(key)])
+
+
+def daily_parts(df, station_col='AWS_ID', time_col='DateTime', rain_col='Hourly_Rain'):
+    """Mergeable per station-day partial aggregates (``Day`` is days since the epoch)."""
+    hours = hour_index(df[time_col].to_numpy())
+    key, station_values, first_day, n_days = station_day_codes(df[station_col].to_numpy(), hours)
+    groups, total, peak, low, wet_hours, recorded = aggregate(key, df[rain_col].to_numpy(dtype=np.float64))
+    return pd.DataFrame({
+        station_col: station_values[groups // n_days],
+        'Day': groups % n_days + first_day,
+        'total': total,
+        'peak': peak,
+        'low': low,
+        'wet': wet_hours,
+        'hours': recorded,
+    })
+
+
+def merge_parts(parts, station_col='AWS_ID'):
+    """Combine partial aggregates that may share station-days."""
+    return pd.concat(parts, ignore_index=True).groupby([station_col, 'Day'], observed=True, sort=True).agg(
+        total=('total', 'sum'), peak=('peak', 'max'), low=('low', 'min'), wet=('wet', 'sum'),
+        hours=('hours', 'sum')
+    ).reset_index()
+
+
+def daily_table(parts, station_col='AWS_ID'):
+    """Finish partial aggregates into the daily table."""
+    total = parts['total'].to_numpy()
+    wet_hours = parts['wet'].to_numpy()
+    dates = pd.DatetimeIndex(parts['Day'].to_numpy().astype('datetime64[D]').astype('datetime64[ns]'))
+    return pd.DataFrame({
+        station_col: parts[station_col].to_numpy(),
+        'Year': dates.year,
+        'Month': dates.month,
+        'Date': dates,
+        'Daily_Rainfall': total,
+        'Max_Hourly_Rain': parts['peak'].to_numpy(),
+        'Min_Hourly_Rain': np.where(np.isinf(parts['low']), 0.0, parts['low']),
+        'Hours_Rained': wet_hours,
+        'Daily_Intensity': np.divide(total, wet_hours, out=np.zeros_like(total), where=wet_hours > 0),
+        'Hours_Recorded': parts['hours'].to_numpy(),
+    })
+
+
+def build_daily(df, station_col='AWS_ID', time_col='DateTime', rain_col='Hourly_Rain'):
+    """Daily table (one row per station and calendar day present in ``df``)."""
+    return daily_table(daily_parts(df, station_col, time_col, rain_col), station_col)
@@ -0,0 +1,117 @@
+"""Station x month x hour-of-day cube of the diurnal rainfall pattern.
+
+Three additive measures are kept for every station, calendar month and hour
+of the day: the rainfall sum, the wet-hour count and the valid-hour count.
+The cube is built from the day-aligned ``HourGrid`` in one pass: the
+``(stations, days, 24)`` view is contracted with a days x months one-hot
+matrix, so every day lands in its calendar month with a single matrix
+product per measure.
+
+Any diurnal profile is then a sum over slices of the cube, with no rescan of
+the hourly data: one station or a Circle, the Monsoon months or a single
+month.  Because the measures are additive, the ratios (mean hourly rain,
+rainy-hour intensity, wet share) are formed only after summing.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .summaries import HOURLY_PROFILE_COLS
+
+MONTHS = np.arange(1, 13)
+HOURS = np.arange(24)
+MEASURES = {
+    'Mean_Hourly_Rain': 'Mean hourly rainfall (mm)',
+    'Rainy_Hour_Intensity': 'Rainy-hour intensity (mm/hr)',
+    'Wet_Share': 'Share of hours with rain',
+    'Rainy_Hour_Frequency': 'Rainy hours',
+}
+
+
+@dataclass
+class DiurnalCube:
+    """Rainfall ``total``, ``wet`` and ``hours`` (valid-hour) counts indexed ``[station, month - 1, hour]``."""
+    stations: pd.Index
+    total: np.ndarray
+    wet: np.ndarray
+    hours: np.ndarray
+
+    def _rows(self, stations):
+        if stations is None:
+            return slice(None)
+        rows = self.stations.get_indexer(pd.Index(stations))
+        return rows[rows >= 0]
+
+    @staticmethod
+    def _months(months):
+        return slice(None) if months is None else np.asarray(months, dtype=np.int64) - 1
+
+    def sums(self, stations=None, months=None, keep=()):
+        """``total``, ``wet`` and ``hours`` summed over the chosen stations and months.
+
+        Axes named in ``keep`` ('station', 'month') are kept; hour of day always is.
+        """
+        rows, columns = self._rows(stations), self._months(months)
+        axes = tuple(i for i, name in enumerate(('station', 'month')) if name not in keep)
+        return tuple(a[rows][:, columns].sum(axis=axes) for a in (self.total, self.wet, self.hours))
+
+    @staticmethod
+    def measures(total, wet, hours):
+        """The profile measures of summed cells (zero where nothing was recorded)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return {
+                'Mean_Hourly_Rain': np.where(hours > 0, total / hours, 0.0),
+                'Rainy_Hour_Intensity': np.where(wet > 0, total / wet, 0.0),
+                'Wet_Share': np.where(hours > 0, wet / hours, 0.0),
+                'Rainy_Hour_Frequency': wet,
+            }
+
+    def profile(self, stations=None, months=None):
+        """Diurnal profile of the chosen stations and months: one row per hour of day."""
+        total, wet, hours = self.sums(stations, months)
+        return pd.DataFrame({'Hour': HOURS, **self.measures(total, wet, hours), 'Valid_Hours': hours})
+
+    def matrix(self, measure, by='month', stations=None, months=None):
+        """One ``measure`` as a frame of months (or stations) x hours of day, for a heatmap."""
+        total, wet, hours = self.sums(stations, months, keep=(by,))
+        if by == 'month':
+            index = pd.Index(MONTHS if months is None else np.asarray(months, dtype=np.int64), name='Month')
+        else:
+            index = self.stations[self._rows(stations)]
+        return pd.DataFrame(self.measures(total, wet, hours)[measure], index=index,
+                            columns=pd.Index(HOURS, name='Hour'))
+
+    def station_profiles(self, months=None):
+        """Per-station table of ``summaries.HOURLY_PROFILE_COLS`` (hours a station never recorded left out)."""
+        total, wet, hours = self.sums(months=months, keep=('station',))
+        station, hour = np.nonzero(hours)
+        values = self.measures(total, wet, hours)
+        frame = pd.DataFrame({'AWS_ID': self.stations[station], 'Hour': hour})
+        for column in HOURLY_PROFILE_COLS[2:]:
+            frame[column] = values[column][station, hour]
+        return frame[HOURLY_PROFILE_COLS]
+
+    @property
+    def nbytes(self):
+        return self.total.nbytes + self.wet.nbytes + self.hours.nbytes
+
+
+def build_cube(grid):
+    """``DiurnalCube`` of an ``HourGrid``."""
+    rain = grid.days()
+    valid = ~np.isnan(rain)
+    day = grid.first_hour // 24 + np.arange(grid.n_days)
+    month = day.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) % 12 + 1
+    # Days x months one-hot: contracting the day axis with it sums each calendar month.
+    onehot = (month[:, None] == MONTHS).astype(np.float64)
+
+    def per_month(values):
+        return np.tensordot(values, onehot, axes=([1], [0])).transpose(0, 2, 1)
+
+    return DiurnalCube(
+        stations=grid.stations,
+        total=per_month(np.where(valid, rain, 0.0)),
+        wet=np.rint(per_month((rain > 0).astype(np.float64))).astype(np.int32),
+        hours=np.rint(per_month(valid.astype(np.float64))).astype(np.int32),
+    )
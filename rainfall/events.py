@@ -0,0 +1,124 @@
+"""Per-station rain event segmentation on sorted NumPy arrays.
+
+An event is a run of wet hours (rain above ``threshold``) at one station.  Two
+wet hours belong to the same event when fewer than ``min_gap_hours`` hours
+separate them and no more than ``max_missing_hours`` of those hours are absent
+from the record.  Event boundaries never cross a station boundary.
+"""
+import numpy as np
+import pandas as pd
+
+EVENT_COLS = ['AWS_ID', 'EventID', 'Start', 'End', 'Duration_hrs', 'Total_Rain', 'Max_Hourly', 'Average_Intensity']
+
+
+def hour_index(datetimes):
+    """Whole hours since the Unix epoch as int64."""
+    return np.asarray(datetimes, dtype='datetime64[h]').astype(np.int64)
+
+
+def segment(station, hours, rain, threshold=0.0, min_gap_hours=1, max_missing_hours=0):
+    """Segment events in arrays sorted by (station, hour).
+
+    ``station`` holds any per-row station key, ``hours`` the int64 hour index and
+    ``rain`` the hourly depth.  Returns a dict of per-event arrays: row positions
+    ``start``/``end`` (inclusive), ``station``, ``event_id`` (1-based within a
+    station), ``duration`` (hours spanned), ``total``, ``peak`` and ``intensity``.
+    """
+    seg = segment_gaps(station, hours, rain, [min_gap_hours], threshold, max_missing_hours)
+    del seg['min_gap']
+    return seg
+
+
+def segment_gaps(station, hours, rain, gaps, threshold=0.0, max_missing_hours=0):
+    """Segment events for several ``min_gap_hours`` values in one batched pass.
+
+    The dry span and missing hours between consecutive wet rows are computed
+    once; each gap only changes which of those links break an event.  The
+    boundary masks of all gaps are stacked and reduced together.  Returns the
+    arrays of ``segment`` for all gaps concatenated (each block ordered by
+    station and time) plus ``min_gap``, the gap each event was segmented with.
+    A NaN reading counts as a dry hour that is present in the record, and adds
+    nothing to totals and peaks, as in a pandas sum or max.
+    """
+    station = np.asarray(station)
+    hours = np.asarray(hours, dtype=np.int64)
+    rain = np.nan_to_num(np.asarray(rain, dtype=np.float64), nan=0.0)
+    gaps = np.asarray(gaps, dtype=np.int64)
+
+    wet = np.flatnonzero(rain > threshold)
+    if len(wet) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return {'start': empty, 'end': empty, 'station': station[:0], 'event_id': empty,
+                'duration': empty, 'total': np.empty(0), 'peak': np.empty(0), 'intensity': np.empty(0),
+                'min_gap': empty}
+
+    # Hours absent from the record before each row, accumulated along the array.
+    same_station = np.r_[False, station[1:] == station[:-1]]
+    missing = np.where(same_station, np.diff(hours, prepend=hours[0]) - 1, 0).clip(min=0)
+    missing_cum = np.cumsum(missing)
+
+    wet_station = station[wet]
+    wet_hours = hours[wet]
+    station_first = np.r_[True, wet_station[1:] != wet_station[:-1]]
+    hard_break = station_first.copy()
+    hard_break[1:] |= missing_cum[wet[1:]] - missing_cum[wet[:-1]] > max_missing_hours
+    dry_span = np.r_[0, wet_hours[1:] - wet_hours[:-1] - 1]
+    # One row of boundaries per gap, flattened so every gap is reduced in the same pass.
+    new_event = (hard_break | (dry_span >= gaps[:, None])).ravel()
+
+    first = np.flatnonzero(new_event)
+    last = np.r_[first[1:], len(new_event)] - 1
+    # Each gap's block starts with an event, so no event crosses into the next block.
+    row = first % len(wet)
+    start = wet[row]
+    end = wet[last % len(wet)]
+
+    rain_csum = np.concatenate(([0.0], np.cumsum(rain)))
+    total = rain_csum[end + 1] - rain_csum[start]
+    # reduceat over [start, end + 1) pairs; the sentinel keeps end + 1 in range.
+    bounds = np.empty(2 * len(start), dtype=np.int64)
+    bounds[0::2] = start
+    bounds[1::2] = end + 1
+    peak = np.maximum.reduceat(np.r_[rain, 0.0], bounds)[0::2]
+
+    duration = hours[end] - hours[start] + 1
+    ev_station = station[start]
+    position = np.arange(len(start))
+    event_id = position - np.maximum.accumulate(np.where(station_first[row], position, 0)) + 1
+
+    return {'start': start, 'end': end, 'station': ev_station, 'event_id': event_id,
+            'duration': duration, 'total': total, 'peak': peak, 'intensity': total / duration,
+            'min_gap': gaps[first // len(wet)]}
+
+
+def build_events(df, threshold=0.0, min_gap_hours=1, max_missing_hours=0,
+                 station_col='AWS_ID', time_col='DateTime', rain_col='Hourly_Rain'):
+    """Event table for a long-format hourly frame sorted by station and time."""
+    datetimes = df[time_col].to_numpy()
+    seg = segment(df[station_col].to_numpy(), hour_index(datetimes), df[rain_col].to_numpy(),
+                  threshold, min_gap_hours, max_missing_hours)
+    return _event_frame(seg, datetimes, station_col)
+
+
+def build_gap_events(df, gaps=range(1, 7), threshold=0.0, max_missing_hours=0,
+                     station_col='AWS_ID', time_col='DateTime', rain_col='Hourly_Rain'):
+    """Event tables for every minimum dry gap in ``gaps``, stacked with a ``Min_Gap_hrs`` column."""
+    datetimes = df[time_col].to_numpy()
+    seg = segment_gaps(df[station_col].to_numpy(), hour_index(datetimes), df[rain_col].to_numpy(),
+                       list(gaps), threshold, max_missing_hours)
+    events = _event_frame(seg, datetimes, station_col)
+    events.insert(0, 'Min_Gap_hrs', seg['min_gap'])
+    return events
+
+
+def _event_frame(seg, datetimes, station_col):
+    return pd.DataFrame({
+        station_col: seg['station'],
+        'EventID': seg['event_id'],
+        'Start': datetimes[seg['start']],
+        'End': datetimes[seg['end']],
+        'Duration_hrs': seg['duration'],
+        'Total_Rain': seg['total'],
+        'Max_Hourly': seg['peak'],
+        'Average_Intensity': seg['intensity'],
+    })
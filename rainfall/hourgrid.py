@@ -0,0 +1,188 @@
+"""Dense station x hour array, the in-memory form of the hourly series.
+
+Rainfall is one contiguous float32 array with a row per station and a column
+per hour, plus the station index and the hour of the first column.  The grid
+starts and ends on a midnight, so ``rain.reshape(n_stations, n_days, 24)`` is
+a view with days on the middle axis and hours of the day on the last:
+
+* daily totals reduce the last axis,
+* the diurnal profile reduces the middle one,
+* events are runs of wet cells along each row, segmented by
+  ``rainfall.events.segment`` on the valid cells.
+
+An hour without a valid reading is NaN, so gaps in the record stay distinct
+from dry hours.  At four bytes a cell (plus one for the quality flags) the
+grid is several times smaller than the long hourly frame, which repeats the
+station key and five calendar columns on every row; ``to_hourly`` rebuilds
+that frame for display and row-level queries.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .daily import daily_table
+from .events import EVENT_COLS, hour_index, segment
+from .summaries import hourly_profile_table
+
+# Readings are stored as float32 and rounded back to this many decimals when
+# widened, which restores the exported values exactly (gauges report 0.25 or 0.5 mm steps).
+RAIN_DECIMALS = 4
+
+
+def add_calendar(df):
+    """Append the Date, Year, Month and Hour columns derived from DateTime."""
+    df['Date'] = df['DateTime'].dt.normalize()
+    df['Year'] = df['DateTime'].dt.year.astype('int16')
+    df['Month'] = df['DateTime'].dt.month.astype('int8')
+    df['Hour'] = df['DateTime'].dt.hour.astype('int8')
+    return df
+
+
+def layout(station, hours):
+    """Day-aligned grid placement of rows with a station key and an int64 hour index.
+
+    Returns ``(cell, stations, first_hour, n_hours)``: each row's flat position
+    in a ``len(stations) x n_hours`` array whose first column is a midnight and
+    whose width is a whole number of days.
+    """
+    codes, stations = pd.factorize(station, sort=True)
+    stations = pd.Index(stations, name='AWS_ID')
+    first = int(hours.min()) // 24 * 24 if len(hours) else 0
+    n_hours = (int(hours.max()) // 24 * 24 + 24 - first) if len(hours) else 0
+    cell = codes.astype(np.int64) * n_hours + (hours - first)
+    return cell, stations, first, n_hours
+
+
+def _datetimes(hours):
+    return np.asarray(hours, dtype=np.int64).astype('datetime64[h]').astype('datetime64[ns]')
+
+
+@dataclass
+class HourGrid:
+    """Hourly rainfall of every station on one dense array.
+
+    ``rain[i, j]`` is the reading of ``stations[i]`` at hour ``first_hour + j``
+    (hours since the epoch, ``first_hour`` a multiple of 24), NaN where there
+    is no valid reading.  ``flags`` holds the matching quality bits of
+    ``rainfall.quality``, including the reason a cell was rejected.
+    """
+    stations: pd.Index
+    first_hour: int
+    rain: np.ndarray
+    flags: np.ndarray
+
+    @property
+    def valid(self):
+        return ~np.isnan(self.rain)
+
+    @property
+    def n_days(self):
+        return self.rain.shape[1] // 24
+
+    @property
+    def hours(self):
+        return self.first_hour + np.arange(self.rain.shape[1])
+
+    @property
+    def datetimes(self):
+        return _datetimes(self.hours)
+
+    @property
+    def nbytes(self):
+        return self.rain.nbytes + self.flags.nbytes
+
+    def row(self, station):
+        """Position of a station's row."""
+        return self.stations.get_loc(station)
+
+    def values(self, rows=slice(None), columns=slice(None)):
+        """Readings widened to float64 (NaN where invalid) for exact sums; a copy of the selection."""
+        return np.round(self.rain[rows, columns].astype(np.float64), RAIN_DECIMALS)
+
+    def station(self, station):
+        """Readings of one station, NaN where invalid."""
+        return self.values(self.row(station))
+
+    def days(self):
+        """Widened readings as a ``(n_stations, n_days, 24)`` array."""
+        return self.values().reshape(len(self.stations), self.n_days, 24)
+
+    def window(self, start, end):
+        """Valid readings from ``start`` to ``end`` (inclusive) as a frame of hours x stations.
+
+        Hours without a valid reading at any station are left out.
+        """
+        start, end = hour_index([pd.Timestamp(start), pd.Timestamp(end)]) - self.first_hour
+        columns = np.arange(max(start, 0), min(end + 1, self.rain.shape[1]))
+        index = pd.DatetimeIndex(_datetimes(self.first_hour + columns), name='DateTime')
+        frame = pd.DataFrame(self.values(slice(None), columns).T, index=index, columns=self.stations)
+        return frame.dropna(how='all')
+
+    # ---------- tables ----------
+    def to_hourly(self):
+        """Long hourly fact table of the valid cells, sorted by station and time."""
+        station, hour = np.nonzero(self.valid)
+        df = pd.DataFrame({
+            'AWS_ID': self.stations[station],
+            'DateTime': _datetimes(self.first_hour + hour),
+            'Hourly_Rain': self.values()[station, hour],
+        })
+        return add_calendar(df)
+
+    def daily(self):
+        """Daily table (``rainfall.daily.DAILY_COLS``) of every station-day with a valid hour."""
+        rain = self.days()
+        valid = ~np.isnan(rain)
+        wet = rain > 0
+        recorded = valid.sum(axis=2)
+        station, day = np.nonzero(recorded)
+        parts = pd.DataFrame({
+            'AWS_ID': self.stations[station],
+            'Day': self.first_hour // 24 + day,
+            'total': np.where(valid, rain, 0.0).sum(axis=2)[station, day],
+            'peak': np.where(valid, rain, -np.inf).max(axis=2)[station, day],
+            'low': np.where(wet, rain, np.inf).min(axis=2)[station, day],
+            'wet': wet.sum(axis=2)[station, day],
+            'hours': recorded[station, day],
+        })
+        return daily_table(parts)
+
+    def hourly_profile_parts(self):
+        """Per station and hour-of-day sums, as ``summaries.hourly_profile_parts`` returns them."""
+        rain = self.days()
+        valid = ~np.isnan(rain)
+        wet = rain > 0
+        hours = valid.sum(axis=1)
+        station, hour = np.nonzero(hours)
+        return pd.DataFrame({
+            'AWS_ID': self.stations[station],
+            'Hour': hour,
+            'total': np.where(valid, rain, 0.0).sum(axis=1)[station, hour],
+            'hours': hours[station, hour],
+            'wet': wet.sum(axis=1)[station, hour],
+            'wet_rain': np.where(wet, rain, 0.0).sum(axis=1)[station, hour],
+        })
+
+    def hourly_profile(self):
+        """Mean diurnal pattern per station and hour of day (``summaries.HOURLY_PROFILE_COLS``)."""
+        return hourly_profile_table(self.hourly_profile_parts())
+
+    def events(self, threshold=0.0, min_gap_hours=1, max_missing_hours=0):
+        """Event table of the valid cells, segmented by ``rainfall.events.segment``.
+
+        A NaN cell is an hour absent from the record, so it breaks an event
+        unless ``max_missing_hours`` tolerates it.
+        """
+        station, column = np.nonzero(self.valid)
+        seg = segment(station, column, self.values()[station, column], threshold, min_gap_hours, max_missing_hours)
+        return pd.DataFrame({
+            'AWS_ID': self.stations[seg['station']],
+            'EventID': seg['event_id'],
+            'Start': _datetimes(self.first_hour + column[seg['start']]),
+            'End': _datetimes(self.first_hour + column[seg['end']]),
+            'Duration_hrs': seg['duration'],
+            'Total_Rain': seg['total'],
+            'Max_Hourly': seg['peak'],
+            'Average_Intensity': seg['intensity'],
+        }, columns=EVENT_COLS)
@@ -0,0 +1,93 @@
+"""Maximum rainfall depth over moving windows of several durations (IDF-style).
+
+A window of ``d`` hours ending at a recorded hour covers the clock hours
+``(t - d, t]``: hours missing from the record inside it contribute nothing, and
+a window never reaches into another station's rows.  Depths for every duration
+come from one cumulative sum of the hourly series; the window start is found by
+``searchsorted`` on a station-offset hour key, and maxima per station and
+period are taken with ``ufunc.reduceat`` over contiguous groups.
+"""
+import numpy as np
+import pandas as pd
+
+from .events import hour_index
+
+DURATIONS = (1, 2, 3, 6, 12, 24)
+MAXIMA_COLS = ['AWS_ID', 'Year', 'Month', 'Duration_hrs', 'Max_Depth', 'Intensity', 'End']
+
+
+class RollingWindows:
+    """Cumulative-sum window depths over hourly arrays sorted by station and hour."""
+
+    def __init__(self, station, hours, rain, max_duration=max(DURATIONS)):
+        codes, _ = pd.factorize(station, sort=False)
+        hours = np.asarray(hours, dtype=np.int64)
+        first = hours.min() if len(hours) else 0
+        # Offsetting stations by more than the longest window keeps windows inside one station.
+        span = int(hours.max() - first) + max_duration + 1 if len(hours) else 1
+        self.max_duration = max_duration
+        self.key = codes.astype(np.int64) * span + (hours - first)
+        self.csum = np.concatenate(([0.0], np.cumsum(np.asarray(rain, dtype=np.float64))))
+
+    def depth(self, duration):
+        """Rain depth over the ``duration``-hour window ending at every row."""
+        if duration > self.max_duration:
+            raise ValueError(f"duration {duration} exceeds the {self.max_duration}-hour station offset")
+        start = np.searchsorted(self.key, self.key - duration + 1, side='left')
+        return self.csum[1:] - self.csum[start]
+
+
+def build_maxima(hourly, durations=DURATIONS, by=('Year',)):
+    """Largest window depth per station, period and duration.
+
+    ``by`` is ``('Year',)`` for annual or ``('Year', 'Month')`` for monthly
+    maxima, with windows assigned to the period of the hour they end.
+    ``Intensity`` is depth per hour and ``End`` the end of the earliest window
+    reaching the maximum.
+    """
+    cols = [c for c in MAXIMA_COLS if c in ('AWS_ID', 'Duration_hrs', 'Max_Depth', 'Intensity', 'End', *by)]
+    n = len(hourly)
+    if n == 0:
+        return pd.DataFrame(columns=cols)
+
+    datetimes = hourly['DateTime'].to_numpy()
+    station = hourly['AWS_ID'].to_numpy()
+    windows = RollingWindows(station, hour_index(datetimes), hourly['Hourly_Rain'].to_numpy(), max(durations))
+
+    periods = {'Year': hourly['DateTime'].dt.year.to_numpy()}
+    if 'Month' in by:
+        periods['Month'] = hourly['DateTime'].dt.month.to_numpy()
+    change = np.ones(n, dtype=bool)
+    change[1:] = station[1:] != station[:-1]
+    for period in periods.values():
+        change[1:] |= period[1:] != period[:-1]
+    starts = np.flatnonzero(change)
+    sizes = np.diff(np.r_[starts, n])
+    position = np.arange(n)
+
+    parts = []
+    for duration in durations:
+        depth = windows.depth(duration)
+        peak = np.maximum.reduceat(depth, starts)
+        # Earliest row of each group reaching the group maximum.
+        first = np.minimum.reduceat(np.where(depth == np.repeat(peak, sizes), position, n), starts)
+        part = pd.DataFrame({'AWS_ID': station[starts], **{k: v[starts] for k, v in periods.items()}})
+        part['Duration_hrs'] = duration
+        part['Max_Depth'] = peak
+        part['Intensity'] = peak / duration
+        part['End'] = datetimes[first]
+        parts.append(part)
+
+    maxima = pd.concat(parts, ignore_index=True)
+    maxima = maxima.sort_values(['AWS_ID', *by, 'Duration_hrs'], kind='stable').reset_index(drop=True)
+    return maxima[cols]
+
+
+def build_annual_maxima(hourly, durations=DURATIONS):
+    """Annual maximum depth and intensity per station for each duration."""
+    return build_maxima(hourly, durations, by=('Year',))
+
+
+def build_monthly_maxima(hourly, durations=DURATIONS):
+    """Monthly maximum depth and intensity per station for each duration."""
+    return build_maxima(hourly, durations, by=('Year', 'Month'))
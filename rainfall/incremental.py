@@ -0,0 +1,308 @@
+"""Incremental append of new hourly AWS records to a Parquet store.
+
+Instead of rebuilding every table, an append
+
+* rewrites only the hourly partitions (Year/Month/AWS_ID) the new rows fall in,
+* recomputes the station-days that received new rows,
+* re-opens each station's events that could still continue into the new data
+  (those ending within ``min_gap_hours`` of the first new hour) and segments
+  again from the start of the earliest one,
+* updates the per-station rainy-day statistics and the hourly profile from
+  running sums kept in the ``state`` and ``profile_parts`` tables.
+
+Work is proportional to the new rows plus the partitions they touch.  The
+first append to a store written by the pipeline bootstraps the running sums
+from the stored tables once.
+
+    python -m rainfall.incremental GHMC_rainfall_store "feeds/2025-10-*.csv"
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from . import store
+from .daily import build_daily
+from .events import build_events
+from .pipeline import combine, discover, parse_file, quality_summary, rejected_warning
+from .profiling import StageTimer
+from .quality import assess
+from .spells import build_spells, spell_summary
+from .summaries import RAINY_DAYS_COLS, hourly_profile_parts, hourly_profile_table
+
+ONE_DAY = pd.Timedelta(days=1)
+
+HOURLY_COLS = ['AWS_ID', 'DateTime', 'Hourly_Rain', 'Year', 'Month']
+STATE_COLS = ['AWS_ID', 'Last_Date', 'Total_Rainy_Days', 'Rain_Sum', 'Intensity_Sum', 'Max_Daily_Rain',
+              'Longest_Wet_Spell_days', 'Trailing_Wet_Spell_days', 'Prior_Wet_Spell_days', 'Event_Count']
+
+
+# =========================
+# RUNNING STATE
+# =========================
+def spell_tails(spells):
+    """Per-station wet run ending on the last day and on the calendar day before it."""
+    grouped = spells.groupby('AWS_ID', observed=True, sort=True)
+    last = grouped.nth(-1).set_index('AWS_ID')
+    prev = grouped.nth(-2).set_index('AWS_ID').reindex(last.index)
+    length = last['Length_days'].to_numpy()
+    wet = last['Wet'].to_numpy(dtype=bool)
+    follows = prev['Wet'].eq(True).to_numpy() & (prev['End'] == last['Start'] - ONE_DAY).to_numpy()
+    return pd.DataFrame({
+        'Trailing_Wet_Spell_days': np.where(wet, length, 0),
+        'Prior_Wet_Spell_days': np.where(length >= 2, np.where(wet, length - 1, 0),
+                                         np.where(follows, prev['Length_days'].fillna(0), 0)).astype(np.int64),
+    }, index=last.index)
+
+
+def continue_spells(days, carry, carry_end):
+    """Longest, trailing and prior wet runs of one station's new days.
+
+    ``carry`` wet days ending on ``carry_end`` are already stored; they join
+    the first new spell when it is wet and starts the following day.
+    """
+    spells = build_spells(days)
+    if carry:
+        if spells['Wet'].iloc[0] and spells['Start'].iloc[0] - carry_end == ONE_DAY:
+            spells.loc[0, 'Length_days'] += carry
+        else:
+            lead = pd.DataFrame({'AWS_ID': spells['AWS_ID'].iloc[:1], 'Wet': True, 'Start': carry_end,
+                                 'End': carry_end, 'Length_days': carry, 'Total_Rain': 0.0})
+            spells = pd.concat([lead, spells], ignore_index=True)
+    tails = spell_tails(spells).iloc[0]
+    longest = spells.loc[spells['Wet'], 'Length_days'].max() if spells['Wet'].any() else 0
+    return longest, tails['Trailing_Wet_Spell_days'], tails['Prior_Wet_Spell_days']
+
+
+def build_state(daily, events):
+    """Per-station running sums and wet-spell tails from complete tables."""
+    rain = daily['Daily_Rainfall'].to_numpy()
+    wet = rain > 0
+    frame = pd.DataFrame({
+        'AWS_ID': daily['AWS_ID'].to_numpy(),
+        'Date': daily['Date'].to_numpy(),
+        'wet': wet.astype(np.int64),
+        'rain': np.where(wet, rain, 0.0),
+        'intensity': np.where(wet, daily['Daily_Intensity'].to_numpy(), 0.0),
+    })
+    state = frame.groupby('AWS_ID', observed=True, sort=True).agg(
+        Last_Date=('Date', 'max'), Total_Rainy_Days=('wet', 'sum'), Rain_Sum=('rain', 'sum'),
+        Intensity_Sum=('intensity', 'sum'), Max_Daily_Rain=('rain', 'max'))
+    spells = build_spells(daily)
+    state['Longest_Wet_Spell_days'] = spell_summary(spells).set_index('AWS_ID')['Longest_Wet_Spell_days']
+    state = state.join(spell_tails(spells))
+    counts = events.groupby('AWS_ID', observed=True).size()
+    state['Event_Count'] = counts.reindex(state.index, fill_value=0)
+    return state.reset_index()[STATE_COLS]
+
+
+def rainy_days_table(state):
+    """The exported rainy-days summary (stations with at least one rainy day)."""
+    rainy = state[state['Total_Rainy_Days'] > 0].copy()
+    rainy['Mean_Daily_Rain'] = rainy['Rain_Sum'] / rainy['Total_Rainy_Days']
+    rainy['Mean_Intensity'] = rainy['Intensity_Sum'] / rainy['Total_Rainy_Days']
+    return rainy[RAINY_DAYS_COLS].reset_index(drop=True)
+
+
+def load_state(root):
+    """Running sums of a store, bootstrapped from its full tables on first use."""
+    names = store.manifest(root)['rows']
+    if 'state' in names and 'profile_parts' in names:
+        return store.read_table(root, 'state'), store.read_table(root, 'profile_parts')
+    state = build_state(store.read_table(root, 'daily'), store.read_table(root, 'events', ['AWS_ID']))
+    parts = hourly_profile_parts(store.read_table(root, 'hourly', ['AWS_ID', 'DateTime', 'Hourly_Rain']))
+    return state, parts
+
+
+def _rows_in(frame, keys, cols):
+    """Boolean mask of ``frame`` rows whose ``cols`` values appear in ``keys``."""
+    index = pd.MultiIndex.from_frame(keys[cols].drop_duplicates())
+    return pd.MultiIndex.from_frame(frame[cols]).isin(index)
+
+
+# =========================
+# APPEND
+# =========================
+def append(root, hourly, stations=None, timer=None):
+    """Merge normalized hourly rows (and optional new station metadata) into a store."""
+    timer = timer or StageTimer()
+    info = store.manifest(root)
+    params = tuple(info.get('event_params', (0.0, 1, 0)))
+    rows = dict(info['rows'])
+
+    hourly = hourly[['AWS_ID', 'DateTime', 'Hourly_Rain']].drop_duplicates(['AWS_ID', 'DateTime'], keep='last')
+    hourly = hourly.sort_values(['AWS_ID', 'DateTime'], kind='stable').reset_index(drop=True)
+    hourly['Year'] = hourly['DateTime'].dt.year.astype('int16')
+    hourly['Month'] = hourly['DateTime'].dt.month.astype('int8')
+    ids = hourly['AWS_ID'].unique()
+
+    with timer.stage('load state'):
+        known = store.read_stations(root)
+        if stations is not None:
+            known = pd.concat([known, stations[~stations.index.isin(known.index)]]).sort_index()
+        hourly['AWS_ID'] = hourly['AWS_ID'].astype(known.index.dtype)
+        state, parts = load_state(root)
+
+    # ---------- Hourly partitions ----------
+    with timer.stage('hourly'):
+        first, last = hourly['DateTime'].min(), hourly['DateTime'].max()
+        old = store.read_table(root, 'hourly', HOURLY_COLS, ids, first.replace(day=1),
+                               last + pd.offsets.MonthEnd(0))
+        old = old[_rows_in(old, hourly, ['Year', 'Month', 'AWS_ID'])]
+        replaced = old[_rows_in(old, hourly, ['AWS_ID', 'DateTime'])]
+        merged = pd.concat([old, hourly], ignore_index=True).drop_duplicates(['AWS_ID', 'DateTime'], keep='last')
+        merged = merged.sort_values(['AWS_ID', 'DateTime'], kind='stable').reset_index(drop=True)
+        store.write_table(root, 'hourly', merged)
+        rows['hourly'] = rows.get('hourly', 0) + len(hourly) - len(replaced)
+
+    # ---------- Daily ----------
+    with timer.stage('daily'):
+        days = pd.DataFrame({'AWS_ID': hourly['AWS_ID'], 'Date': hourly['DateTime'].dt.normalize()})
+        merged_days = merged.assign(Date=merged['DateTime'].dt.normalize())
+        new_daily = build_daily(merged_days[_rows_in(merged_days, days, ['AWS_ID', 'Date'])])
+
+        years = new_daily['Year']
+        old_daily = store.read_table(root, 'daily', None, ids, pd.Timestamp(years.min(), 1, 1),
+                                     pd.Timestamp(years.max(), 12, 31))
+        old_daily = old_daily[_rows_in(old_daily, new_daily, ['Year', 'AWS_ID'])]
+        replaced_days = _rows_in(old_daily, new_daily, ['AWS_ID', 'Date'])
+        old_days = old_daily[replaced_days]
+        daily_out = pd.concat([old_daily[~replaced_days], new_daily[old_daily.columns]], ignore_index=True)
+        store.write_table(root, 'daily', daily_out.sort_values(['AWS_ID', 'Date'], kind='stable'))
+        rows['daily'] = rows.get('daily', 0) + len(new_daily) - len(old_days)
+
+    # ---------- Events ----------
+    with timer.stage('events'):
+        gap = pd.Timedelta(hours=params[1])
+        first_new = hourly.groupby('AWS_ID', observed=True)['DateTime'].min()
+        # Select on End rather than a window of start dates, so an event of any length is re-opened.
+        recent = store.read_table(root, 'events', None, ids,
+                                  predicate=ds.field('End') >= (first_new.min() - gap).to_datetime64())
+        reopened = recent[recent['End'].to_numpy() >= (first_new.reindex(recent['AWS_ID']) - gap).to_numpy()]
+        restart = pd.concat([first_new, reopened.groupby('AWS_ID', observed=True)['Start'].min()], axis=1).min(axis=1)
+
+        tail = store.read_table(root, 'hourly', ['AWS_ID', 'DateTime', 'Hourly_Rain'], ids, restart.min().normalize())
+        tail = tail[tail['DateTime'].to_numpy() >= restart.reindex(tail['AWS_ID']).to_numpy()]
+        new_events = build_events(tail, *params)
+
+        counts = state.set_index('AWS_ID')['Event_Count'].reindex(ids, fill_value=0)
+        n_reopened = reopened.groupby('AWS_ID', observed=True).size().reindex(ids, fill_value=0)
+        offset = counts - n_reopened
+        new_events['EventID'] += offset.reindex(new_events['AWS_ID']).to_numpy()
+        event_counts = offset + new_events.groupby('AWS_ID', observed=True).size().reindex(ids, fill_value=0)
+
+        new_events['Year'] = new_events['Start'].dt.year.astype('int16')
+        touched = pd.concat([reopened[['Year', 'AWS_ID']], new_events[['Year', 'AWS_ID']]], ignore_index=True)
+        if len(touched):
+            existing = store.read_table(root, 'events', None, ids, pd.Timestamp(int(touched['Year'].min()), 1, 1))
+            existing = existing[_rows_in(existing, touched, ['Year', 'AWS_ID'])]
+            existing = existing[~_rows_in(existing, reopened, ['AWS_ID', 'EventID'])]
+            events_out = pd.concat([existing, new_events[existing.columns]], ignore_index=True)
+            store.replace_partitions(root, 'events', events_out.sort_values(['AWS_ID', 'Start'], kind='stable'),
+                                     touched)
+        rows['events'] = rows.get('events', 0) + len(new_events) - len(reopened)
+
+    # ---------- Hourly profile ----------
+    with timer.stage('profile'):
+        removed = hourly_profile_parts(replaced)
+        removed[['total', 'hours', 'wet', 'wet_rain']] *= -1
+        parts = pd.concat([parts, removed, hourly_profile_parts(hourly)], ignore_index=True)
+        parts = parts.groupby(['AWS_ID', 'Hour'], observed=True, sort=True).sum().reset_index()
+
+    # ---------- Rainy days / wet spells ----------
+    with timer.stage('rainy days'):
+        state = update_state(root, state, new_daily, old_days, event_counts)
+
+    with timer.stage('write summaries'):
+        period = [pd.Timestamp(t) for t in info.get('period', [first, last])]
+        store.write_store(root, known, period=(min(period[0], first), max(period[1], last)), rows=rows,
+                          event_params=params, hourly_profile=hourly_profile_table(parts),
+                          rainy_days=rainy_days_table(state), profile_parts=parts, state=state)
+    return timer
+
+
+def update_state(root, state, new_daily, old_days, event_counts):
+    """Fold recomputed station-days into the per-station state.
+
+    Days appended after a station's last stored day extend its running sums and
+    trailing wet spell directly.  When history before that is rewritten, or a
+    replaced day may have held the station's maximum or longest spell, the
+    station is recomputed from its stored daily rows instead.
+    """
+    state = state.set_index('AWS_ID')
+    recompute = []
+    for station, days in new_daily.sort_values('Date').groupby('AWS_ID', observed=True, sort=False):
+        old = old_days[old_days['AWS_ID'] == station]
+        old_wet = old[old['Daily_Rainfall'] > 0]
+        if station not in state.index:
+            recompute.append(station)
+            continue
+        s = state.loc[station]
+        first_day = days['Date'].iloc[0]
+        if (first_day < s['Last_Date']
+                or (old_wet['Daily_Rainfall'] >= s['Max_Daily_Rain']).any()
+                or (len(old_wet) and s['Longest_Wet_Spell_days'] == s['Trailing_Wet_Spell_days'])):
+            recompute.append(station)
+            continue
+
+        wet = days['Daily_Rainfall'].to_numpy() > 0
+        if first_day > s['Last_Date']:
+            carry, carry_end = s['Trailing_Wet_Spell_days'], s['Last_Date']
+        else:
+            carry, carry_end = s['Prior_Wet_Spell_days'], s['Last_Date'] - ONE_DAY
+        longest, trailing, prior = continue_spells(days, int(carry), carry_end)
+        state.loc[station, ['Last_Date', 'Total_Rainy_Days', 'Rain_Sum', 'Intensity_Sum', 'Max_Daily_Rain',
+                            'Longest_Wet_Spell_days', 'Trailing_Wet_Spell_days', 'Prior_Wet_Spell_days']] = [
+            days['Date'].iloc[-1],
+            s['Total_Rainy_Days'] + wet.sum() - len(old_wet),
+            s['Rain_Sum'] + days['Daily_Rainfall'][wet].sum() - old_wet['Daily_Rainfall'].sum(),
+            s['Intensity_Sum'] + days['Daily_Intensity'][wet].sum() - old_wet['Daily_Intensity'].sum(),
+            max(s['Max_Daily_Rain'], days['Daily_Rainfall'].max()),
+            max(s['Longest_Wet_Spell_days'], longest),
+            trailing,
+            prior,
+        ]
+
+    if recompute:
+        full = store.read_table(root, 'daily', None, recompute)
+        fresh = build_state(full, pd.DataFrame({'AWS_ID': pd.Series([], dtype=full['AWS_ID'].dtype)}))
+        fresh = fresh.set_index('AWS_ID')
+        state = pd.concat([state[~state.index.isin(fresh.index)], fresh.drop(columns='Event_Count')])
+
+    # combine_first aligns through float; counts stay integers so appended EventIDs do too.
+    state['Event_Count'] = event_counts.combine_first(state['Event_Count']).astype(np.int64)
+    state.index.name = 'AWS_ID'
+    return state.sort_index().reset_index()[STATE_COLS]
+
+
+# =========================
+# COMMAND LINE
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append new AWS CSV feeds to a GHMC rainfall Parquet store.")
+    parser.add_argument('store', help="store folder written by the pipeline or the notebook")
+    parser.add_argument('inputs', nargs='+', help="CSV files, directories or glob patterns with the new records")
+    parser.add_argument('--valid-from', type=pd.Timestamp, default=None,
+                        help="treat records before this date as out of range (default: no lower bound)")
+    parser.add_argument('--reference', type=pd.Timestamp, default=None,
+                        help="time the feeds were exported; later records are out of range")
+    args = parser.parse_args(argv)
+
+    timer = StageTimer()
+    with timer.stage('parse'):
+        stations, hourly, rejected = combine([parse_file(p) for p in discover(args.inputs)])
+    with timer.stage('quality'):
+        # Duplicates are still in the combined rows, so assess flags them before keeping one.
+        hourly, _, report = assess(hourly, valid_from=args.valid_from, reference=args.reference)
+    append(args.store, hourly, stations, timer)
+    print(f"Appended {len(hourly)} hourly records for {hourly['AWS_ID'].nunique()} stations to {args.store}")
+    if rejected_warning(rejected):
+        print(rejected_warning(rejected))
+    print(quality_summary(report))
+    print("Stage wall time:")
+    print(timer.report())
+
+
+if __name__ == '__main__':
+    main()
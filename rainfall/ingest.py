@@ -0,0 +1,333 @@
+"""Ingest and preprocessing of GHMC hourly AWS rainfall CSV uploads.
+
+Streamlit reruns the dashboard script on every widget change, so the parse and
+the derived-table build are keyed on a hash of the uploaded bytes (or of the
+store path and query) and kept in a small bounded cache that lives for the
+lifetime of the server process.
+"""
+import hashlib
+import io
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from . import quality, store
+from .boxstats import box_summary
+from .daily import DAILY_COLS
+from .diurnal import DiurnalCube, build_cube
+from .events import EVENT_COLS, build_events
+from .hourgrid import HourGrid, add_calendar
+from .profiling import StageTimer
+from .rollups import event_rollup, membership, rollup
+from .station_analysis import StationIndex, daily_tables, event_tables, hourly_tables, station_maxima
+from .stations import attach, build_stations, station_key
+from .thresholds import INDEXED, ThresholdIndex
+from .timestamps import parse_aws
+
+# Number of distinct uploads kept in memory before the least recently used one is evicted.
+CACHE_MAX_ENTRIES = 4
+
+
+@dataclass
+class RainfallData:
+    """Normalized hourly frame plus the tables derived from it.
+
+    ``stations`` is the metadata dimension (indexed by AWS_ID); every other
+    table is a fact table keyed by AWS_ID only.  ``by_station`` maps each fact
+    table (events per event definition) to its ``StationIndex``, and
+    ``thresholds`` maps (table, column) to a ``ThresholdIndex`` for the
+    threshold queries.  ``hour_grid`` is the dense station x hour array
+    (see ``rainfall.hourgrid``) the daily and event tables are computed on;
+    ``hourly`` is its long-format view for display and row-level queries,
+    ``quality`` the per-station report of the screen (see ``rainfall.quality``)
+    and ``diurnal`` the station x month x hour-of-day cube (see ``rainfall.diurnal``).
+    ``rejected_timestamps`` counts the rows whose ``Date_&_Time`` did not parse.
+    """
+    key: str
+    preview: pd.DataFrame
+    stations: pd.DataFrame
+    hourly: pd.DataFrame
+    daily: pd.DataFrame
+    events: pd.DataFrame
+    hour_grid: HourGrid = None
+    quality: pd.DataFrame = None
+    diurnal: DiurnalCube = None
+    rejected_timestamps: int = 0
+    _events_memo: dict = field(default_factory=dict, repr=False)
+    _station_memo: dict = field(default_factory=dict, repr=False)
+    _maxima_memo: dict = field(default_factory=dict, repr=False)
+    _box_memo: dict = field(default_factory=dict, repr=False)
+    _grid_memo: dict = field(default_factory=dict, repr=False)
+    _rollup_memo: dict = field(default_factory=dict, repr=False)
+    _storm_memo: dict = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        # Tables are sorted by AWS_ID, so each station is one contiguous row range.
+        self.by_station = {'hourly': StationIndex(self.hourly), 'daily': StationIndex(self.daily),
+                           'events': {(0.0, 1, 0): StationIndex(self.events)}}
+        self.thresholds = {(table, column): ThresholdIndex(getattr(self, table), column)
+                           for table, columns in INDEXED.items() for column in columns}
+
+    def events_for(self, threshold=0.0, min_gap_hours=1, max_missing_hours=0):
+        """Event table for a non-default event definition, memoized per parameter set."""
+        params = (threshold, min_gap_hours, max_missing_hours)
+        if params == (0.0, 1, 0):
+            return self.events
+        if params not in self._events_memo:
+            self._events_memo[params] = (self.hour_grid.events(*params) if self.hour_grid is not None
+                                         else build_events(self.hourly, *params))
+        return self._events_memo[params]
+
+    def station_index(self, table, event_params=(0.0, 1, 0)):
+        """``StationIndex`` of a fact table; event tables of other definitions are indexed on first use."""
+        if table != 'events':
+            return self.by_station[table]
+        events_index = self.by_station['events']
+        if event_params not in events_index:
+            events_index[event_params] = StationIndex(self.events_for(*event_params))
+        return events_index[event_params]
+
+    def station(self, station_id, threshold=0.0, min_gap_hours=1, max_missing_hours=0):
+        """Memoized slices and derived tables of one station (see ``rainfall.station_analysis``)."""
+        params = (threshold, min_gap_hours, max_missing_hours)
+        if station_id not in self._station_memo:
+            hourly = self.by_station['hourly'][station_id]
+            daily = self.by_station['daily'][station_id]
+            self._station_memo[station_id] = {'hourly': hourly, 'daily': daily,
+                                              **hourly_tables(hourly), **daily_tables(daily)}
+        if (station_id, params) not in self._station_memo:
+            tables = event_tables(self.station_index('events', params)[station_id],
+                                  self.by_station['hourly'][station_id], threshold, max_missing_hours)
+            tables['maxima'] = self.maxima(*params).reindex([station_id]).iloc[0]
+            self._station_memo[station_id, params] = tables
+        return {**self._station_memo[station_id], **self._station_memo[station_id, params]}
+
+    def threshold_index(self, table, column, event_params=(0.0, 1, 0)):
+        """Sorted-value index of a column; event tables of other definitions are indexed on first use."""
+        key = (table, column) if table != 'events' or event_params == (0.0, 1, 0) else (table, column, event_params)
+        if key not in self.thresholds:
+            frame = self.events_for(*event_params) if table == 'events' else getattr(self, table)
+            self.thresholds[key] = ThresholdIndex(frame, column)
+        return self.thresholds[key]
+
+    def maxima(self, threshold=0.0, min_gap_hours=1, max_missing_hours=0):
+        """Per-station hourly, event and daily maxima, computed once per event definition."""
+        params = (threshold, min_gap_hours, max_missing_hours)
+        if params not in self._maxima_memo:
+            self._maxima_memo[params] = station_maxima(self.hourly, self.daily, self.events_for(*params))
+        return self._maxima_memo[params]
+
+    def box_summary(self, table, value, by):
+        """Box statistics of a whole fact table (see ``rainfall.boxstats``), memoized per grouping."""
+        key = (table, value, tuple(by))
+        if key not in self._box_memo:
+            self._box_memo[key] = box_summary(getattr(self, table), value, list(by))
+        return self._box_memo[key]
+
+    def grid(self, boundary_path, cell_km=0.5, k=8, power=2.0):
+        """IDW weights from the stations to a grid inside the boundary (see ``rainfall.spatial``), built once."""
+        from .spatial import IDWGrid, load_boundary
+
+        params = (os.path.abspath(boundary_path), cell_km, k, power)
+        if params not in self._grid_memo:
+            self._grid_memo[params] = IDWGrid(self.stations, load_boundary(boundary_path), cell_km, k, power)
+        return self._grid_memo[params]
+
+    def members(self, boundary_path=None):
+        """Administrative units of every station, checked against the boundary polygon when one is given."""
+        key = ('members', boundary_path and os.path.abspath(boundary_path))
+        if key not in self._rollup_memo:
+            inside = None
+            if boundary_path is not None and {'Latitude', 'Longitude'}.issubset(self.stations.columns):
+                from .spatial import inside_boundary, load_boundary
+                inside = inside_boundary(self.stations, load_boundary(boundary_path))
+            self._rollup_memo[key] = membership(self.stations, inside)
+        return self._rollup_memo[key]
+
+    def rollup(self, unit, table, threshold=0.0, event_params=(0.0, 1, 0)):
+        """Unit-level aggregates of the hourly, daily or events table (see ``rainfall.rollups``), memoized."""
+        key = (unit, table, threshold if table != 'events' else event_params)
+        if key not in self._rollup_memo:
+            members = self.members()
+            if table == 'hourly':
+                self._rollup_memo[key] = rollup(self.hourly, members, unit, 'Hourly_Rain', 'DateTime', threshold)
+            elif table == 'daily':
+                self._rollup_memo[key] = rollup(self.daily, members, unit, 'Daily_Rainfall', 'Date', threshold)
+            else:
+                self._rollup_memo[key] = event_rollup(self.events_for(*event_params), members, unit)
+        return self._rollup_memo[key]
+
+    def neighbours(self, radius_km=5.0):
+        """Stations within ``radius_km`` of each other (see ``rainfall.storms.NeighbourIndex``), built once."""
+        from .storms import NeighbourIndex
+
+        if radius_km not in self._storm_memo:
+            self._storm_memo[radius_km] = NeighbourIndex(self.stations, radius_km)
+        return self._storm_memo[radius_km]
+
+    def storms(self, radius_km=5.0, max_gap_hours=1, event_params=(0.0, 1, 0)):
+        """Storm table and member events linked across neighbouring stations (see ``rainfall.storms``), memoized."""
+        from .storms import build_storms
+
+        key = (radius_km, max_gap_hours, event_params)
+        if key not in self._storm_memo:
+            self._storm_memo[key] = build_storms(self.events_for(*event_params), self.stations,
+                                                 max_gap_hours=max_gap_hours, index=self.neighbours(radius_km))
+        return self._storm_memo[key]
+
+
+# =========================
+# PARSING
+# =========================
+def clean_columns(df):
+    """Normalize raw AWS export headers ('Hourly  Rainfall (mm)' -> 'Hourly__Rainfall_(mm)')."""
+    df.columns = df.columns.str.strip().str.replace('\n', ' ').str.replace(' ', '_')
+    return df
+
+
+def normalize(raw, screen=True):
+    """Return ``(hourly, rejected)``: the typed hourly fact table sorted by station and time,
+    and the number of rows whose ``Date_&_Time`` did not parse.
+
+    Unparsed timestamps and rainfall stay as NaT/NaN until screened: with
+    ``screen`` invalid rows are dropped here (``quality.screen``); without it
+    they are kept for ``quality.assess`` to flag and no calendar columns are added.
+    """
+    df = raw.rename(columns={'Hourly__Rainfall_(mm)': 'Hourly_Rain',
+                             'Day_Cumulative__Rainfall_(mm)': 'Day_CumRain'})
+    datetimes, rejected = parse_aws(df['Date_&_Time'])
+    df = pd.DataFrame({
+        'AWS_ID': station_key(df['AWS_ID']),
+        'DateTime': datetimes,
+        'Hourly_Rain': pd.to_numeric(df['Hourly_Rain'], errors='coerce').astype('float64'),
+    })
+    df = df.sort_values(['AWS_ID', 'DateTime'], kind='stable').reset_index(drop=True)
+    return (add_calendar(quality.screen(df)) if screen else df), rejected
+
+
+def preprocess(data, key=None, timer=None):
+    """Parse raw CSV bytes into the station dimension and the fact tables.
+
+    Each step runs as a stage of ``timer`` (a ``profiling.StageTimer``) when one is given.
+    """
+    timer = timer or StageTimer()
+    with timer.stage('read_csv', len(data)):
+        raw = clean_columns(pd.read_csv(io.BytesIO(data)))
+    with timer.stage('stations', len(raw)):
+        stations = build_stations(raw)
+    with timer.stage('parse', len(raw)):
+        typed, rejected = normalize(raw, screen=False)
+    with timer.stage('quality', len(typed)):
+        hourly, grid, report = quality.assess(typed)
+    with timer.stage('daily', grid.rain.size):
+        daily = grid.daily()
+    with timer.stage('events', grid.rain.size):
+        events = grid.events()
+    with timer.stage('diurnal', grid.rain.size):
+        diurnal = build_cube(grid)
+    with timer.stage('indexes', len(hourly) + len(daily) + len(events)):
+        return RainfallData(key=key or file_key(data), preview=raw.head(20), stations=stations,
+                            hourly=hourly, daily=daily, events=events, hour_grid=grid, quality=report,
+                            diurnal=diurnal, rejected_timestamps=rejected)
+
+
+# =========================
+# CACHE
+# =========================
+def file_key(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class PreprocessCache:
+    """Least-recently-used cache of RainfallData keyed on upload content hash."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """Return (RainfallData, hit), calling ``build()`` only on a miss."""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key], True
+
+        self.misses += 1
+        result = build()
+        self.entries[key] = result
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return result, False
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+
+_cache = PreprocessCache()
+
+
+def load(data, timer=None):
+    """Cached entry point used by the dashboard; returns (RainfallData, hit)."""
+    key = file_key(data)
+    return _cache.get(key, lambda: preprocess(data, key, timer))
+
+
+def load_store(root, stations=None, start=None, end=None, timer=None):
+    """Cached RainfallData read from a Parquet store (see ``rainfall.store``).
+
+    Only the partitions matching the station list and date range are read and
+    the stored summaries are used as-is, so nothing is re-derived.
+    """
+    written_at = store.manifest(root)['written_at']
+    key = file_key(repr((os.path.abspath(root), written_at, stations and sorted(stations),
+                         str(start), str(end))).encode())
+    return _cache.get(key, lambda: read_store(root, stations, start, end, key, timer))
+
+
+def read_store(root, stations=None, start=None, end=None, key=None, timer=None):
+    timer = timer or StageTimer()
+    with timer.stage('read_store'):
+        station_table, hourly, daily, events = _read_store_tables(root, stations, start, end)
+    # Stored hours were screened when written; the grid re-derives events and reports on them.
+    with timer.stage('quality', len(hourly)):
+        grid, _ = quality.build_grid(hourly)
+        report = quality.completeness(grid)
+    with timer.stage('diurnal', grid.rain.size):
+        diurnal = build_cube(grid)
+    with timer.stage('indexes', len(hourly) + len(daily) + len(events)):
+        return RainfallData(key=key or root, preview=attach(hourly.head(20), station_table),
+                            stations=station_table, hourly=hourly, daily=daily, events=events,
+                            hour_grid=grid, quality=report, diurnal=diurnal)
+
+
+def _read_store_tables(root, stations, start, end):
+    station_table = store.read_stations(root)
+    hourly = store.read_table(root, 'hourly', ['AWS_ID', 'DateTime', 'Hourly_Rain', 'Year', 'Month'],
+                              stations, start, end)
+    hourly['Date'] = hourly['DateTime'].dt.normalize()
+    hourly['Hour'] = hourly['DateTime'].dt.hour.astype('int8')
+    hourly = hourly[['AWS_ID', 'DateTime', 'Hourly_Rain', 'Date', 'Year', 'Month', 'Hour']]
+    daily = store.read_table(root, 'daily', DAILY_COLS, stations, start, end)
+    if 'Month' not in daily.columns:
+        daily['Month'] = daily['Date'].dt.month.astype('int8')
+    if 'Hours_Recorded' not in daily.columns:
+        # Stores written before the column existed: count the stored hours of each day.
+        counts = hourly.groupby(['AWS_ID', 'Date'], observed=True).size().rename('Hours_Recorded')
+        daily = daily.join(counts, on=['AWS_ID', 'Date'])
+        daily['Hours_Recorded'] = daily['Hours_Recorded'].fillna(0).astype(np.int64)
+    daily = daily[DAILY_COLS]
+    events = store.read_table(root, 'events', EVENT_COLS, stations, start, end)[EVENT_COLS]
+    if stations is not None:
+        station_table = station_table.loc[station_table.index.isin(stations)]
+    return station_table, hourly, daily, events
+
+
+def cache_stats():
+    return {'entries': len(_cache.entries), 'max_entries': _cache.max_entries,
+            'hits': _cache.hits, 'misses': _cache.misses}
@@ -0,0 +1,274 @@
+"""Headless batch version of the ``Rainfall analysis`` notebook.
+
+Reads any number of yearly/monthly AWS CSV exports, shards the hourly records
+by station across a process pool and writes the notebook's four summary CSVs
+plus a per-station data-quality report and the storms linked across stations
+(optionally also the Parquet store)::
+
+    python -m rainfall.pipeline "archives/*.csv" -o GHMC_rainfall_analysis_outputs --workers 8
+
+Inputs too large for memory can be streamed with ``--chunksize 500000``.
+"""
+import argparse
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .daily import build_daily
+from .events import build_events
+from .ingest import clean_columns, normalize
+from .profiling import StageTimer
+from .quality import assess
+from .stations import attach, build_stations
+from .storms import build_storms
+from .summaries import build_hourly_profile, build_rainy_days
+
+OUTPUT_FILES = {
+    'daily': 'daily_rainfall_summary.csv',
+    'hourly_profile': 'hourly_rainfall_summary.csv',
+    'events': 'rain_events_summary.csv',
+    'rainy_days': 'rainy_days_summary.csv',
+}
+QUALITY_FILE = 'data_quality_report.csv'
+STORMS_FILE = 'storm_summary.csv'
+
+
+# =========================
+# INPUT
+# =========================
+def discover(inputs):
+    """Expand directories and glob patterns into a sorted, de-duplicated list of CSV paths."""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.update(glob.glob(os.path.join(item, '*.csv')))
+        else:
+            matches = glob.glob(item)
+            if not matches and not glob.has_magic(item):
+                raise FileNotFoundError(item)
+            paths.update(matches)
+    return sorted(paths)
+
+
+def parse_file(path):
+    """Return (stations, hourly, rejected) for one raw AWS export, unscreened (see ``quality.assess``).
+
+    ``rejected`` counts the rows whose ``Date_&_Time`` did not parse.
+    """
+    raw = clean_columns(pd.read_csv(path))
+    return (build_stations(raw),) + normalize(raw, screen=False)
+
+
+def combine(parsed):
+    """Merge per-file results into (stations, hourly, rejected), keeping every row for ``quality.assess``.
+
+    Repeated station-hours stay in so that they are flagged as duplicates;
+    later files are placed first, so their record is the one ``assess`` keeps.
+    """
+    stations = pd.concat([s for s, _, _ in parsed])
+    stations = stations[~stations.index.duplicated(keep='first')].sort_index()
+    hourly = pd.concat([h for _, h, _ in reversed(parsed)], ignore_index=True)
+    hourly = hourly.sort_values(['AWS_ID', 'DateTime'], kind='stable').reset_index(drop=True)
+    return stations, hourly, sum(r for _, _, r in parsed)
+
+
+def shard(hourly, n_shards):
+    """Split a station-sorted frame into contiguous station ranges of similar row counts."""
+    station = hourly['AWS_ID'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, station[1:] != station[:-1]])
+    if len(starts) == 0:
+        return []
+    # Cut at the station boundary closest to each equal-rows split point, looking
+    # both ways: a split point past the last station's first row falls back to it
+    # (or to the end), so one long trailing station leaves fewer, larger shards.
+    boundaries = np.r_[starts, len(hourly)]
+    targets = np.linspace(0, len(hourly), min(n_shards, len(starts)) + 1)[1:-1]
+    after = np.clip(np.searchsorted(boundaries, targets), 1, len(boundaries) - 1)
+    before = after - 1
+    nearest = np.where(targets - boundaries[before] <= boundaries[after] - targets, before, after)
+    cuts = np.unique(boundaries[nearest])
+    bounds = np.r_[0, cuts[(cuts > 0) & (cuts < len(hourly))], len(hourly)]
+    return [hourly.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+# =========================
+# ANALYSIS
+# =========================
+def analyse(hourly, event_threshold=0.0, min_gap_hours=1, max_missing_hours=0):
+    """All notebook tables for a station-sorted hourly frame (one shard or everything)."""
+    daily = build_daily(hourly)
+    return {
+        'daily': daily,
+        'hourly_profile': build_hourly_profile(hourly),
+        'events': build_events(hourly, event_threshold, min_gap_hours, max_missing_hours),
+        'rainy_days': build_rainy_days(daily),
+    }
+
+
+def _analyse_args(args):
+    return analyse(*args)
+
+
+def run(inputs, output_folder, workers=None, store_folder=None,
+        event_threshold=0.0, min_gap_hours=1, max_missing_hours=0, timer=None, chunksize=None,
+        valid_from=None, reference=None):
+    """Run the full pipeline; returns (stations, n_hourly_rows, tables, timer).
+
+    ``tables`` holds the ``OUTPUT_FILES`` tables, the ``'quality'`` report and
+    the ``'rejected'`` count of rows whose ``Date_&_Time`` did not parse.
+    With ``chunksize`` the files are streamed in bounded memory instead of being
+    loaded whole and sharded across processes (see ``rainfall.streaming``).
+    ``valid_from`` and ``reference`` bound the plausible record period (see
+    ``quality.off_grid``).
+    """
+    timer = timer or StageTimer()
+    workers = workers or os.cpu_count() or 1
+
+    with timer.stage('discover'):
+        paths = discover(inputs)
+        if not paths:
+            raise FileNotFoundError(f"No CSV files matched {inputs}")
+
+    if chunksize:
+        return run_streaming(paths, output_folder, chunksize, store_folder,
+                             event_threshold, min_gap_hours, max_missing_hours, timer, valid_from, reference)
+
+    # A single worker runs in-process; otherwise parse and analysis share one pool.
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pool_map = pool.map if pool else map
+    try:
+        with timer.stage('parse'):
+            parsed = list(pool_map(parse_file, paths))
+        with timer.stage('combine'):
+            stations, hourly, rejected = combine(parsed)
+            del parsed
+        with timer.stage('quality'):
+            hourly, _, report = assess(hourly, valid_from=valid_from, reference=reference)
+            # An input with no valid rows still yields the (empty) tables.
+            shards = shard(hourly, workers * 4) or [hourly]
+        with timer.stage('analyse'):
+            params = (event_threshold, min_gap_hours, max_missing_hours)
+            results = list(pool_map(_analyse_args, [(s,) + params for s in shards]))
+    finally:
+        if pool:
+            pool.shutdown()
+
+    with timer.stage('merge'):
+        # Shards are contiguous, ordered station ranges, so concatenation in
+        # submission order is already sorted and independent of scheduling.
+        tables = {name: pd.concat([r[name] for r in results], ignore_index=True) for name in OUTPUT_FILES}
+
+    with timer.stage('write csv'):
+        export_csv(tables, stations, output_folder)
+        attach(report, stations, front=True).to_csv(os.path.join(output_folder, QUALITY_FILE), index=False)
+        tables.update(quality=report, rejected=rejected)
+    with timer.stage('storms', len(tables['events'])):
+        export_storms(tables['events'], stations, output_folder)
+
+    if store_folder:
+        from .store import write_store
+        with timer.stage('write store'):
+            write_store(store_folder, stations, hourly=hourly[['AWS_ID', 'DateTime', 'Hourly_Rain']],
+                        event_params=params, **{name: tables[name] for name in OUTPUT_FILES})
+
+    return stations, len(hourly), tables, timer
+
+
+def run_streaming(paths, output_folder, chunksize, store_folder=None,
+                  event_threshold=0.0, min_gap_hours=1, max_missing_hours=0, timer=None,
+                  valid_from=None, reference=None):
+    from .streaming import stream
+    timer = timer or StageTimer()
+    with timer.stage('stream'):
+        stations, tables, n_rows, report, rejected = stream(paths, chunksize, event_threshold, min_gap_hours,
+                                                            max_missing_hours, store_folder, valid_from, reference)
+    with timer.stage('write csv'):
+        export_csv(tables, stations, output_folder)
+        attach(report, stations, front=True).to_csv(os.path.join(output_folder, QUALITY_FILE), index=False)
+        tables.update(quality=report, rejected=rejected)
+    with timer.stage('storms', len(tables['events'])):
+        export_storms(tables['events'], stations, output_folder)
+    return stations, n_rows, tables, timer
+
+
+def quality_summary(report):
+    """One log line with the quality report's rejected-row counts."""
+    counts = report[['Bad_Timestamps', 'Out_Of_Range', 'Invalid', 'Duplicates', 'Negative', 'Spikes', 'Stuck']].sum()
+    return "Quality screen: " + ", ".join(f"{name.replace('_', ' ').lower()} {int(count)}"
+                                          for name, count in counts.items())
+
+
+def rejected_warning(rejected):
+    """The warning for rows dropped with an unreadable timestamp, or ``None`` when there were none."""
+    if rejected:
+        return f"{rejected:,} rows with an unreadable Date_&_Time were dropped."
+    return None
+
+
+def export_csv(tables, stations, output_folder):
+    """Write the notebook's four CSVs with station metadata joined in front."""
+    os.makedirs(output_folder, exist_ok=True)
+    daily = tables['daily'][['AWS_ID', 'Date', 'Daily_Rainfall', 'Max_Hourly_Rain', 'Min_Hourly_Rain',
+                             'Hours_Rained', 'Daily_Intensity']]
+    daily = daily.assign(RainFlag=(daily['Daily_Rainfall'] > 0).astype(int))
+    frames = dict(tables, daily=daily)
+    for name, filename in OUTPUT_FILES.items():
+        attach(frames[name], stations, front=True).to_csv(os.path.join(output_folder, filename), index=False)
+
+
+def export_storms(events, stations, output_folder):
+    """Write the storms linked from the station events (see ``rainfall.storms``); returns the storm count."""
+    storms, _ = build_storms(events, stations)
+    storms.to_csv(os.path.join(output_folder, STORMS_FILE), index=False)
+    return len(storms)
+
+
+# =========================
+# COMMAND LINE
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch GHMC rainfall analysis over AWS CSV exports.")
+    parser.add_argument('inputs', nargs='+', help="CSV files, directories or glob patterns")
+    parser.add_argument('-o', '--output', default='GHMC_rainfall_analysis_outputs',
+                        help="folder for the summary CSVs (default: %(default)s)")
+    parser.add_argument('--store', default=None, help="also write the Parquet store to this folder")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--threshold', type=float, default=0.0, help="wet-hour threshold in mm (default: 0)")
+    parser.add_argument('--min-gap', type=int, default=1, help="dry hours separating events (default: 1)")
+    parser.add_argument('--max-missing', type=int, default=0,
+                        help="missing hours tolerated inside an event (default: 0)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="stream the inputs this many rows at a time in bounded memory "
+                             "(single process; files are read in name order and a station-hour "
+                             "repeated across files keeps the record read first)")
+    parser.add_argument('--valid-from', type=pd.Timestamp, default=None,
+                        help="treat records before this date as out of range (default: no lower bound)")
+    parser.add_argument('--reference', type=pd.Timestamp, default=None,
+                        help="time the exports were taken; later records are out of range "
+                             "(default: no upper bound beyond the stray-timestamp check)")
+    parser.add_argument('--profile-log', default=None,
+                        help="append the stage timings as a JSON line to this file")
+    args = parser.parse_args(argv)
+
+    stations, n_rows, tables, timer = run(args.inputs, args.output, args.workers, args.store,
+                                          args.threshold, args.min_gap, args.max_missing,
+                                          chunksize=args.chunksize, valid_from=args.valid_from,
+                                          reference=args.reference)
+    print(f"Processed {n_rows} hourly records from {len(stations)} stations")
+    if rejected_warning(tables['rejected']):
+        print(rejected_warning(tables['rejected']))
+    print(quality_summary(tables['quality']))
+    for name, filename in OUTPUT_FILES.items():
+        print(f"  {filename:<30} {len(tables[name]):>8} rows")
+    print("Stage wall time:")
+    print(timer.report())
+    if args.profile_log:
+        timer.log(args.profile_log, source='pipeline', inputs=args.inputs, hourly_rows=n_rows,
+                  workers=args.workers, chunksize=args.chunksize)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Lightweight per-stage instrumentation for the pipeline and the dashboard.
+
+A ``StageTimer`` records the wall time of named stages, the rows each one
+processed and, when asked to, the peak memory allocated during the stage
+(``tracemalloc``).  Stages may nest (a chart rendered inside a dashboard
+tab); an inner stage's peak also counts towards the stages around it.
+Records can be appended to a JSON-lines log for offline analysis::
+
+    timer = StageTimer()
+    with timer.stage('parse', rows=len(raw)):
+        ...
+    timer.log('rainfall_profile.jsonl', source='upload')
+"""
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+LOG_FILE = 'rainfall_profile.jsonl'
+
+
+def peak_rss_mb():
+    """Peak resident memory of the process so far in MB, or None where the platform does not report it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+class StageTimer:
+    """Collects wall time per named pipeline stage.
+
+    ``rows`` given to ``stage`` are summed per stage.  With ``trace_memory``
+    the peak memory allocated above the stage's starting point is recorded
+    too (via ``tracemalloc``, which slows allocation-heavy code, so timings
+    from a traced run are pessimistic).
+    """
+
+    def __init__(self, trace_memory=False):
+        self.stages = {}
+        self.rows = {}
+        self.peak_bytes = {}
+        self.trace_memory = trace_memory
+        self.started = time.perf_counter()
+        # Highest traced memory seen inside each open stage, innermost last.
+        self._open_peaks = []
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        if self.trace_memory:
+            # Resetting the peak would lose what the enclosing stages saw so far, so keep it first.
+            if self._open_peaks:
+                self._open_peaks[-1] = max(self._open_peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            self._open_peaks.append(base)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+            if rows is not None:
+                self.rows[name] = self.rows.get(name, 0) + rows
+            if self.trace_memory:
+                peak = max(self._open_peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if self._open_peaks:
+                    self._open_peaks[-1] = max(self._open_peaks[-1], peak)
+                self.peak_bytes[name] = max(self.peak_bytes.get(name, 0), peak - base)
+
+    @property
+    def elapsed(self):
+        """Wall time since the timer was created (stages may nest, so their sum can exceed it)."""
+        return time.perf_counter() - self.started
+
+    def records(self):
+        """One dict per stage: name, seconds, rows and peak MB (None where not recorded)."""
+        return [{'stage': name, 'seconds': seconds, 'rows': self.rows.get(name),
+                 'peak_mb': self.peak_bytes[name] / 2**20 if name in self.peak_bytes else None}
+                for name, seconds in self.stages.items()]
+
+    def report(self):
+        width = max(len(name) for name in self.stages) if self.stages else 0
+        lines = [f"  {name:<{width}}  {seconds:8.2f} s" for name, seconds in self.stages.items()]
+        lines.append(f"  {'total':<{width}}  {sum(self.stages.values()):8.2f} s")
+        return "\n".join(lines)
+
+    def log(self, path=LOG_FILE, **context):
+        """Append the records as one JSON line, with a timestamp, the elapsed time and ``context``."""
+        entry = {'time': datetime.now().isoformat(timespec='seconds'), **context,
+                 'elapsed_seconds': self.elapsed, 'peak_rss_mb': peak_rss_mb(), 'stages': self.records()}
+        with open(path, 'a') as f:
+            f.write(json.dumps(entry, default=str) + '\n')
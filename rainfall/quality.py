@@ -0,0 +1,362 @@
+"""Data-quality screening of the hourly series on a dense station x hour grid.
+
+Every station gets one row of the dense ``HourGrid`` (see ``rainfall.hourgrid``)
+spanning the whole record period, so an hour absent from the export is an
+empty cell rather than a silently dry one.  Each cell carries a bit mask of
+quality flags; only cells with no invalidating flag keep their reading (the
+rest become NaN and drop out of the hourly fact table), and a removed hour then
+counts as *missing* everywhere downstream (event segmentation already breaks
+events on missing hours unless told to tolerate them).
+
+Flags:
+
+* ``MISSING``    no record for the hour (inside or outside the station's span)
+* ``INVALID``    rainfall that did not parse
+* ``DUPLICATE``  several records for the hour; the first is kept (informational)
+* ``NEGATIVE``   negative rainfall
+* ``SPIKE``      rainfall above ``SPIKE_MM`` in one hour
+* ``STUCK``      the same reading of at least ``STUCK_MIN_MM`` for ``STUCK_HOURS``
+                 hours or more
+
+Rows whose timestamp cannot be used never reach the grid, and the report counts
+them per station in two columns of their own:
+
+* ``Bad_Timestamps``  the timestamp did not parse
+* ``Out_Of_Range``    the timestamp is a stray: it lies more than ``STRAY_GAP``
+                      from the rest of its station's record, in a stretch that
+                      holds at most ``STRAY_ROWS`` rows or less than
+                      ``STRAY_SHARE`` of the station's (a mistyped year).
+                      Timestamps before a caller's ``valid_from``, or after its
+                      ``reference`` time plus ``FUTURE_TOLERANCE``, count here too.
+
+The window is judged from the data and the caller's bounds only: there is no
+fixed earliest year, and nothing depends on the clock, so the same input is
+screened the same way whenever it runs.  Keeping strays off the grid bounds its
+extent, so one mistyped year cannot stretch the dense array over decades.
+"""
+import numpy as np
+import pandas as pd
+
+from .events import hour_index
+from .hourgrid import HourGrid, layout
+
+MISSING, INVALID, DUPLICATE, NEGATIVE, SPIKE, STUCK = 1, 2, 4, 8, 16, 32
+FLAG_NAMES = {MISSING: 'Missing', INVALID: 'Invalid', DUPLICATE: 'Duplicates', NEGATIVE: 'Negative',
+              SPIKE: 'Spikes', STUCK: 'Stuck'}
+# Flags that remove an hour from the analysis.
+REJECT = MISSING | INVALID | NEGATIVE | SPIKE | STUCK
+
+# Hourly depth (mm) treated as a sensor spike; well above any recorded GHMC hourly rainfall.
+SPIKE_MM = 150.0
+# Consecutive hours of an identical reading treated as a stuck sensor ...
+STUCK_HOURS = 6
+# ... when the reading is at least this deep: steady 0.25-0.5 mm/h drizzle over
+# many hours is common in tipping-bucket records and is not a fault.
+STUCK_MIN_MM = 1.0
+# A station's timestamps further than this from the rest of its record ...
+STRAY_GAP = pd.Timedelta(days=366)
+# ... in a stretch of at most this many rows, or less than this share of the
+# station's rows, are typing errors (a real record is not a week on its own).
+STRAY_ROWS = 24 * 7
+STRAY_SHARE = 0.05
+# Records this far past the caller's reference time are clock errors.
+FUTURE_TOLERANCE = pd.Timedelta(days=1)
+
+QUALITY_COLS = ['AWS_ID', 'First', 'Last', 'Expected_Hours', 'Valid_Hours', 'Missing', 'Invalid', 'Bad_Timestamps',
+                'Out_Of_Range', 'Duplicates', 'Negative', 'Spikes', 'Stuck', 'Completeness']
+# Report counts of rows kept off the grid by their timestamp.
+OFF_GRID_COLS = ['Bad_Timestamps', 'Out_Of_Range']
+
+
+def stray_times(station, datetimes, gap=STRAY_GAP, max_rows=STRAY_ROWS, share=STRAY_SHARE):
+    """Whether each parsed timestamp is a stray of its station (see the module notes).
+
+    The rows of a station are split wherever consecutive timestamps lie more
+    than ``gap`` apart; a piece is a stray when it is not the station's
+    largest and holds at most ``max_rows`` rows or less than ``share`` of the
+    station's rows.
+    """
+    datetimes = np.asarray(datetimes, dtype='datetime64[ns]')
+    parsed = np.flatnonzero(~np.isnat(datetimes))
+    stray = np.zeros(len(datetimes), dtype=bool)
+    if len(parsed) == 0:
+        return stray
+    codes = pd.factorize(np.asarray(station)[parsed])[0]
+    hours = hour_index(datetimes[parsed])
+    order = np.lexsort((hours, codes))
+    code, hour = codes[order], hours[order]
+    starts = np.r_[True, (code[1:] != code[:-1]) | (np.diff(hour) > gap // pd.Timedelta(hours=1))]
+    piece = np.cumsum(starts) - 1
+    size = np.bincount(piece)
+    largest = np.zeros(code.max() + 1, dtype=np.int64)
+    np.maximum.at(largest, code[starts], size)
+    rows = np.bincount(code)
+    small = (size[piece] <= max_rows) | (size[piece] < share * rows[code])
+    stray[parsed[order]] = (size[piece] < largest[code]) & small
+    return stray
+
+
+def off_grid(df, valid_from=None, reference=None):
+    """Per-row reason a timestamp keeps a row off the grid: ``(bad, out_of_range)`` boolean arrays.
+
+    ``valid_from`` and ``reference`` (the time the data were exported, say)
+    optionally bound the plausible period on top of the stray check.
+    """
+    datetimes = df['DateTime'].to_numpy(dtype='datetime64[ns]')
+    bad = np.isnat(datetimes)
+    out = stray_times(df['AWS_ID'].to_numpy(), datetimes)
+    if valid_from is not None:
+        out |= ~bad & (datetimes < np.datetime64(pd.Timestamp(valid_from), 'ns'))
+    if reference is not None:
+        out |= ~bad & (datetimes > np.datetime64(pd.Timestamp(reference) + FUTURE_TOLERANCE, 'ns'))
+    return bad, out
+
+
+def placeable(df, valid_from=None, reference=None):
+    """Whether each row's timestamp can be placed on the grid (see ``off_grid``)."""
+    bad, out = off_grid(df, valid_from, reference)
+    return ~(bad | out)
+
+
+def screen(df, spike_mm=SPIKE_MM, valid_from=None, reference=None):
+    """Row-level screen: drop unusable timestamps and invalid, negative or spiking rainfall.
+
+    The duplicate and stuck-sensor checks need consecutive hours and are left
+    to ``assess``.
+    """
+    rain = df['Hourly_Rain'].to_numpy(dtype=np.float64)
+    keep = placeable(df, valid_from, reference) & (rain >= 0) & (rain <= spike_mm)
+    return df[keep].reset_index(drop=True)
+
+
+def build_grid(df, spike_mm=SPIKE_MM, stuck_hours=STUCK_HOURS, stuck_min_mm=STUCK_MIN_MM,
+               valid_from=None, reference=None, off=None):
+    """Place typed hourly rows (see ``ingest.normalize``) on an ``HourGrid`` and flag them.
+
+    Returns ``(grid, unplaced)`` where ``unplaced`` counts, per station
+    (index) and ``OFF_GRID_COLS``, the rows whose timestamp did not parse or
+    is out of range; they cannot be placed on the grid.  ``off`` takes the
+    rows' ``off_grid`` masks when the caller has already computed them.
+    """
+    bad, out = off if off is not None else off_grid(df, valid_from, reference)
+    unplaced = pd.DataFrame({'Bad_Timestamps': bad, 'Out_Of_Range': out}, dtype=np.int64)
+    unplaced = unplaced.groupby(df['AWS_ID'].to_numpy()).sum()
+    unplaced = unplaced[unplaced.sum(axis=1) > 0]
+    df = df[~(bad | out)]
+
+    hours = hour_index(df['DateTime'].to_numpy())
+    cell, stations, first, n_hours = layout(df['AWS_ID'], hours)
+
+    rain = np.full(len(stations) * n_hours, np.nan)
+    flags = np.full(len(stations) * n_hours, MISSING, dtype=np.uint8)
+    cells, first_row, counts = np.unique(cell, return_index=True, return_counts=True)
+    value = df['Hourly_Rain'].to_numpy(dtype=np.float64)[first_row]
+    rain[cells] = value
+    flags[cells] = np.where(counts > 1, DUPLICATE, 0)
+    with np.errstate(invalid='ignore'):
+        flags[cells] |= np.where(np.isnan(value), INVALID, 0).astype(np.uint8)
+        flags[cells] |= np.where(value < 0, NEGATIVE, 0).astype(np.uint8)
+        flags[cells] |= np.where(value > spike_mm, SPIKE, 0).astype(np.uint8)
+    flags |= np.where(stuck_runs(rain, n_hours, stuck_hours, stuck_min_mm), STUCK, 0).astype(np.uint8)
+    # Rejected readings leave the grid; their reason stays in the flags.
+    rain[(flags & REJECT) != 0] = np.nan
+
+    shape = (len(stations), n_hours)
+    return HourGrid(stations, first, rain.astype(np.float32).reshape(shape), flags.reshape(shape)), unplaced
+
+
+def stuck_runs(rain, n_hours, stuck_hours=STUCK_HOURS, stuck_min_mm=STUCK_MIN_MM):
+    """Cells in runs of at least ``stuck_hours`` identical readings of ``stuck_min_mm`` or more along each row."""
+    positive = rain >= stuck_min_mm
+    repeat = np.zeros(len(rain), dtype=bool)
+    repeat[1:] = positive[1:] & (rain[1:] == rain[:-1])
+    # A run never continues from the previous station's row.
+    repeat[::max(n_hours, 1)] = False
+    run = np.cumsum(~repeat)
+    length = np.bincount(run)
+    return positive & (length[run] >= stuck_hours)
+
+
+def report_parts(grid, unplaced=None, stop=None):
+    """Additive per-station counts behind ``completeness``.
+
+    Each station is counted over its own first recorded hour up to its last
+    one, or up to column ``stop[i] - 1`` of its row when ``stop`` is given
+    (streaming holds the tail of each chunk back).  Stations with nothing in
+    that window are left out.  Parts of consecutive windows are merged by
+    ``merge_report_parts``.
+    """
+    recorded = (grid.flags & MISSING) == 0
+    n_hours = grid.rain.shape[1]
+    any_record = recorded.any(axis=1)
+    if n_hours == 0:
+        # No placeable row at all (an empty upload): nothing is spanned.
+        first, last = np.full(len(recorded), n_hours), np.full(len(recorded), -1)
+    else:
+        first = np.where(any_record, recorded.argmax(axis=1), n_hours)
+        last = np.where(any_record, n_hours - 1 - recorded[:, ::-1].argmax(axis=1), -1)
+    if stop is not None:
+        last = np.minimum(last, np.asarray(stop) - 1)
+    column = np.arange(n_hours)
+    in_span = (column >= first[:, None]) & (column <= last[:, None])
+
+    parts = pd.DataFrame({'AWS_ID': grid.stations, 'First_Hour': grid.first_hour + first,
+                          'Last_Hour': grid.first_hour + last,
+                          'Recorded': (recorded & in_span).sum(axis=1),
+                          'Valid_Hours': (grid.valid & in_span).sum(axis=1)})
+    for flag, name in FLAG_NAMES.items():
+        if flag != MISSING:
+            parts[name] = (((grid.flags & flag) != 0) & in_span).sum(axis=1)
+    parts = parts[last >= first].reset_index(drop=True)
+    if unplaced is not None and len(unplaced):
+        # Stations whose every row was unplaceable still get a (zero-span) row for their counts.
+        extra = unplaced.index[~unplaced.index.isin(parts['AWS_ID'])]
+        if len(extra):
+            empty = pd.DataFrame(0, index=range(len(extra)), columns=parts.columns)
+            empty['AWS_ID'] = extra
+            empty['First_Hour'], empty['Last_Hour'] = np.iinfo(np.int64).max, np.iinfo(np.int64).min
+            parts = pd.concat([parts, empty], ignore_index=True)
+    for name in OFF_GRID_COLS:
+        counts = unplaced[name] if unplaced is not None and len(unplaced) else pd.Series(dtype=np.int64)
+        parts[name] = counts.reindex(parts['AWS_ID']).fillna(0).astype(np.int64).to_numpy()
+    return parts
+
+
+def merge_report_parts(parts):
+    """Combine ``report_parts`` of several windows into one row per station."""
+    counts = [c for c in parts[0].columns if c not in ('AWS_ID', 'First_Hour', 'Last_Hour')]
+    return (pd.concat(parts, ignore_index=True)
+            .groupby('AWS_ID', observed=True, sort=True)
+            .agg(First_Hour=('First_Hour', 'min'), Last_Hour=('Last_Hour', 'max'), **{c: (c, 'sum') for c in counts})
+            .reset_index())
+
+
+def report_table(parts):
+    """Finish merged ``report_parts`` into the per-station quality report (``QUALITY_COLS``)."""
+    report = parts.copy()
+    # Stations with no placeable row have an empty span: no First/Last and nothing expected.
+    spanned = (report['Last_Hour'] >= report['First_Hour']).to_numpy()
+    for column, hours in (('First', report['First_Hour']), ('Last', report['Last_Hour'])):
+        report[column] = np.where(spanned, hours.to_numpy(), np.iinfo(np.int64).min).astype('datetime64[h]')
+        report[column] = report[column].astype('datetime64[ns]')
+    report['Expected_Hours'] = np.where(spanned, report['Last_Hour'] - report['First_Hour'] + 1, 0)
+    report['Missing'] = report['Expected_Hours'] - report['Recorded']
+    report['Completeness'] = report['Valid_Hours'] / report['Expected_Hours'].clip(lower=1)
+    return report[QUALITY_COLS]
+
+
+def completeness(grid, unplaced=None):
+    """Per-station quality report over each station's own first-to-last recorded hour."""
+    return report_table(report_parts(grid, unplaced))
+
+
+def assess(df, spike_mm=SPIKE_MM, stuck_hours=STUCK_HOURS, stuck_min_mm=STUCK_MIN_MM,
+           valid_from=None, reference=None):
+    """Screen typed hourly rows on the dense grid.
+
+    ``df`` must still hold every row as exported, duplicates included, so that
+    they are flagged (the first record of an hour is kept).  ``valid_from``
+    and ``reference`` optionally bound the plausible period (see ``off_grid``).
+    Returns ``(hourly, grid, report)``: the cleaned fact table of valid hours,
+    the flagged ``HourGrid`` and the per-station ``completeness`` report.
+    """
+    grid, unplaced = build_grid(df, spike_mm, stuck_hours, stuck_min_mm, valid_from, reference)
+    return grid.to_hourly(), grid, completeness(grid, unplaced)
+
+
+class ChunkScreen:
+    """``assess`` applied to a series read one chunk at a time.
+
+    Each chunk is placed on its own grid and flagged exactly as a whole
+    series would be, except that every station's trailing run of identical
+    readings (at least its last hour) is held back and screened again with
+    the next chunk.  A stuck run or a repeated hour that straddles a chunk
+    boundary is therefore judged on all of its rows.  Rows of one station
+    must arrive in chronological order; a row for an hour already released
+    counts as a duplicate and is dropped, so the record read first wins.
+
+    Stray timestamps are judged among the rows of the chunk (and the rows
+    held back from the previous one) rather than the whole series; the
+    ``valid_from``/``reference`` bounds apply exactly as in ``assess``.
+    """
+
+    def __init__(self, spike_mm=SPIKE_MM, stuck_hours=STUCK_HOURS, stuck_min_mm=STUCK_MIN_MM,
+                 valid_from=None, reference=None):
+        self.spike_mm, self.stuck_hours, self.stuck_min_mm = spike_mm, stuck_hours, stuck_min_mm
+        self.valid_from, self.reference = valid_from, reference
+        self.carry = None
+        # Last hour released per station.
+        self.released = pd.Series(dtype=np.int64)
+        self.parts = []
+
+    def add(self, df, final=False):
+        """Screen typed, unscreened rows (``ingest.normalize(..., screen=False)``); returns the released valid rows.
+
+        With ``final`` everything held back is released too.  Returns None
+        when there was nothing to screen.
+        """
+        df = self.carry if df is None else df[['AWS_ID', 'DateTime', 'Hourly_Rain']]
+        if df is None:
+            return None
+        if self.carry is not None and df is not self.carry:
+            df = pd.concat([self.carry, df], ignore_index=True)
+        df = df.sort_values(['AWS_ID', 'DateTime'], kind='stable').reset_index(drop=True)
+        hours = hour_index(df['DateTime'].to_numpy())
+        bad, out = off_grid(df, self.valid_from, self.reference)
+        ok = ~(bad | out)
+        late = ok & (hours <= self.released.reindex(df['AWS_ID']).fillna(-np.inf).to_numpy())
+        late_hours = df[late].assign(Hour=hours[late]).drop_duplicates(['AWS_ID', 'Hour'])
+        df, hours, ok = df[~late].reset_index(drop=True), hours[~late], ok[~late]
+
+        grid, unplaced = build_grid(df, self.spike_mm, self.stuck_hours, self.stuck_min_mm,
+                                    off=(bad[~late], out[~late]))
+        hold = np.full(len(grid.stations), np.iinfo(np.int64).max)
+        if not final and len(grid.stations):
+            hold = grid.first_hour + self._hold_columns(grid, df[ok], hours[ok])
+        parts = report_parts(grid, unplaced, np.minimum(hold - grid.first_hour, grid.rain.shape[1]))
+        if len(late_hours):
+            # Repeats of released hours only add to the duplicate count; the empty span drops out in the merge.
+            late_counts = late_hours['AWS_ID'].value_counts()
+            late_parts = pd.DataFrame(0, index=range(len(late_counts)), columns=parts.columns)
+            late_parts['AWS_ID'] = late_counts.index
+            late_parts['First_Hour'], late_parts['Last_Hour'] = np.iinfo(np.int64).max, np.iinfo(np.int64).min
+            late_parts['Duplicates'] = late_counts.to_numpy()
+            parts = pd.concat([parts, late_parts], ignore_index=True)
+        self.parts.append(parts)
+
+        held_from = pd.Series(hold, index=grid.stations)
+        held = ok & (hours >= held_from.reindex(df['AWS_ID']).to_numpy())
+        self.carry = df[held] if held.any() else None
+        released = pd.Series(np.minimum(hold - 1, grid.first_hour + grid.rain.shape[1] - 1), index=grid.stations)
+        self.released = released.combine_first(self.released)
+
+        hourly = grid.to_hourly()
+        keep = hour_index(hourly['DateTime'].to_numpy()) < held_from.reindex(hourly['AWS_ID']).to_numpy()
+        return hourly[keep].reset_index(drop=True)
+
+    def finish(self):
+        """Screen and release the rows still held back (None when there are none)."""
+        return self.add(None, final=True)
+
+    def _hold_columns(self, grid, rows, hours):
+        """Grid column where each station's trailing run of identical readings begins."""
+        code = grid.stations.get_indexer(rows['AWS_ID'])
+        value = rows['Hourly_Rain'].to_numpy(dtype=np.float64)
+        # The first record of each hour is the one on the grid.
+        first = np.r_[True, (code[1:] != code[:-1]) | (hours[1:] != hours[:-1])]
+        code, hours, value = code[first], hours[first], value[first]
+        same_station = np.r_[False, code[1:] == code[:-1]]
+        with np.errstate(invalid='ignore'):
+            continues = same_station & (np.diff(hours, prepend=0) == 1) & (value >= self.stuck_min_mm)
+            continues[1:] &= value[1:] == value[:-1]
+        run_start = hours[np.flatnonzero(~continues)][np.cumsum(~continues) - 1]
+        last = np.r_[code[1:] != code[:-1], True]
+        columns = np.full(len(grid.stations), grid.rain.shape[1])
+        columns[code[last]] = run_start[last] - grid.first_hour
+        return columns
+
+    def report(self):
+        """Quality report (``QUALITY_COLS``) of everything screened so far."""
+        if not self.parts:
+            return pd.DataFrame(columns=QUALITY_COLS)
+        return report_table(merge_report_parts(self.parts))
@@ -0,0 +1,167 @@
+"""Composable multi-criteria queries over the hourly, daily and event tables.
+
+A ``Query`` is an immutable set of predicates; ``where`` returns a copy with
+more of them, so queries can be built up step by step and reused::
+
+    monsoon = Query(seasons=['Monsoon'], start='2025-06-01', end='2025-09-30')
+    heavy = monsoon.where(circles=['Circle-18 (Jubilee Hills)'], min_rain=50)
+    heavy.run(data, 'daily')                 # in memory, on the precomputed tables
+    heavy.read('GHMC_rainfall_store', 'events')   # from the Parquet store
+
+In memory, the station and circle predicates become contiguous row ranges
+from the ``StationIndex`` of the precomputed table and the rest are boolean
+masks over those rows only.  Against the store, stations, dates, months (for
+the hourly table's Month partitions) and value thresholds are pushed down to
+``pyarrow.dataset`` and only the remaining predicates run in pandas.
+"""
+from dataclasses import dataclass, fields, replace
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from . import store
+from .rollups import membership
+from .station_analysis import SEASONS
+
+# Time, depth and intensity column of each table.
+TABLES = {
+    'hourly': {'time': 'DateTime', 'rain': 'Hourly_Rain', 'intensity': 'Hourly_Rain'},
+    'daily': {'time': 'Date', 'rain': 'Daily_Rainfall', 'intensity': 'Daily_Intensity'},
+    'events': {'time': 'Start', 'rain': 'Total_Rain', 'intensity': 'Average_Intensity'},
+}
+
+
+@dataclass(frozen=True)
+class Query:
+    """Predicates combined with AND; ``None`` leaves a criterion open.
+
+    ``circles``, ``mandals`` and ``districts`` add their stations to
+    ``stations``.  ``start``/``end`` are inclusive dates; ``months`` and
+    ``seasons`` intersect when both are given.  ``hours`` (hour of day) applies
+    to hourly rows and to event start hours.  ``min_rain``/``max_rain`` bound
+    the depth column of the table and ``min_intensity`` its intensity column;
+    ``min_duration`` applies to events only.
+    """
+    stations: tuple = None
+    circles: tuple = None
+    mandals: tuple = None
+    districts: tuple = None
+    start: object = None
+    end: object = None
+    months: tuple = None
+    seasons: tuple = None
+    hours: tuple = None
+    min_rain: float = None
+    max_rain: float = None
+    min_intensity: float = None
+    min_duration: float = None
+
+    def __post_init__(self):
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if f.type is tuple and value is not None and not isinstance(value, tuple):
+                object.__setattr__(self, f.name, tuple(value))
+
+    def where(self, **criteria):
+        """Copy of the query with more (or replaced) criteria."""
+        return replace(self, **criteria)
+
+    # ---------- resolution ----------
+    def station_ids(self, stations):
+        """AWS_IDs selected by the station and unit criteria, or None for every station."""
+        units = {'Circle': self.circles, 'Mandal': self.mandals, 'District': self.districts}
+        if self.stations is None and all(v is None for v in units.values()):
+            return None
+        members = membership(stations)
+        chosen = members.index.isin(self.stations or ())
+        for unit, names in units.items():
+            if names is not None:
+                chosen |= members[unit].isin([str(n).strip() for n in names]).to_numpy()
+        return members.index[chosen]
+
+    def month_set(self):
+        """Calendar months allowed by ``months`` and ``seasons``, or None for all."""
+        allowed = set(range(1, 13))
+        if self.months is not None:
+            allowed &= {int(m) for m in self.months}
+        if self.seasons is not None:
+            allowed &= {m for m in range(1, 13) if SEASONS[m] in self.seasons}
+        return None if allowed == set(range(1, 13)) else sorted(allowed)
+
+    def check(self, table):
+        if table not in TABLES:
+            raise ValueError(f"Unknown query table: {table}")
+        if self.hours is not None and table == 'daily':
+            raise ValueError("hour-of-day criteria do not apply to the daily table")
+        if self.min_duration is not None and table != 'events':
+            raise ValueError("min_duration applies to the events table only")
+
+    def bounds(self, table):
+        """Value criteria as ``(column, bound, is_upper)`` triples."""
+        cols = TABLES[table]
+        criteria = [(cols['rain'], self.min_rain, False), (cols['rain'], self.max_rain, True),
+                    (cols['intensity'], self.min_intensity, False), ('Duration_hrs', self.min_duration, False)]
+        return [(column, bound, upper) for column, bound, upper in criteria if bound is not None]
+
+    # ---------- evaluation ----------
+    def mask(self, frame, table, skip=()):
+        """Boolean mask of ``frame`` rows meeting the row-level criteria not listed in ``skip``."""
+        cols = TABLES[table]
+        keep = np.ones(len(frame), dtype=bool)
+        times = frame[cols['time']]
+        if 'dates' not in skip and self.start is not None:
+            keep &= (times >= pd.Timestamp(self.start).normalize()).to_numpy()
+        if 'dates' not in skip and self.end is not None:
+            keep &= (times < pd.Timestamp(self.end).normalize() + pd.Timedelta(days=1)).to_numpy()
+        months = self.month_set()
+        if 'months' not in skip and months is not None:
+            keep &= np.isin(times.dt.month.to_numpy(), months)
+        if self.hours is not None:
+            keep &= np.isin(times.dt.hour.to_numpy(), [int(h) for h in self.hours])
+        if 'values' not in skip:
+            for column, bound, upper in self.bounds(table):
+                values = frame[column].to_numpy()
+                keep &= values <= bound if upper else values >= bound
+        return keep
+
+    def run(self, data, table, event_params=(0.0, 1, 0)):
+        """Matching rows of one of the precomputed tables of a ``RainfallData``."""
+        self.check(table)
+        frame = data.events_for(*event_params) if table == 'events' else getattr(data, table)
+        ids = self.station_ids(data.stations)
+        if ids is not None:
+            index = data.station_index(table, event_params)
+            bounds = sorted(index.bounds[s] for s in ids if s in index)
+            positions = np.concatenate([np.arange(start, stop) for start, stop in bounds]) if bounds else []
+            frame = frame.iloc[positions]
+        return frame[self.mask(frame, table)]
+
+    def expression(self, table):
+        """``pyarrow.dataset`` filter for the criteria the store can evaluate while scanning.
+
+        Stations are left to ``store.read_table``, which prunes their partitions.
+        """
+        expr = store.table_filter(table, None, self.start, self.end)
+        terms = [] if expr is None else [expr]
+        months = self.month_set()
+        if months is not None and 'Month' in store.PARTITIONS[table]:
+            terms.append(ds.field('Month').isin(months))
+        for column, bound, upper in self.bounds(table):
+            terms.append(ds.field(column) <= bound if upper else ds.field(column) >= bound)
+        expr = None
+        for term in terms:
+            expr = term if expr is None else expr & term
+        return expr
+
+    def read(self, root, table, columns=None):
+        """Matching rows read from a Parquet store with predicate pushdown."""
+        self.check(table)
+        ids = self.station_ids(store.read_stations(root))
+        # Columns the in-pandas predicates need are read too and projected away afterwards.
+        needed = [TABLES[table]['time']] if columns is not None else []
+        frame = store.read_table(root, table, None if columns is None else list(dict.fromkeys(columns + needed)),
+                                 stations=ids, predicate=self.expression(table))
+        skip = ('dates', 'values', 'months') if 'Month' in store.PARTITIONS[table] else ('dates', 'values')
+        frame = frame[self.mask(frame, table, skip)].reset_index(drop=True)
+        return frame if columns is None else frame[[c for c in columns if c in frame.columns]]
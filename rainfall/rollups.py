@@ -0,0 +1,92 @@
+"""Circle, Mandal and District rollups of the station-level tables.
+
+Station membership in an administrative unit is resolved once from the
+station dimension.  Each fact row then takes an integer key
+``unit * n_times + time`` from two lookups, and the table is reduced per unit
+and time step in one sorted pass with ``ufunc.reduceat``, like the daily
+kernel in ``rainfall.daily``.
+"""
+import numpy as np
+import pandas as pd
+
+UNITS = ['Circle', 'Mandal', 'District']
+UNASSIGNED = 'Unassigned'
+ROLLUP_COLS = ['Stations', 'Stations_Reporting', 'Mean', 'Max', 'Stations_Over', 'Coverage']
+EVENT_ROLLUP_COLS = ['Stations', 'Stations_With_Events', 'Events', 'Mean_Total_Rain', 'Max_Total_Rain',
+                     'Mean_Intensity', 'Max_Intensity', 'Mean_Duration_hrs']
+
+
+def membership(stations, inside=None):
+    """Circle, Mandal and District of every station, indexed by AWS_ID.
+
+    ``inside`` (boolean, aligned to ``stations``) records whether the station
+    lies within the GHMC boundary; it is added as ``Inside_Boundary``.
+    """
+    members = pd.DataFrame(index=stations.index)
+    for unit in UNITS:
+        values = stations[unit].astype(object) if unit in stations.columns else pd.Series(np.nan, stations.index)
+        members[unit] = values.fillna(UNASSIGNED).astype(str).str.strip()
+    if inside is not None:
+        members['Inside_Boundary'] = np.asarray(inside, dtype=bool)
+    return members
+
+
+def unit_codes(members, unit, station):
+    """Unit code of each row's station and the unit names the codes index."""
+    codes, names = pd.factorize(members[unit], sort=True)
+    names = np.asarray(names, dtype=object)
+    # Stations absent from the dimension fall under 'Unassigned'.
+    if UNASSIGNED not in names:
+        names = np.append(names, UNASSIGNED)
+    position = members.index.get_indexer(pd.Index(station))
+    return np.where(position >= 0, codes[position], np.flatnonzero(names == UNASSIGNED)[0]), names
+
+
+def rollup(frame, members, unit, value, time_col, threshold=0.0):
+    """Per unit and time step: station count, reporting stations, mean, max and coverage of ``value``.
+
+    ``Stations_Over`` counts reporting stations with ``value`` above
+    ``threshold`` and ``Coverage`` is their share of the reporting stations.
+    """
+    cols = [unit, time_col] + ROLLUP_COLS
+    if frame.empty:
+        return pd.DataFrame(columns=cols)
+
+    codes, names = unit_codes(members, unit, frame['AWS_ID'].to_numpy())
+    time_codes, times = pd.factorize(frame[time_col], sort=True)
+    key = codes.astype(np.int64) * len(times) + time_codes
+    rain = frame[value].to_numpy(dtype=np.float64)
+    order = np.argsort(key, kind='stable')
+    key, rain = key[order], rain[order]
+
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    reporting = np.diff(np.r_[starts, len(key)])
+    over = np.add.reduceat((rain > threshold).astype(np.int64), starts)
+    groups = key[starts]
+    per_unit = members[unit].value_counts()
+
+    result = pd.DataFrame({unit: names[groups // len(times)], time_col: np.asarray(times)[groups % len(times)]})
+    result['Stations'] = per_unit.reindex(result[unit]).fillna(0).astype(np.int64).to_numpy()
+    result['Stations_Reporting'] = reporting
+    result['Mean'] = np.add.reduceat(rain, starts) / reporting
+    result['Max'] = np.maximum.reduceat(rain, starts)
+    result['Stations_Over'] = over
+    result['Coverage'] = over / reporting
+    return result[cols]
+
+
+def event_rollup(events, members, unit):
+    """Per unit: event counts and the mean and largest event depth, intensity and duration."""
+    codes, names = unit_codes(members, unit, events['AWS_ID'].to_numpy())
+    grouped = events.assign(**{unit: names[codes]}).groupby(unit, sort=True)
+    result = grouped.agg(
+        Stations_With_Events=('AWS_ID', 'nunique'),
+        Events=('EventID', 'size'),
+        Mean_Total_Rain=('Total_Rain', 'mean'),
+        Max_Total_Rain=('Total_Rain', 'max'),
+        Mean_Intensity=('Average_Intensity', 'mean'),
+        Max_Intensity=('Average_Intensity', 'max'),
+        Mean_Duration_hrs=('Duration_hrs', 'mean'),
+    )
+    result['Stations'] = members[unit].value_counts().reindex(result.index).fillna(0).astype(np.int64)
+    return result.rename_axis(unit).reset_index()[[unit] + EVENT_ROLLUP_COLS]
@@ -0,0 +1,132 @@
+"""Inverse-distance-weighted rainfall surfaces on a grid clipped to the GHMC boundary.
+
+Grid cells inside the boundary polygon are matched to their ``k`` nearest
+stations once, with a KD-tree over station coordinates projected to
+kilometres.  The resulting weights form a sparse cells x stations matrix, so
+the surface for a day, an event or every hour of a storm is a single sparse
+matrix product with the station values.
+"""
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+BOUNDARY_PATH = 'ghmc_boundary.shp'
+CELL_KM = 0.5
+NEIGHBOURS = 8
+POWER = 2.0
+
+# Kilometres per degree of latitude; longitude degrees shrink by cos(latitude).
+KM_PER_DEGREE = 111.32
+
+
+def load_boundary(path=BOUNDARY_PATH):
+    """Boundary of the shapefile as a single WGS84 (lon/lat) geometry."""
+    shapes = gpd.read_file(path)
+    if shapes.crs is not None:
+        shapes = shapes.to_crs(epsg=4326)
+    return shapes.geometry.union_all()
+
+
+def inside_boundary(stations, boundary):
+    """Whether each station's Latitude/Longitude falls within the boundary (False when unknown)."""
+    shapely.prepare(boundary)
+    lon = stations['Longitude'].to_numpy(dtype=np.float64)
+    lat = stations['Latitude'].to_numpy(dtype=np.float64)
+    located = np.isfinite(lon) & np.isfinite(lat)
+    inside = np.zeros(len(stations), dtype=bool)
+    inside[located] = shapely.contains_xy(boundary, lon[located], lat[located])
+    return pd.Series(inside, index=stations.index, name='Inside_Boundary')
+
+
+class IDWGrid:
+    """Precomputed IDW weights from stations to the grid cells inside a boundary.
+
+    ``stations`` is the station dimension (indexed by AWS_ID) with Latitude and
+    Longitude; stations without coordinates are left out.  ``lon`` and ``lat``
+    are the cell-centre axes of the raster and ``inside`` its boundary mask.
+    """
+
+    def __init__(self, stations, boundary, cell_km=CELL_KM, k=NEIGHBOURS, power=POWER):
+        located = stations[['Latitude', 'Longitude']].dropna()
+        if located.empty:
+            raise ValueError("no station has Latitude/Longitude")
+        self.station_ids = located.index
+        self.boundary = boundary
+
+        west, south, east, north = boundary.bounds
+        self.lat0 = (south + north) / 2
+        km_lon = KM_PER_DEGREE * np.cos(np.radians(self.lat0))
+        self.lon = np.arange(west + cell_km / km_lon / 2, east, cell_km / km_lon)
+        self.lat = np.arange(south + cell_km / KM_PER_DEGREE / 2, north, cell_km / KM_PER_DEGREE)
+        cell_lon, cell_lat = np.meshgrid(self.lon, self.lat)
+        self.inside = shapely.contains_xy(boundary, cell_lon, cell_lat)
+
+        station_xy = self.project(located['Longitude'].to_numpy(), located['Latitude'].to_numpy())
+        cell_xy = self.project(cell_lon[self.inside], cell_lat[self.inside])
+        k = min(k, len(located))
+        distance, neighbour = cKDTree(station_xy).query(cell_xy, k=k)
+        distance = distance.reshape(len(cell_xy), k)
+        neighbour = neighbour.reshape(len(cell_xy), k)
+
+        # A cell on top of a station takes that station's value alone.
+        with np.errstate(divide='ignore'):
+            weight = np.where(distance[:, :1] > 0, distance ** -power, (distance == 0).astype(np.float64))
+        weight = np.nan_to_num(weight, posinf=0.0)
+        rows = np.repeat(np.arange(len(cell_xy)), k)
+        self.weights = sparse.csr_matrix((weight.ravel(), (rows, neighbour.ravel())),
+                                         shape=(len(cell_xy), len(located)))
+
+    def project(self, lon, lat):
+        """Equirectangular kilometres around the grid centre, good enough at city scale."""
+        km_lon = KM_PER_DEGREE * np.cos(np.radians(self.lat0))
+        return np.column_stack([np.asarray(lon) * km_lon, np.asarray(lat) * KM_PER_DEGREE])
+
+    @property
+    def shape(self):
+        return len(self.lat), len(self.lon)
+
+    def interpolate(self, values):
+        """Cell values inside the boundary for station ``values``.
+
+        ``values`` is a Series indexed by AWS_ID (one surface) or a frame with
+        AWS_ID columns and one row per time step (one surface per row).
+        Missing stations drop out and their neighbours' weights are rescaled.
+        """
+        frame = values.to_frame().T if isinstance(values, pd.Series) else values
+        matrix = frame.reindex(columns=self.station_ids).to_numpy(dtype=np.float64).T
+        present = np.isfinite(matrix)
+        total = self.weights @ np.where(present, matrix, 0.0)
+        norm = self.weights @ present.astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cells = np.where(norm > 0, total / norm, np.nan)
+        return cells[:, 0] if isinstance(values, pd.Series) else cells.T
+
+    def raster(self, cells):
+        """Place interpolated cell values (last axis) on the lat x lon raster, NaN outside the boundary."""
+        cells = np.asarray(cells)
+        grid = np.full(cells.shape[:-1] + self.shape, np.nan)
+        grid[..., self.inside] = cells
+        return grid
+
+    def surface(self, values):
+        """Raster of ``values`` (see ``interpolate``)."""
+        return self.raster(self.interpolate(values))
+
+
+def station_series(frame, value, time_col=None, start=None, end=None):
+    """Station values ready for ``IDWGrid.interpolate``.
+
+    Without ``time_col`` the mean of ``value`` per station (a Series); with it,
+    a frame of ``value`` summed per time step (rows) and station (columns),
+    restricted to ``[start, end]``.
+    """
+    if time_col is None:
+        return frame.groupby('AWS_ID', observed=True)[value].mean()
+    if start is not None:
+        frame = frame[frame[time_col] >= start]
+    if end is not None:
+        frame = frame[frame[time_col] <= end]
+    return frame.pivot_table(index=time_col, columns='AWS_ID', values=value, aggfunc='sum', observed=True)
@@ -0,0 +1,73 @@
+"""Run-length encoding of daily wet/dry sequences into spells.
+
+A spell is a maximal run of consecutive calendar days at one station that are
+all wet (``Daily_Rainfall`` above the threshold) or all dry.  Runs break on a
+station change, on a wet/dry change and on any day missing from ``Date``, so a
+gap in the record never joins two spells.  All stations are encoded in one
+pass over the daily table sorted by station and date.
+"""
+import numpy as np
+import pandas as pd
+
+SPELL_COLS = ['AWS_ID', 'Wet', 'Start', 'End', 'Length_days', 'Total_Rain']
+SPELL_SUMMARY_COLS = ['AWS_ID', 'Wet_Spells', 'Mean_Wet_Spell_days', 'Longest_Wet_Spell_days',
+                      'Longest_Wet_Spell_Start', 'Longest_Wet_Spell_End', 'Dry_Spells', 'Mean_Dry_Spell_days',
+                      'Longest_Dry_Spell_days', 'Longest_Dry_Spell_Start', 'Longest_Dry_Spell_End']
+
+
+def run_bounds(station, day, wet):
+    """Start and end row positions (inclusive) of the runs in rows sorted by station and day."""
+    n = len(day)
+    if n == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    breaks = np.ones(n, dtype=bool)
+    breaks[1:] = (station[1:] != station[:-1]) | (np.diff(day) != 1) | (wet[1:] != wet[:-1])
+    starts = np.flatnonzero(breaks)
+    ends = np.r_[starts[1:] - 1, n - 1]
+    return starts, ends
+
+
+def build_spells(daily, threshold=0.0):
+    """One row per wet or dry spell, ordered by station and start date."""
+    codes, _ = pd.factorize(daily['AWS_ID'], sort=True)
+    day = daily['Date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    order = np.lexsort((day, codes))
+    codes, day = codes[order], day[order]
+    rain = daily['Daily_Rainfall'].to_numpy(dtype=np.float64)[order]
+    wet = rain > threshold
+
+    starts, ends = run_bounds(codes, day, wet)
+    dates = daily['Date'].to_numpy()[order]
+    return pd.DataFrame({
+        'AWS_ID': daily['AWS_ID'].to_numpy()[order][starts],
+        'Wet': wet[starts],
+        'Start': dates[starts],
+        'End': dates[ends],
+        'Length_days': ends - starts + 1,
+        'Total_Rain': np.add.reduceat(rain, starts) if len(starts) else np.empty(0),
+    })[SPELL_COLS]
+
+
+def spell_summary(spells):
+    """Per-station spell counts, mean and longest wet and dry spells with their dates.
+
+    Ties for the longest spell resolve to the earliest one; a station without
+    any wet (or dry) spell gets a length of 0 and no dates.
+    """
+    summary = pd.DataFrame(index=pd.Index(spells['AWS_ID'].unique(), name='AWS_ID')).sort_index()
+    for wet, label in [(True, 'Wet'), (False, 'Dry')]:
+        part = spells[spells['Wet'] == wet]
+        grouped = part.groupby('AWS_ID', observed=True)['Length_days']
+        longest = part.loc[grouped.idxmax().to_numpy()].set_index('AWS_ID')
+        summary[f'{label}_Spells'] = grouped.size().reindex(summary.index, fill_value=0)
+        summary[f'Mean_{label}_Spell_days'] = grouped.mean().reindex(summary.index, fill_value=0.0)
+        summary[f'Longest_{label}_Spell_days'] = longest['Length_days'].reindex(summary.index, fill_value=0)
+        summary[f'Longest_{label}_Spell_Start'] = longest['Start'].reindex(summary.index)
+        summary[f'Longest_{label}_Spell_End'] = longest['End'].reindex(summary.index)
+    return summary.reset_index()[SPELL_SUMMARY_COLS]
+
+
+def spell_distribution(spells):
+    """Number of wet and dry spells of each length per station."""
+    return spells.groupby(['AWS_ID', 'Wet', 'Length_days'], observed=True, sort=True).size().reset_index(name='Spells')
@@ -0,0 +1,130 @@
+"""Per-station slices and derived tables behind the dashboard's Station Analysis tab.
+
+Fact tables are sorted by AWS_ID, so each station occupies one contiguous block
+of rows.  ``StationIndex`` records those blocks once; selecting a station is a
+positional slice instead of a boolean mask over the whole table.
+"""
+import numpy as np
+import pandas as pd
+
+from .events import build_gap_events
+from .idf import build_annual_maxima, build_monthly_maxima
+from .spells import build_spells
+
+# Minimum dry gaps (hours) compared by the "Events by Hour Gap" view.
+GAP_HOURS = range(1, 7)
+
+# Average event intensity (mm/hr) above which an event counts as high-intensity.
+HIGH_INTENSITY = 5
+
+# Season of each calendar month (index 0 unused).
+SEASONS = np.array([None, 'Winter', 'Winter', 'Pre-Monsoon', 'Pre-Monsoon', 'Pre-Monsoon', 'Monsoon', 'Monsoon',
+                    'Monsoon', 'Post-Monsoon', 'Post-Monsoon', 'Post-Monsoon', 'Post-Monsoon'], dtype=object)
+
+
+class StationIndex:
+    """Contiguous row range of every station in a table grouped by ``station_col``."""
+
+    def __init__(self, frame, station_col='AWS_ID'):
+        values = frame[station_col].to_numpy()
+        starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]]) if len(values) else np.empty(0, dtype=int)
+        stops = np.r_[starts[1:], len(values)]
+        keys = values[starts].tolist()
+        if len(set(keys)) != len(keys):
+            raise ValueError(f"rows are not grouped by {station_col}")
+        self.frame = frame
+        self.bounds = dict(zip(keys, zip(starts.tolist(), stops.tolist())))
+
+    def __getitem__(self, station):
+        start, stop = self.bounds.get(station, (0, 0))
+        return self.frame.iloc[start:stop]
+
+    def __contains__(self, station):
+        return station in self.bounds
+
+
+def season(month):
+    """Season name for an array of calendar months."""
+    return SEASONS[np.asarray(month, dtype=np.int64)]
+
+
+def daily_tables(daily):
+    """Derived tables of one station's daily rows."""
+    rain_day = (daily['Daily_Rainfall'].to_numpy() > 0).astype(np.int64)
+    by_month = pd.Series(rain_day).groupby(daily['Month'].to_numpy())
+    by_season = pd.Series(rain_day).groupby(season(daily['Month']))
+    return {
+        'rainy_hours': daily[['Date', 'Hours_Rained']].reset_index(drop=True),
+        'monthly_rainy_days': by_month.sum().rename_axis('Month').reset_index(name='Rainy_Days'),
+        'seasonal_rainy_days': by_season.sum().rename_axis('Season').reset_index(name='Rainy_Days'),
+        'spells': build_spells(daily),
+    }
+
+
+def hourly_tables(hourly):
+    """Derived tables of one station's hourly rows."""
+    return {
+        'annual_maxima': build_annual_maxima(hourly),
+        'monthly_maxima': build_monthly_maxima(hourly),
+    }
+
+
+def event_tables(events, hourly, threshold=0.0, max_missing_hours=0):
+    """Derived tables of one station's events (and its hourly rows for re-segmentation)."""
+    gap_events = build_gap_events(hourly, GAP_HOURS, threshold, max_missing_hours)
+    return {
+        'events': events.assign(Month=events['Start'].dt.month),
+        'intense_events': events[events['Average_Intensity'] > HIGH_INTENSITY],
+        'same_day_gaps': same_day_gaps(events),
+        'gap_events': gap_events,
+        'gap_summary': gap_summary(gap_events),
+    }
+
+
+def same_day_gaps(events):
+    """Dry hours between consecutive events of a station that end and start on the same day.
+
+    Events are intervals sorted by start, so the gaps are the difference of
+    the start array and the end array shifted by one event.
+    """
+    station = events['AWS_ID'].to_numpy()
+    start = events['Start'].to_numpy()
+    end = events['End'].to_numpy()
+    gap = (start[1:] - end[:-1]) // np.timedelta64(1, 'h') - 1
+    same_day = ((station[1:] == station[:-1])
+                & (start[1:].astype('datetime64[D]') == end[:-1].astype('datetime64[D]')))
+    following = events.iloc[1:][same_day]
+    return pd.DataFrame({
+        'Date': following['Start'].dt.normalize(),
+        'Previous_EventID': events['EventID'].to_numpy()[:-1][same_day],
+        'EventID': following['EventID'],
+        'Previous_End': end[:-1][same_day],
+        'Start': following['Start'],
+        'Gap_hrs': gap[same_day],
+    }).reset_index(drop=True)
+
+
+def gap_summary(gap_events):
+    """Event count and mean size for each minimum dry gap."""
+    return gap_events.groupby('Min_Gap_hrs').agg(
+        Events=('EventID', 'size'),
+        Mean_Duration_hrs=('Duration_hrs', 'mean'),
+        Mean_Total_Rain=('Total_Rain', 'mean'),
+        Mean_Intensity=('Average_Intensity', 'mean'),
+        Max_Total_Rain=('Total_Rain', 'max'),
+    ).reindex(GAP_HOURS, fill_value=0).rename_axis('Min_Gap_hrs').reset_index()
+
+
+def station_maxima(hourly, daily, events):
+    """Largest hourly depth, event intensity and daily depth of every station, with when they occurred.
+
+    Ties resolve to the earliest occurrence.
+    """
+    maxima = pd.DataFrame(index=pd.Index(daily['AWS_ID'].unique(), name='AWS_ID')).sort_index()
+    for frame, value, time, label in [(hourly, 'Hourly_Rain', 'DateTime', 'Hourly'),
+                                      (events, 'Average_Intensity', 'Start', 'Event'),
+                                      (daily, 'Daily_Rainfall', 'Date', 'Daily')]:
+        top = frame.loc[frame.groupby('AWS_ID', observed=True)[value].idxmax().to_numpy()].set_index('AWS_ID')
+        maxima[f'Max_{label}'] = top[value].reindex(maxima.index, fill_value=0.0)
+        maxima[f'Max_{label}_Time'] = top[time].reindex(maxima.index)
+    return maxima
@@ -0,0 +1,47 @@
+"""Station metadata dimension table.
+
+The AWS exports repeat the station address on every hourly row.  Ingest keeps
+it once per station here; fact tables (hourly, daily, events, ...) carry only
+the compact ``AWS_ID`` key and metadata is joined back for display and export.
+"""
+import numpy as np
+import pandas as pd
+
+META_COLS = ['AWS_ID', 'District', 'Mandal', 'Location', 'Circle', 'Latitude', 'Longitude']
+TEXT_COLS = ['District', 'Mandal', 'Location', 'Circle']
+
+
+def station_key(values):
+    """Compact dtype for AWS_ID: int32 for numeric ids, category otherwise."""
+    numeric = pd.to_numeric(values, errors='coerce')
+    if not numeric.isna().any() and (numeric == numeric.round()).all():
+        return numeric.astype(np.int32)
+    return values.astype('category')
+
+
+def build_stations(df):
+    """One row per AWS_ID (first occurrence wins), indexed by AWS_ID."""
+    cols = [c for c in META_COLS if c in df.columns]
+    stations = df[cols].drop_duplicates('AWS_ID').copy()
+    stations['AWS_ID'] = station_key(stations['AWS_ID'])
+    for col in TEXT_COLS:
+        if col in stations.columns:
+            stations[col] = stations[col].astype('category')
+    for col in ['Latitude', 'Longitude']:
+        if col in stations.columns:
+            stations[col] = pd.to_numeric(stations[col], errors='coerce')
+    return stations.set_index('AWS_ID').sort_index()
+
+
+def attach(frame, stations, cols=None, front=False):
+    """Join station metadata onto a fact table keyed by AWS_ID.
+
+    Metadata columns are appended after the fact columns, or placed right after
+    ``AWS_ID`` when ``front`` is set (the layout of the exported CSVs).
+    """
+    meta = stations if cols is None else stations[cols]
+    joined = frame.join(meta, on='AWS_ID')
+    if front:
+        rest = [c for c in frame.columns if c != 'AWS_ID']
+        joined = joined[['AWS_ID'] + list(meta.columns) + rest]
+    return joined
@@ -0,0 +1,199 @@
+"""Partitioned Parquet store for the normalized hourly table and its summaries.
+
+Layout under the store root (hive-style partition directories)::
+
+    stations/                       station metadata dimension
+    hourly/Year=2025/Month=7/AWS_ID=10001/part-0.parquet
+    daily/Year=2025/AWS_ID=10001/part-0.parquet
+    events/Year=2025/AWS_ID=10001/part-0.parquet
+    hourly_profile/, rainy_days/    small per-station summaries, unpartitioned
+    profile_parts/, state/          running sums kept for incremental appends
+    _manifest.json                  write timestamp, row counts, period, event definition
+
+Reads go through ``pyarrow.dataset`` so a station/date query only opens the
+partitions (and Parquet row groups) that can match it.
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+PARTITIONS = {
+    'stations': [],
+    'hourly': ['Year', 'Month', 'AWS_ID'],
+    'daily': ['Year', 'AWS_ID'],
+    'events': ['Year', 'AWS_ID'],
+    'hourly_profile': [],
+    'rainy_days': [],
+    # Bookkeeping for incremental appends (see rainfall.incremental).
+    'profile_parts': [],
+    'state': [],
+}
+
+# Column holding the timestamp used for date-range predicates in each table.
+TIME_COLUMNS = {'hourly': 'DateTime', 'daily': 'Date', 'events': 'Start'}
+
+MANIFEST = '_manifest.json'
+
+
+# =========================
+# WRITE
+# =========================
+def write_table(root, name, frame, append=False):
+    """Write one table, replacing any partitions it touches.
+
+    With ``append`` the existing files are kept and new uniquely named files
+    are added next to them (used by the streaming ingest, one batch per chunk).
+    """
+    frame = frame.reset_index() if name == 'stations' else frame
+    keys = PARTITIONS[name]
+    if 'Year' in keys and 'Year' not in frame.columns:
+        frame = frame.assign(Year=frame[TIME_COLUMNS[name]].dt.year.astype('int16'))
+    if 'Month' in keys and 'Month' not in frame.columns:
+        frame = frame.assign(Month=frame[TIME_COLUMNS[name]].dt.month.astype('int8'))
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+
+    partitioning = ds.partitioning(pa.schema([table.schema.field(k) for k in keys]), flavor='hive') if keys else None
+    basename = f'part-{uuid.uuid4().hex}-{{i}}.parquet' if append else 'part-{i}.parquet'
+    behavior = 'overwrite_or_ignore' if append else 'delete_matching'
+    ds.write_dataset(table, os.path.join(root, name), format='parquet', partitioning=partitioning,
+                     basename_template=basename, existing_data_behavior=behavior,
+                     max_partitions=1_000_000, max_open_files=512)
+    return table.num_rows
+
+
+def replace_partitions(root, name, frame, partitions):
+    """Rewrite whole partitions: drop every listed partition, then write ``frame``.
+
+    ``partitions`` is a frame of partition-key values; unlike ``write_table``
+    this also clears partitions that end up with no rows.
+    """
+    keys = PARTITIONS[name]
+    for values in partitions[keys].drop_duplicates().itertuples(index=False):
+        path = os.path.join(root, name, *[f'{k}={v}' for k, v in zip(keys, values)])
+        shutil.rmtree(path, ignore_errors=True)
+    return write_table(root, name, frame, append=True) if len(frame) else 0
+
+
+def write_store(root, stations, period=None, rows=None, event_params=None, **tables):
+    """Persist the station dimension and any of the fact/summary tables.
+
+    ``tables`` takes keyword arguments named after ``PARTITIONS`` (``hourly=``,
+    ``daily=``, ``events=``, ``hourly_profile=``, ``rainy_days=``).  ``period``
+    and ``rows`` describe tables written separately (e.g. hourly data appended
+    chunk by chunk) for the manifest; ``event_params`` records the event
+    definition (threshold, min gap, max missing) the events were built with.
+    """
+    os.makedirs(root, exist_ok=True)
+    counts = dict(rows or {})
+    counts['stations'] = write_table(root, 'stations', stations)
+    for name, frame in tables.items():
+        if name not in PARTITIONS:
+            raise ValueError(f"Unknown store table: {name}")
+        if frame is not None:
+            counts[name] = write_table(root, name, frame)
+
+    info = {'written_at': time.time(), 'rows': counts}
+    if event_params is not None:
+        info['event_params'] = list(event_params)
+    if tables.get('hourly') is not None and len(tables['hourly']):
+        period = (tables['hourly']['DateTime'].min(), tables['hourly']['DateTime'].max())
+    if period is not None:
+        info['period'] = [str(period[0]), str(period[1])]
+    with open(os.path.join(root, MANIFEST), 'w') as f:
+        json.dump(info, f, indent=2)
+    return counts
+
+
+# =========================
+# READ
+# =========================
+def manifest(root):
+    with open(os.path.join(root, MANIFEST)) as f:
+        return json.load(f)
+
+
+def open_table(root, name):
+    """Lazy dataset handle; nothing is read until it is scanned."""
+    path = os.path.join(root, name)
+    return ds.dataset(path, format='parquet', partitioning='hive' if PARTITIONS[name] else None)
+
+
+def table_filter(name, stations=None, start=None, end=None):
+    """Predicate for a station list and an inclusive date range.
+
+    Partition keys (Year/Month/AWS_ID) are constrained alongside the timestamp
+    column so that whole directories are pruned before any file is opened.
+    """
+    expr = None
+
+    def add(term):
+        nonlocal expr
+        expr = term if expr is None else expr & term
+
+    if stations is not None:
+        add(ds.field('AWS_ID').isin(list(stations)))
+
+    time_col = TIME_COLUMNS.get(name)
+    monthly = 'Month' in PARTITIONS[name]
+    if time_col is not None and start is not None:
+        start = pd.Timestamp(start).normalize()
+        if monthly:
+            add((ds.field('Year') > start.year)
+                | ((ds.field('Year') == start.year) & (ds.field('Month') >= start.month)))
+        else:
+            add(ds.field('Year') >= start.year)
+        add(ds.field(time_col) >= start.to_datetime64())
+    if time_col is not None and end is not None:
+        end = pd.Timestamp(end).normalize()
+        if monthly:
+            add((ds.field('Year') < end.year)
+                | ((ds.field('Year') == end.year) & (ds.field('Month') <= end.month)))
+        else:
+            add(ds.field('Year') <= end.year)
+        # Dates are inclusive: keep every hour of the end day.
+        add(ds.field(time_col) < (end + pd.Timedelta(days=1)).to_datetime64())
+    return expr
+
+
+def read_stations(root):
+    return open_table(root, 'stations').to_table().to_pandas().set_index('AWS_ID').sort_index()
+
+
+def read_table(root, name, columns=None, stations=None, start=None, end=None, predicate=None):
+    """Read a table with column projection and predicate pushdown.
+
+    ``predicate`` is an extra ``pyarrow.dataset`` expression ANDed with the
+    station and date filter (see ``rainfall.query``).
+    """
+    if name == 'stations':
+        return read_stations(root)
+    dataset = open_table(root, name)
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    expr = table_filter(name, stations, start, end)
+    if predicate is not None:
+        expr = predicate if expr is None else expr & predicate
+    frame = dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+    if 'AWS_ID' in frame.columns:
+        # Partition values come back as plain ints/strings; restore the AWS_ID key dtype.
+        frame['AWS_ID'] = frame['AWS_ID'].astype(read_stations(root).index.dtype)
+    for col, dtype in (('Year', 'int16'), ('Month', 'int8')):
+        if col in frame.columns and PARTITIONS[name]:
+            frame[col] = frame[col].astype(dtype)
+
+    time_col = TIME_COLUMNS.get(name)
+    if time_col in frame.columns and 'AWS_ID' in frame.columns:
+        # Fragments arrive in partition order; restore (AWS_ID, time) order.
+        station = frame['AWS_ID']
+        station = station.cat.codes if isinstance(station.dtype, pd.CategoricalDtype) else station
+        order = np.lexsort((frame[time_col].to_numpy(), station.to_numpy()))
+        frame = frame.take(order).reset_index(drop=True)
+    return frame
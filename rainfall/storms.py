@@ -0,0 +1,228 @@
+"""Storms tracked across stations by linking overlapping, nearby rain events.
+
+Events are found per station (see ``rainfall.events``), so one citywide storm
+shows up as dozens of unrelated rows.  Two events belong to the same storm
+when their stations lie within ``radius_km`` of each other and their
+intervals overlap, allowing up to ``max_gap_hours`` between one ending and the
+other starting.  Storms are the connected components of that link graph, so
+a storm crossing the city is chained from station to station.
+
+Neighbouring stations come from a KD-tree over the station coordinates
+projected to kilometres.  Events are never compared all-pairs: they are
+sorted by (station, start), and since a station's events are disjoint their
+ends are sorted too.  The events of a neighbouring station that overlap an
+interval therefore form one contiguous run, found by binary search in the
+sorted start and end keys, which sweeps each event across its neighbours'
+time-sorted intervals.  Lookups are batched in chunks of bounded size, so the
+link search stays linear in the number of events over multi-year archives.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+from .events import EVENT_COLS, hour_index
+
+STORM_COLS = ['Storm_ID', 'Start', 'End', 'Duration_hrs', 'Stations', 'Events', 'Total_Rain', 'Mean_Rain',
+              'Max_Hourly', 'Peak_Station', 'Peak_Rain', 'Centroid_Lat', 'Centroid_Lon', 'Extent_km',
+              'Speed_kmh', 'Heading_deg']
+# Stations closer than this are neighbours whose events can join one storm.
+LINK_KM = 5.0
+# Dry hours allowed between one station's event ending and a neighbour's starting.
+LINK_GAP_HOURS = 1
+# (event, neighbouring station) lookups per batch of the link search.
+CHUNK = 1_000_000
+
+# Kilometres per degree of latitude, as in ``rainfall.spatial``.
+KM_PER_DEGREE = 111.32
+
+
+class NeighbourIndex:
+    """Station pairs within ``radius_km`` of each other, from a KD-tree over Latitude/Longitude.
+
+    ``station_ids`` are the stations with coordinates and ``xy`` their
+    equirectangular kilometres; ``pairs`` holds the (i, j) positions of every
+    neighbouring pair with i < j.  Stations without coordinates have no
+    neighbours, so each of their events is a storm of its own.
+    """
+
+    def __init__(self, stations, radius_km=LINK_KM):
+        if {'Latitude', 'Longitude'}.issubset(stations.columns):
+            located = stations[['Latitude', 'Longitude']].dropna()
+        else:
+            located = pd.DataFrame(columns=['Latitude', 'Longitude'], index=stations.index[:0])
+        self.station_ids = located.index
+        self.radius_km = radius_km
+        self.lat = located['Latitude'].to_numpy(dtype=np.float64)
+        self.lon = located['Longitude'].to_numpy(dtype=np.float64)
+        self.lat0 = self.lat.mean() if len(located) else 0.0
+        self.xy = np.column_stack([self.lon * KM_PER_DEGREE * np.cos(np.radians(self.lat0)),
+                                   self.lat * KM_PER_DEGREE])
+        if len(located) > 1:
+            self.pairs = cKDTree(self.xy).query_pairs(radius_km, output_type='ndarray').astype(np.int64)
+        else:
+            self.pairs = np.empty((0, 2), dtype=np.int64)
+        # Forward adjacency (i -> j > i), so each linked pair of events is found once.
+        self.forward = sparse.csr_matrix((np.ones(len(self.pairs)), (self.pairs[:, 0], self.pairs[:, 1])),
+                                         shape=(len(located), len(located)))
+
+    def degree(self):
+        """Neighbours per station, counting each pair once (at its lower position)."""
+        return np.diff(self.forward.indptr)
+
+
+def link_events(events, index, max_gap_hours=LINK_GAP_HOURS, chunk=CHUNK):
+    """Storm label (0-based, arbitrary order) of every row of ``events``."""
+    n = len(events)
+    code = index.station_ids.get_indexer(events['AWS_ID'])
+    start, end = hour_index(events['Start']), hour_index(events['End'])
+    located = np.flatnonzero(code >= 0)
+    if len(located) == 0:
+        return np.arange(n)
+
+    # Station-major keys: each station's events occupy one block of width ``span``,
+    # offset so that the widened query bounds stay inside the block.
+    order = located[np.lexsort((start[located], code[located]))]
+    station = code[order]
+    origin = start[order].min() - max_gap_hours - 1
+    span = end[order].max() - origin + max_gap_hours + 2
+    onset, finish = start[order] - origin, end[order] - origin
+    key_start = station * span + onset
+    key_end = station * span + finish
+
+    indptr, indices = index.forward.indptr, index.forward.indices
+    lookups = index.degree()[station]
+    batch_end = np.cumsum(lookups)
+    sources, targets = [], []
+    first = 0
+    while first < len(order):
+        last = max(int(np.searchsorted(batch_end, batch_end[first] - lookups[first] + chunk, 'right')), first + 1)
+        counts = lookups[first:last]
+        event = np.repeat(np.arange(first, last), counts)
+        # Position of each lookup within its event's neighbour list.
+        within = np.arange(len(event)) - np.repeat(np.cumsum(counts) - counts, counts)
+        neighbour = indices[indptr[station[event]] + within]
+        # Events of the neighbour ending no earlier than this one starts (less the gap) ...
+        lo = np.searchsorted(key_end, neighbour * span + onset[event] - max_gap_hours, 'left')
+        # ... and starting no later than it ends (plus the gap).
+        hi = np.searchsorted(key_start, neighbour * span + finish[event] + max_gap_hours, 'right')
+        matches = np.maximum(hi - lo, 0)
+        sources.append(np.repeat(event, matches))
+        offset = np.arange(matches.sum()) - np.repeat(np.cumsum(matches) - matches, matches)
+        targets.append(np.repeat(lo, matches) + offset)
+        first = last
+
+    source, target = np.concatenate(sources), np.concatenate(targets)
+    graph = sparse.coo_matrix((np.ones(len(source), dtype=np.int8), (source, target)),
+                              shape=(len(order), len(order)))
+    n_linked, linked = connected_components(graph, directed=False)
+    labels = np.empty(n, dtype=np.int64)
+    labels[order] = linked
+    unlocated = np.flatnonzero(code < 0)
+    labels[unlocated] = n_linked + np.arange(len(unlocated))
+    return labels
+
+
+def build_storms(events, stations, radius_km=LINK_KM, max_gap_hours=LINK_GAP_HOURS, index=None):
+    """Storm table (``STORM_COLS``) and the member events, for an event table of ``EVENT_COLS``.
+
+    Storms are numbered from 1 in order of their start.  The members are the
+    event rows with their ``Storm_ID`` added, sorted by storm and start.
+    ``Total_Rain`` sums the event depths of all member stations and
+    ``Mean_Rain`` divides it by the number of stations.  The peak station has
+    the largest depth within the storm.  Centroid and ``Extent_km`` (largest
+    station distance from it) are rain-weighted; ``Speed_kmh`` and
+    ``Heading_deg`` (compass bearing the storm moves towards) come from a
+    rain-weighted least-squares fit of station position against event onset,
+    and are NaN when every station started in the same hour.
+    """
+    index = index if index is not None else NeighbourIndex(stations, radius_km)
+    if len(events) == 0:
+        return (pd.DataFrame({c: [] for c in STORM_COLS}),
+                pd.DataFrame({c: [] for c in ['Storm_ID'] + EVENT_COLS}))
+
+    labels = link_events(events, index, max_gap_hours)
+    start, end = hour_index(events['Start']), hour_index(events['End'])
+    n_storms = labels.max() + 1
+    storm_start = np.full(n_storms, np.iinfo(np.int64).max)
+    np.minimum.at(storm_start, labels, start)
+    # Renumber the components by start time.
+    by_start = np.argsort(storm_start, kind='stable')
+    rank = np.empty(n_storms, dtype=np.int64)
+    rank[by_start] = np.arange(n_storms)
+    storm, storm_start = rank[labels], storm_start[by_start]
+
+    # Stable, so events starting together keep the table's station order.
+    order = np.lexsort((start, storm))
+    members = events.iloc[order].reset_index(drop=True)
+    members.insert(0, 'Storm_ID', storm[order] + 1)
+    storm, start, end = storm[order], start[order], end[order]
+    first = np.flatnonzero(np.r_[True, storm[1:] != storm[:-1]])
+
+    def total(values):
+        return np.bincount(storm, weights=values, minlength=n_storms)
+
+    rain = members['Total_Rain'].to_numpy(dtype=np.float64)
+    storm_end = np.maximum.reduceat(end, first)
+    per_station = members.groupby(['Storm_ID', 'AWS_ID'], observed=True, sort=False)['Total_Rain'].sum().reset_index()
+    n_stations = np.bincount(per_station['Storm_ID'].to_numpy() - 1, minlength=n_storms)
+    peak = per_station.sort_values(['Storm_ID', 'Total_Rain'], ascending=[True, False], kind='stable')
+    peak = peak.drop_duplicates('Storm_ID')
+
+    # Rain-weighted centroid, extent and drift of the located member events.
+    code = index.station_ids.get_indexer(members['AWS_ID'])
+    located = code >= 0
+    weight = np.where(located, rain, 0.0)
+    x, y = np.zeros(len(code)), np.zeros(len(code))
+    x[located], y[located] = index.xy[code[located]].T
+    onset = (start - storm_start[storm]).astype(np.float64)
+    w = total(weight)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cx, cy, ct = total(weight * x) / w, total(weight * y) / w, total(weight * onset) / w
+        dt, dx, dy = onset - ct[storm], x - cx[storm], y - cy[storm]
+        var_t = total(weight * dt * dt)
+        vx = np.where(var_t > 0, total(weight * dt * dx) / var_t, np.nan)
+        vy = np.where(var_t > 0, total(weight * dt * dy) / var_t, np.nan)
+    distance = np.where(located, np.hypot(dx, dy), -np.inf)
+    extent = np.maximum.reduceat(distance, first)
+    km_lon = KM_PER_DEGREE * np.cos(np.radians(index.lat0))
+
+    storm_rain = total(rain)
+    storms = pd.DataFrame({
+        'Storm_ID': np.arange(1, n_storms + 1),
+        'Start': storm_start.astype('datetime64[h]').astype('datetime64[ns]'),
+        'End': storm_end.astype('datetime64[h]').astype('datetime64[ns]'),
+        'Duration_hrs': storm_end - storm_start + 1,
+        'Stations': n_stations,
+        'Events': np.diff(np.r_[first, len(storm)]),
+        'Total_Rain': storm_rain,
+        'Mean_Rain': storm_rain / n_stations,
+        'Max_Hourly': np.maximum.reduceat(members['Max_Hourly'].to_numpy(dtype=np.float64), first),
+        'Peak_Station': peak['AWS_ID'].to_numpy(),
+        'Peak_Rain': peak['Total_Rain'].to_numpy(),
+        'Centroid_Lat': cy / KM_PER_DEGREE,
+        'Centroid_Lon': cx / km_lon,
+        'Extent_km': np.where(np.isfinite(extent), extent, np.nan),
+        'Speed_kmh': np.hypot(vx, vy),
+        'Heading_deg': np.degrees(np.arctan2(vx, vy)) % 360,
+    })
+    return storms, members
+
+
+def storm_track(members, index, storm_id):
+    """Member stations of one storm with coordinates, depth and onset (hours after the storm began)."""
+    lo, hi = np.searchsorted(members['Storm_ID'].to_numpy(), [storm_id, storm_id + 1])
+    events = members.iloc[lo:hi]
+    onset = hour_index(events['Start']) - hour_index(events['Start']).min()
+    track = (events.assign(Onset_hrs=onset)
+             .groupby('AWS_ID', observed=True)
+             .agg(Onset_hrs=('Onset_hrs', 'min'), Total_Rain=('Total_Rain', 'sum'),
+                  Max_Hourly=('Max_Hourly', 'max'), Events=('EventID', 'size'))
+             .reset_index())
+    position = index.station_ids.get_indexer(track['AWS_ID'])
+    located = position >= 0
+    for column, values in (('Latitude', index.lat), ('Longitude', index.lon)):
+        track[column] = np.nan
+        track.loc[located, column] = values[position[located]]
+    return track.sort_values('Onset_hrs', kind='stable').reset_index(drop=True)
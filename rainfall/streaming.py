@@ -0,0 +1,216 @@
+"""Chunked streaming ingest for AWS exports larger than memory.
+
+The file is read ``chunksize`` rows at a time with explicit dtypes and only the
+columns the analysis needs.  Values are read as text and typed by
+``ingest.normalize``, so a stray token ('-', 'NA*', 'Trace') becomes an
+invalid reading instead of aborting the run.  Each chunk goes through the
+same quality screen as a whole-file load (``quality.ChunkScreen``, which holds
+each station's trailing rows back until the next chunk so runs and repeated
+hours across a boundary are judged whole) and the valid rows are folded into
+running accumulators:
+
+* station-day partial sums (merged with associative reductions),
+* station x hour-of-day profile sums,
+* finished rain events, plus the rows of each station's still-open event,
+  which are carried into the next chunk so events spanning a chunk boundary
+  are segmented exactly as in a whole-file run.
+
+Rows of one station must appear in chronological order (the layout of the
+GHMC exports); stations may be interleaved.  A row for an hour that has
+already been released counts as a duplicate and is dropped, so a
+station-hour repeated across files keeps the record read first (the
+in-memory pipeline keeps the later file's).  Peak memory is bounded by the
+chunk size plus the station-day accumulator, independent of the file size.
+"""
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from . import store
+from .daily import daily_parts, daily_table, merge_parts
+from .events import build_events, hour_index, segment
+from .ingest import normalize
+from .quality import ChunkScreen
+from .stations import META_COLS, build_stations
+from .summaries import build_rainy_days, hourly_profile_parts, hourly_profile_table
+
+CHUNK_ROWS = 500_000
+
+# Cleaned column name -> dtype used while reading.
+READ_DTYPES = {
+    'AWS_ID': 'str',
+    'District': 'category',
+    'Mandal': 'category',
+    'Location': 'category',
+    'Circle': 'category',
+    'Latitude': 'str',
+    'Longitude': 'str',
+    'Date_&_Time': 'str',
+    'Hourly__Rainfall_(mm)': 'str',
+}
+
+
+def _clean(name):
+    return name.strip().replace('\n', ' ').replace(' ', '_')
+
+
+def _empty_chunk():
+    """A normalized hourly chunk with no rows."""
+    return normalize(pd.DataFrame({c: pd.Series([], dtype=str)
+                                   for c in ['AWS_ID', 'Date_&_Time', 'Hourly__Rainfall_(mm)']}))[0]
+
+
+class StreamAccumulator:
+    """Running daily, hourly-profile and event state fed one normalized chunk at a time."""
+
+    def __init__(self, event_threshold=0.0, min_gap_hours=1, max_missing_hours=0):
+        self.event_params = (event_threshold, min_gap_hours, max_missing_hours)
+        self.daily = None
+        self.profile = None
+        self.events = []
+        self.carry = None
+        self.emitted = pd.Series(dtype=np.int64)
+        self.rows = 0
+
+    def add(self, hourly):
+        """Fold a normalized hourly chunk (see ``ingest.normalize``) into the state."""
+        self.rows += len(hourly)
+        parts = daily_parts(hourly)
+        self.daily = parts if self.daily is None else merge_parts([self.daily, parts])
+        parts = hourly_profile_parts(hourly)
+        self.profile = parts if self.profile is None else (
+            pd.concat([self.profile, parts]).groupby(['AWS_ID', 'Hour'], observed=True, sort=True).sum().reset_index())
+        self._add_events(hourly[['AWS_ID', 'DateTime', 'Hourly_Rain']])
+
+    def _add_events(self, hourly, final=False):
+        if self.carry is not None:
+            hourly = pd.concat([self.carry, hourly], ignore_index=True)
+        hourly = hourly.sort_values(['AWS_ID', 'DateTime'], kind='stable').reset_index(drop=True)
+        station = hourly['AWS_ID'].to_numpy()
+        hours = hour_index(hourly['DateTime'].to_numpy())
+        seg = segment(station, hours, hourly['Hourly_Rain'].to_numpy(), *self.event_params)
+
+        keep = np.ones(len(seg['start']), dtype=bool)
+        carry_rows = np.empty(0, dtype=np.int64)
+        if not final and len(seg['start']):
+            # The last event of a station stays open while fewer than min_gap_hours
+            # separate its end from the station's last row in this chunk.
+            ev_station = seg['station']
+            last_event = np.r_[ev_station[1:] != ev_station[:-1], True]
+            last_row = np.r_[np.flatnonzero(station[1:] != station[:-1]), len(station) - 1]
+            station_last_row = pd.Series(last_row, index=station[last_row])
+            tail = station_last_row.loc[ev_station[last_event]].to_numpy()
+            open_ = hours[tail] - hours[seg['end'][last_event]] < self.event_params[1]
+            open_idx = np.flatnonzero(last_event)[open_]
+            keep[open_idx] = False
+            carry_rows = np.concatenate([np.arange(seg['start'][i], t + 1)
+                                         for i, t in zip(open_idx, tail[open_])] or [carry_rows])
+        self.carry = hourly.iloc[carry_rows] if len(carry_rows) else None
+
+        if keep.any():
+            ev_station = seg['station'][keep]
+            offset = self.emitted.reindex(ev_station, fill_value=0).to_numpy()
+            datetimes = hourly['DateTime'].to_numpy()
+            self.events.append(pd.DataFrame({
+                'AWS_ID': ev_station,
+                'EventID': seg['event_id'][keep] + offset,
+                'Start': datetimes[seg['start'][keep]],
+                'End': datetimes[seg['end'][keep]],
+                'Duration_hrs': seg['duration'][keep],
+                'Total_Rain': seg['total'][keep],
+                'Max_Hourly': seg['peak'][keep],
+                'Average_Intensity': seg['intensity'][keep],
+            }))
+            counts = pd.Series(ev_station).value_counts()
+            self.emitted = self.emitted.add(counts, fill_value=0).astype(np.int64)
+
+    def finish(self):
+        """Close open events and return the notebook tables."""
+        if self.daily is None:
+            # Nothing valid was read: an empty chunk gives the tables their columns.
+            self.add(_empty_chunk())
+        if self.carry is not None:
+            carry, self.carry = self.carry, None
+            self._add_events(carry, final=True)
+        daily = daily_table(self.daily)
+        events = pd.concat(self.events, ignore_index=True) if self.events else build_events(_empty_chunk())
+        events = events.sort_values(['AWS_ID', 'Start'], kind='stable').reset_index(drop=True)
+        return {
+            'daily': daily,
+            'hourly_profile': hourly_profile_table(self.profile),
+            'events': events,
+            'rainy_days': build_rainy_days(daily),
+        }
+
+
+def iter_chunks(path, chunksize=CHUNK_ROWS):
+    """Yield raw chunks with cleaned column names, reading only the needed columns."""
+    header = pd.read_csv(path, nrows=0).columns
+    raw_names = {_clean(c): c for c in header}
+    usecols = [raw_names[c] for c in READ_DTYPES if c in raw_names]
+    dtypes = {raw_names[c]: t for c, t in READ_DTYPES.items() if c in raw_names}
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+        chunk.columns = [_clean(c) for c in chunk.columns]
+        yield chunk
+
+
+def stream(paths, chunksize=CHUNK_ROWS, event_threshold=0.0, min_gap_hours=1, max_missing_hours=0,
+           store_folder=None, valid_from=None, reference=None):
+    """Analyse one or more CSVs in bounded memory; returns (stations, tables, n_rows, report, rejected).
+
+    ``report`` is the per-station quality report (``quality.QUALITY_COLS``);
+    ``n_rows`` counts the valid hourly rows kept and ``rejected`` the rows
+    whose ``Date_&_Time`` did not parse.  ``valid_from`` and
+    ``reference`` bound the plausible record period (see ``quality.ChunkScreen``).
+
+    Files are read in the given order through a single accumulator, so events
+    and wet spells continue across file boundaries as well as chunk boundaries.
+    With ``store_folder`` the normalized hourly chunks are appended to the
+    Parquet store as they are read and the summaries are written at the end.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    if store_folder:
+        shutil.rmtree(os.path.join(store_folder, 'hourly'), ignore_errors=True)
+
+    acc = StreamAccumulator(event_threshold, min_gap_hours, max_missing_hours)
+    screen = ChunkScreen(valid_from=valid_from, reference=reference)
+    station_rows = []
+    seen = set()
+    period = None
+    rejected = 0
+
+    def fold(hourly):
+        nonlocal period
+        if hourly is None or not len(hourly):
+            return
+        acc.add(hourly)
+        lo, hi = hourly['DateTime'].min(), hourly['DateTime'].max()
+        period = (lo, hi) if period is None else (min(period[0], lo), max(period[1], hi))
+        if store_folder:
+            store.write_table(store_folder, 'hourly', hourly[['AWS_ID', 'DateTime', 'Hourly_Rain', 'Year', 'Month']],
+                              append=True)
+
+    for path in paths:
+        for chunk in iter_chunks(path, chunksize):
+            # Metadata is kept only for the first row of each newly seen station.
+            firsts = chunk.drop_duplicates('AWS_ID')
+            firsts = firsts[~firsts['AWS_ID'].isin(seen)]
+            if len(firsts):
+                seen.update(firsts['AWS_ID'])
+                station_rows.append(firsts[[c for c in META_COLS if c in firsts.columns]])
+            typed, unparsed = normalize(chunk, screen=False)
+            rejected += unparsed
+            fold(screen.add(typed))
+    fold(screen.finish())
+
+    # A header-only file yields no chunks, so there may be no station rows at all.
+    stations = build_stations(pd.concat(station_rows, ignore_index=True) if station_rows
+                              else pd.DataFrame({'AWS_ID': pd.Series([], dtype=str)}))
+    tables = acc.finish()
+    if store_folder:
+        store.write_store(store_folder, stations, period=period, rows={'hourly': acc.rows},
+                          event_params=acc.event_params, **tables)
+    return stations, tables, acc.rows, screen.report(), rejected
@@ -0,0 +1,54 @@
+"""Per-station summary tables exported by the analysis notebook."""
+import numpy as np
+import pandas as pd
+
+from .spells import build_spells, spell_summary
+
+HOURLY_PROFILE_COLS = ['AWS_ID', 'Hour', 'Mean_Hourly_Rain', 'Rainy_Hour_Intensity', 'Rainy_Hour_Frequency']
+RAINY_DAYS_COLS = ['AWS_ID', 'Total_Rainy_Days', 'Mean_Daily_Rain', 'Max_Daily_Rain', 'Mean_Intensity',
+                   'Longest_Wet_Spell_days']
+
+
+def hourly_profile_parts(hourly):
+    """Mergeable per station and hour-of-day sums behind the hourly profile."""
+    rain = hourly['Hourly_Rain'].to_numpy(dtype=np.float64)
+    wet = rain > 0
+    parts = pd.DataFrame({
+        'AWS_ID': hourly['AWS_ID'].to_numpy(),
+        'Hour': hourly['DateTime'].dt.hour.to_numpy(),
+        'rain': rain,
+        'wet': wet.astype(np.int64),
+        'wet_rain': np.where(wet, rain, 0.0),
+    })
+    return parts.groupby(['AWS_ID', 'Hour'], observed=True, sort=True).agg(
+        total=('rain', 'sum'), hours=('rain', 'size'), wet=('wet', 'sum'), wet_rain=('wet_rain', 'sum')
+    ).reset_index()
+
+
+def hourly_profile_table(parts):
+    """Finish (possibly merged) hourly-profile parts into the exported table."""
+    profile = parts[['AWS_ID', 'Hour']].copy()
+    profile['Mean_Hourly_Rain'] = parts['total'] / parts['hours']
+    profile['Rainy_Hour_Intensity'] = np.divide(parts['wet_rain'], parts['wet'],
+                                                out=np.zeros(len(parts)), where=parts['wet'] > 0)
+    profile['Rainy_Hour_Frequency'] = parts['wet']
+    return profile[HOURLY_PROFILE_COLS]
+
+
+def build_hourly_profile(hourly):
+    """Mean diurnal pattern per station and hour of day."""
+    return hourly_profile_table(hourly_profile_parts(hourly))
+
+
+def build_rainy_days(daily):
+    """Rainy-day counts, intensities and longest wet spell (in consecutive calendar days) per station."""
+    rainy_days = daily[daily['Daily_Rainfall'] > 0].groupby('AWS_ID', observed=True).agg(
+        Total_Rainy_Days=('Date', 'count'),
+        Mean_Daily_Rain=('Daily_Rainfall', 'mean'),
+        Max_Daily_Rain=('Daily_Rainfall', 'max'),
+        Mean_Intensity=('Daily_Intensity', 'mean')
+    ).reset_index()
+
+    wetspell = spell_summary(build_spells(daily))[['AWS_ID', 'Longest_Wet_Spell_days']]
+    rainy_days = rainy_days.merge(wetspell, on='AWS_ID', how='left')
+    return rainy_days[RAINY_DAYS_COLS]
@@ -0,0 +1,168 @@
+"""Seeded synthetic AWS exports shaped like the GHMC network.
+
+Rain falls from storms rather than from independent station-hours, so the
+series has the intermittency, clustering and spatial coherence of the real
+record: about 157 stations inside the GHMC bounding box and on the order of
+23,000 station events a year, concentrated in the June-October monsoon and
+in the afternoon and evening.
+
+Each storm has a start hour, a duration, a centre that moves at a constant
+velocity, a radius and a peak depth.  A station under the storm reports
+rain in an hour with probability ``WET_SHARE`` and a depth that falls off with
+its distance from the centre, rounded to the 0.25 mm tipping-bucket step.
+Stations also drop random hours and go offline for multi-hour outages, so
+the quality screen and missing-hour handling are exercised too.
+
+Every year is drawn from its own seeded generator, so a 10-year dataset
+contains the 1-year dataset as its last year::
+
+    paths = write_dataset('bench_data/1x', years=1, seed=0)
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+STATIONS = 157
+FIRST_ID = 10001
+# Last year of every generated record; longer records extend backwards from it.
+LAST_YEAR = 2025
+# GHMC bounding box: south, west, north, east (degrees).
+BBOX = (17.25, 78.25, 17.60, 78.65)
+KM_PER_DEGREE = 111.32
+
+STORMS_PER_YEAR = 300
+# Share of storms per calendar month, after the Hyderabad monthly rainfall climatology (mm).
+MONTH_WEIGHTS = np.array([9, 7, 14, 24, 33, 107, 166, 191, 165, 104, 26, 6], dtype=np.float64)
+# Storm starts per hour of day: convective storms peak in the afternoon and evening.
+HOUR_WEIGHTS = np.array([3, 3, 2, 2, 2, 2, 2, 2, 2, 2, 3, 3, 4, 5, 7, 9, 10, 10, 9, 8, 6, 5, 4, 3],
+                        dtype=np.float64)
+STORM_HOURS = 4.0
+STORM_RADIUS_KM = (3.0, 15.0)
+STORM_SPEED_KMH = 20.0
+# Mean peak hourly depth (mm) at a storm centre.
+PEAK_MM = 8.0
+WET_SHARE = 0.85
+TIP_MM = 0.25
+# Share of station-hours missing from the export, and outages per station and year.
+MISSING_SHARE = 0.005
+OUTAGES_PER_YEAR = 2.0
+OUTAGE_HOURS = 24.0
+
+COLUMNS = ['AWS_ID', 'Date_&_Time', 'Latitude', 'Longitude', 'Hourly__Rainfall_(mm)']
+TIME_FORMAT = '%d-%m-%Y %H:%M'
+
+
+def station_table(n_stations=STATIONS, seed=0):
+    """AWS_ID, Latitude and Longitude of ``n_stations`` stations spread over ``BBOX``."""
+    rng = np.random.default_rng([seed, 0])
+    south, west, north, east = BBOX
+    return pd.DataFrame({
+        'AWS_ID': FIRST_ID + np.arange(n_stations),
+        'Latitude': np.round(rng.uniform(south, north, n_stations), 6),
+        'Longitude': np.round(rng.uniform(west, east, n_stations), 6),
+    })
+
+
+def storms(year, seed=0):
+    """Storms of one year: start hour (from the year start), duration, centre, velocity, radius and peak."""
+    rng = np.random.default_rng([seed, year])
+    first_day = np.datetime64(f'{year}-01-01', 'D')
+    month_start = (np.arange(f'{year}-01', f'{year + 1}-01', dtype='datetime64[M]').astype('datetime64[D]')
+                   - first_day).astype(np.int64)
+    month_days = np.diff(np.r_[month_start, (np.datetime64(f'{year + 1}-01-01', 'D') - first_day).astype(np.int64)])
+
+    n = rng.poisson(STORMS_PER_YEAR)
+    month = rng.choice(12, n, p=MONTH_WEIGHTS / MONTH_WEIGHTS.sum())
+    day = month_start[month] + rng.integers(0, month_days[month])
+    hour = rng.choice(24, n, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    south, west, north, east = BBOX
+    heading = rng.uniform(0, 2 * np.pi, n)
+    speed = rng.uniform(0, STORM_SPEED_KMH, n)
+    frame = pd.DataFrame({
+        'Start': day * 24 + hour,
+        'Duration': rng.geometric(1 / STORM_HOURS, n),
+        # Centres fall up to 0.1 degree outside the box so some storms only clip the edge.
+        'Latitude': rng.uniform(south - 0.1, north + 0.1, n),
+        'Longitude': rng.uniform(west - 0.1, east + 0.1, n),
+        'East_kmh': speed * np.cos(heading),
+        'North_kmh': speed * np.sin(heading),
+        'Radius_km': rng.uniform(*STORM_RADIUS_KM, n),
+        'Peak_mm': rng.gamma(2.0, PEAK_MM / 2.0, n),
+    })
+    return frame.sort_values('Start', kind='stable').reset_index(drop=True)
+
+
+def year_rain(stations, year, seed=0):
+    """Dense ``(n_stations, hours_in_year)`` rainfall of one year; NaN marks hours missing from the export."""
+    rng = np.random.default_rng([seed, year, 1])
+    n_hours = int((np.datetime64(f'{year + 1}-01-01', 'h') - np.datetime64(f'{year}-01-01', 'h'))
+                  .astype(np.int64))
+    rain = np.zeros((len(stations), n_hours))
+    s = storms(year, seed)
+
+    # One row per storm-hour, then one column per station.
+    duration = s['Duration'].to_numpy()
+    storm = np.repeat(np.arange(len(s)), duration)
+    step = np.arange(len(storm)) - np.repeat(np.cumsum(duration) - duration, duration)
+    hour = s['Start'].to_numpy()[storm] + step
+    km_lon = KM_PER_DEGREE * np.cos(np.radians((BBOX[0] + BBOX[2]) / 2))
+    centre_x = s['Longitude'].to_numpy()[storm] * km_lon + s['East_kmh'].to_numpy()[storm] * step
+    centre_y = s['Latitude'].to_numpy()[storm] * KM_PER_DEGREE + s['North_kmh'].to_numpy()[storm] * step
+    dx = stations['Longitude'].to_numpy()[None, :] * km_lon - centre_x[:, None]
+    dy = stations['Latitude'].to_numpy()[None, :] * KM_PER_DEGREE - centre_y[:, None]
+    distance = np.hypot(dx, dy) / s['Radius_km'].to_numpy()[storm][:, None]
+    # Storms build up and decay over their duration.
+    envelope = np.sin(np.pi * (step + 0.5) / duration[storm])
+    depth = (s['Peak_mm'].to_numpy()[storm] * envelope)[:, None] * np.exp(-distance ** 2)
+    depth *= rng.gamma(2.0, 0.5, depth.shape)
+    wet = (distance < 2.0) & (rng.random(depth.shape) < WET_SHARE) & (hour[:, None] < n_hours)
+    storm_hour, station = np.nonzero(wet)
+    np.add.at(rain, (station, hour[storm_hour]), depth[storm_hour, station])
+    rain = np.round(rain / TIP_MM) * TIP_MM
+
+    # Outages: runs of hours with no record, marked on a difference array.
+    n_out = rng.poisson(OUTAGES_PER_YEAR * len(stations))
+    edges = np.zeros((len(stations), n_hours + 1), dtype=np.int64)
+    out_station = rng.integers(0, len(stations), n_out)
+    out_start = rng.integers(0, n_hours, n_out)
+    np.add.at(edges, (out_station, out_start), 1)
+    np.add.at(edges, (out_station, np.minimum(out_start + rng.geometric(1 / OUTAGE_HOURS, n_out), n_hours)), -1)
+    offline = np.cumsum(edges, axis=1)[:, :n_hours] > 0
+    rain[offline | (rng.random(rain.shape) < MISSING_SHARE)] = np.nan
+    return rain
+
+
+def year_frame(stations, year, seed=0):
+    """One year of hourly rows in the raw export layout (``COLUMNS``), ordered by station and time."""
+    rain = year_rain(stations, year, seed)
+    station, hour = np.nonzero(~np.isnan(rain))
+    # Format each hour label once and broadcast it to the rows.
+    labels = pd.date_range(f'{year}-01-01', periods=rain.shape[1], freq='h').strftime(TIME_FORMAT).to_numpy()
+    return pd.DataFrame({
+        'AWS_ID': stations['AWS_ID'].to_numpy()[station],
+        'Date_&_Time': labels[hour],
+        'Latitude': stations['Latitude'].to_numpy()[station],
+        'Longitude': stations['Longitude'].to_numpy()[station],
+        'Hourly__Rainfall_(mm)': rain[station, hour],
+    })[COLUMNS]
+
+
+def write_dataset(folder, years=1, n_stations=STATIONS, seed=0, last_year=LAST_YEAR):
+    """Write one CSV per year for ``years`` years ending at ``last_year``; returns the paths.
+
+    Files already present are kept, so a dataset is generated once and reused.
+    """
+    os.makedirs(folder, exist_ok=True)
+    stations = station_table(n_stations, seed)
+    paths = []
+    for year in range(last_year - years + 1, last_year + 1):
+        path = os.path.join(folder, f'synthetic_ghmc_{year}.csv')
+        if not os.path.exists(path):
+            # Written under a temporary name so an interrupted run never leaves a partial file to reuse.
+            # No float_format: it would also round the 6-decimal coordinates, and
+            # depths on the 0.25 mm step already print exactly.
+            year_frame(stations, year, seed).to_csv(path + '.tmp', index=False)
+            os.replace(path + '.tmp', path)
+        paths.append(path)
+    return paths
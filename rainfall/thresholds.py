@@ -0,0 +1,49 @@
+"""Sorted-value indexes for ``column >= threshold`` queries.
+
+Each index holds the row positions of a table ordered by one column (a stable
+argsort, computed once).  The rows at or above any threshold are then a
+suffix of that order found by ``searchsorted``, so counting them is a binary
+search and selecting them touches only the matching rows.
+"""
+import numpy as np
+import pandas as pd
+
+# Columns indexed per table by ``RainfallData.threshold_index``.
+INDEXED = {'hourly': ['Hourly_Rain'], 'daily': ['Daily_Rainfall'], 'events': ['Total_Rain', 'Duration_hrs']}
+
+
+class ThresholdIndex:
+    """Rows of ``frame`` ordered by ``column``."""
+
+    def __init__(self, frame, column):
+        values = frame[column].to_numpy(dtype=np.float64)
+        self.frame = frame
+        self.column = column
+        # NaN sorts last; it never meets a threshold, so it is left out of the index.
+        order = np.argsort(values, kind='stable')
+        self.order = order[:np.count_nonzero(~np.isnan(values))]
+        self.values = values[self.order]
+
+    def __len__(self):
+        return len(self.values)
+
+    def start(self, threshold):
+        """Position in the sorted order of the first value ``>= threshold``."""
+        return int(np.searchsorted(self.values, threshold, side='left'))
+
+    def count(self, threshold):
+        """Number of rows with ``column >= threshold``."""
+        return len(self.values) - self.start(threshold)
+
+    def positions(self, threshold):
+        """Row positions with ``column >= threshold``, in table order."""
+        return np.sort(self.order[self.start(threshold):])
+
+    def select(self, threshold):
+        """Rows with ``column >= threshold``, in table order (same result as a boolean mask)."""
+        return self.frame.iloc[self.positions(threshold)]
+
+    def exceedance(self):
+        """Number of rows at or above each distinct value: the count-versus-threshold curve."""
+        thresholds, first = np.unique(self.values, return_index=True)
+        return pd.DataFrame({'Threshold': thresholds, 'Count': len(self.values) - first})
@@ -0,0 +1,141 @@
+"""Fast parsing of the fixed-layout timestamps of the AWS exports.
+
+A year of hourly records repeats each timestamp string once per station, so
+the column is factorized first and only its distinct strings are decoded.
+Those are read as fixed-width text: the characters are viewed as a
+``(n, width)`` array of code points, the digit fields are folded into
+integers and turned into minutes since the epoch with integer calendar
+arithmetic, then broadcast back to the rows through the factorize codes.
+Strings that do not match the layout (unpadded fields, stray text) fall back
+to ``pd.to_datetime`` with the same format, so results are identical to
+parsing the whole column with pandas; only the distinct strings pay for it.
+"""
+import numpy as np
+import pandas as pd
+
+AWS_FORMAT = '%d-%m-%Y %H:%M'
+
+# Format -> (width, field slices, separator positions) of the fixed-width layouts.
+LAYOUTS = {
+    '%d-%m-%Y %H:%M': (16, {'day': (0, 2), 'month': (3, 5), 'year': (6, 10), 'hour': (11, 13), 'minute': (14, 16)},
+                       {2: '-', 5: '-', 10: ' ', 13: ':'}),
+    '%Y-%m-%d %H:%M': (16, {'year': (0, 4), 'month': (5, 7), 'day': (8, 10), 'hour': (11, 13), 'minute': (14, 16)},
+                       {4: '-', 7: '-', 10: ' ', 13: ':'}),
+    '%d-%m-%Y': (10, {'day': (0, 2), 'month': (3, 5), 'year': (6, 10)}, {2: '-', 5: '-'}),
+    '%Y-%m-%d': (10, {'year': (0, 4), 'month': (5, 7), 'day': (8, 10)}, {4: '-', 7: '-'}),
+}
+# Layouts tried, in order, for the date column of the legacy ``date``/``hour`` schema.
+DATE_FORMATS = ['%Y-%m-%d', '%d-%m-%Y']
+
+NAT = np.iinfo(np.int64).min
+
+
+def days_from_civil(year, month, day):
+    """Days since 1970-01-01 of proleptic Gregorian dates (integer arrays)."""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def decode_fixed(text, fmt):
+    """Minutes since the epoch of strings in a fixed-width layout; ``NAT`` where a string does not match.
+
+    ``text`` is an array of str.
+    """
+    width, fields, separators = LAYOUTS[fmt]
+    text = np.asarray(text, dtype=str)
+    minutes = np.full(len(text), NAT, dtype=np.int64)
+    fits = np.char.str_len(text) == width
+    if not fits.any():
+        return minutes
+
+    chars = text[fits].astype(f'U{width}').view(np.uint32).reshape(-1, width).astype(np.int64)
+    ok = np.ones(len(chars), dtype=bool)
+    for position, separator in separators.items():
+        ok &= chars[:, position] == ord(separator)
+    digits = chars - ord('0')
+    value = {}
+    for name, (start, stop) in fields.items():
+        part = digits[:, start:stop]
+        ok &= ((part >= 0) & (part <= 9)).all(axis=1)
+        value[name] = part @ (10 ** np.arange(stop - start - 1, -1, -1))
+    year, month, day = value['year'], value['month'], value['day']
+    hour, minute = value.get('hour', 0), value.get('minute', 0)
+
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (hour <= 23) & (minute <= 59)
+    month = np.clip(month, 1, 12)
+    days = days_from_civil(year, month, day)
+    next_month = days_from_civil(year + (month == 12), month % 12 + 1, 1)
+    ok &= days < next_month
+
+    minutes[np.flatnonzero(fits)[ok]] = (days * 1440 + hour * 60 + minute)[ok]
+    return minutes
+
+
+def _to_datetimes(minutes):
+    ns = np.full(len(minutes), NAT, dtype=np.int64)
+    known = minutes != NAT
+    ns[known] = minutes[known] * 60_000_000_000
+    return ns.view('datetime64[ns]')
+
+
+def _decode_unique(uniques, formats, fallback_format=None):
+    """datetime64[ns] of distinct strings: the fixed layouts first, ``pd.to_datetime`` for the rest."""
+    text = np.asarray(uniques, dtype=str)
+    minutes = np.full(len(text), NAT, dtype=np.int64)
+    for fmt in formats:
+        todo = minutes == NAT
+        if not todo.any():
+            break
+        minutes[todo] = decode_fixed(text[todo], fmt)
+    result = _to_datetimes(minutes)
+    todo = np.flatnonzero(minutes == NAT)
+    if len(todo):
+        result[todo] = pd.to_datetime(pd.Series(np.asarray(uniques, dtype=object)[todo]), format=fallback_format,
+                                      errors='coerce').to_numpy(dtype='datetime64[ns]')
+    return result
+
+
+def parse_column(values, formats=(AWS_FORMAT,), fallback_format=AWS_FORMAT):
+    """Parse a timestamp column once per distinct string.
+
+    Returns ``(datetimes, rejected)``: a datetime64[ns] array aligned with
+    ``values`` (NaT where a value is missing or unreadable) and the number of
+    such rows.  ``fallback_format=None`` lets pandas infer the format of the
+    strings no fixed layout matched.
+    """
+    codes, uniques = pd.factorize(pd.Series(values))
+    decoded = np.append(_decode_unique(uniques, formats, fallback_format), np.datetime64('NaT', 'ns'))
+    # Missing values have code -1, which picks the NaT appended last.
+    datetimes = decoded[codes]
+    return datetimes, int(np.isnat(datetimes).sum())
+
+
+def parse_aws(values):
+    """``Date_&_Time`` of the GHMC exports ('%d-%m-%Y %H:%M'); same result as ``pd.to_datetime`` with that format."""
+    return parse_column(values, (AWS_FORMAT,), AWS_FORMAT)
+
+
+def parse_date_hour(dates, hours):
+    """Timestamps of the legacy ``date`` + ``hour`` schema.
+
+    ``dates`` are ISO or day-first dates (other layouts are inferred by
+    pandas) and ``hours`` hour numbers 0-23, optionally written as 'HH:MM'.
+    Returns ``(datetimes, rejected)`` like ``parse_column``.
+    """
+    day_codes, day_uniques = pd.factorize(pd.Series(dates))
+    days = np.append(_decode_unique(day_uniques, DATE_FORMATS).astype('datetime64[D]').astype(np.int64), NAT)
+
+    hour_codes, hour_uniques = pd.factorize(pd.Series(hours))
+    head = pd.Series(np.asarray(hour_uniques, dtype=str)).str.split(':').str[0].str.strip()
+    hour = pd.to_numeric(head, errors='coerce').to_numpy()
+    valid_hour = (hour >= 0) & (hour <= 23) & (hour == np.floor(hour))
+    hour = np.append(np.where(valid_hour, hour, -1), -1).astype(np.int64)
+
+    day, hour = days[day_codes], hour[hour_codes]
+    minutes = np.where((day != NAT) & (hour >= 0), (day * 24 + hour) * 60, NAT)
+    datetimes = _to_datetimes(minutes)
+    return datetimes, int(np.isnat(datetimes).sum())
@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from rainfall.downsample import downsample
+from rainfall.events import build_events
+from rainfall.timestamps import parse_date_hour
+
 st.set_page_config(page_title="Rainfall Event Analyzer", layout="wide")
 
 st.title("🌧️ Rainfall Event Analyzer")
@@ -20,7 +24,9 @@ if uploaded_file is not None:
 
     # Ensure datetime format
     if 'date' in df.columns and 'hour' in df.columns:
-        df['datetime'] = pd.to_datetime(df['date'] + ' ' + df['hour'].astype(str) + ':00', errors='coerce')
+        df['datetime'], rejected = parse_date_hour(df['date'], df['hour'])
+        if rejected:
+            st.warning(f"{rejected:,} rows with an unreadable date or hour were dropped.")
         df = df.dropna(subset=['datetime'])
     else:
         st.error("CSV must contain 'date' and 'hour' columns!")
@@ -39,22 +45,12 @@ if uploaded_file is not None:
     threshold = st.slider("Rainfall threshold (mm)", 0.1, 10.0, 1.0, step=0.1)
     gap_hours = st.slider("Gap (hours) between events", 1, 12, 6)
 
-    df_station['rain_event'] = (df_station['rainfall'] > threshold).astype(int)
-    df_station['event_id'] = (df_station['rain_event'].diff().fillna(0) == 1).cumsum()
-    df_station.loc[df_station['rain_event'] == 0, 'event_id'] = None
-
-    # Compute event summary
-    events = (
-        df_station.dropna(subset=['event_id'])
-        .groupby('event_id')
-        .agg(
-            start_time=('datetime', 'min'),
-            end_time=('datetime', 'max'),
-            total_rainfall=('rainfall', 'sum'),
-            duration_hours=('datetime', lambda x: (x.max() - x.min()).total_seconds() / 3600 + 1)
-        )
-        .reset_index(drop=True)
-    )
+    # Events: wet hours above the threshold, split by at least `gap_hours` dry hours
+    events = build_events(df_station, threshold=threshold, min_gap_hours=gap_hours,
+                          station_col='station_id', time_col='datetime', rain_col='rainfall')
+    events = events.rename(columns={
+        'Start': 'start_time', 'End': 'end_time', 'Total_Rain': 'total_rainfall', 'Duration_hrs': 'duration_hours'
+    })[['start_time', 'end_time', 'total_rainfall', 'duration_hours']]
 
     st.subheader("Identified Rainfall Events")
     st.dataframe(events)
@@ -62,7 +58,9 @@ if uploaded_file is not None:
     # Plot time series
     st.subheader("Rainfall Time Series")
     fig, ax = plt.subplots(figsize=(10, 4))
-    ax.plot(df_station['datetime'], df_station['rainfall'], label='Rainfall (mm)')
+    # Reduce to the min/max per pixel pair of the figure width so spikes stay visible
+    df_plot = downsample(df_station, 'datetime', 'rainfall', width=int(fig.get_figwidth() * fig.dpi))
+    ax.plot(df_plot['datetime'], df_plot['rainfall'], label='Rainfall (mm)')
     ax.set_xlabel("Time")
     ax.set_ylabel("Rainfall (mm)")
     ax.set_title(f"Hourly Rainfall - {station}")
@@ -1,13 +1,37 @@
+import os
+import tracemalloc
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-import geopandas as gpd
+import plotly.graph_objects as go
+
+from rainfall import ingest, store
+from rainfall.boxstats import box_summary, group_totals
+from rainfall.diurnal import MEASURES
+from rainfall.downsample import downsample
+from rainfall.profiling import LOG_FILE, StageTimer, peak_rss_mb
+from rainfall.query import Query
+from rainfall.spatial import station_series
+from rainfall.spells import spell_distribution, spell_summary
+from rainfall.stations import attach
+from rainfall.storms import storm_track
+
+# GHMC boundary used to clip the interpolated rainfall surfaces
+BOUNDARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ghmc_boundary.shp")
 
 # =========================
 # APP CONFIG
 # =========================
 st.set_page_config(page_title="GHMC Rainfall Dashboard", layout="wide")
+
+# Per-rerun stage profile, shown in the sidebar's Performance Profile panel.
+profile_memory = st.session_state.get("profile_memory", False)
+if not profile_memory and tracemalloc.is_tracing():
+    tracemalloc.stop()
+profiler = StageTimer(trace_memory=profile_memory)
+
 #st.title(" Rainfall Analysis Tool for GHMC")
 
 # ---------- HEADER ----------
@@ -121,357 +145,618 @@ You can:
                 
 """)
 
-uploaded_file = st.sidebar.file_uploader(" Upload hourly rainfall CSV file ")
+data = None
+data_source = st.sidebar.radio("Data source", ["Upload CSV", "Parquet store"], horizontal=True)
+
+if data_source == "Upload CSV":
+    uploaded_file = st.sidebar.file_uploader(" Upload hourly rainfall CSV file ")
+    if uploaded_file is not None:
+        st.sidebar.success(" File uploaded successfully!")
+        # ---------- Ingest (cached on file content) ----------
+        with profiler.stage('load'):
+            data, cache_hit = ingest.load(uploaded_file.getvalue(), profiler)
+else:
+    store_path = st.sidebar.text_input(" Parquet store folder", value="GHMC_rainfall_store")
+    if os.path.exists(os.path.join(store_path, store.MANIFEST)):
+        # Only the partitions for the chosen stations and period are read.
+        store_period = [pd.Timestamp(t).date() for t in store.manifest(store_path)['period']]
+        store_stations = st.sidebar.multiselect("Stations (leave empty for all)",
+                                                store.read_stations(store_path).index)
+        store_range = st.sidebar.date_input("Period", value=store_period,
+                                            min_value=store_period[0], max_value=store_period[1])
+        if len(store_range) == 2:
+            with profiler.stage('load'):
+                data, cache_hit = ingest.load_store(store_path, store_stations or None, *store_range, profiler)
+            st.sidebar.success(f" Loaded {len(data.hourly)} hourly records from the store")
+    else:
+        st.sidebar.warning(" No Parquet store found at this path.")
 
 # =========================
-# MAIN BODY
+# CHART HELPERS
 # =========================
-if uploaded_file is not None:
-    st.sidebar.success(" File uploaded successfully!")
+def figure_points(fig):
+    """Data values carried by a figure's traces, i.e. what Streamlit has to serialize."""
+    total = 0
+    for trace in fig.data:
+        for attr in ('z', 'x', 'lat', 'y'):
+            values = getattr(trace, attr, None)
+            if values is not None:
+                total += np.size(values)
+                break
+    return total
+
+
+def plotly_chart(fig, **kwargs):
+    """``st.plotly_chart`` timed as the profiler's chart stage (serialization happens in the call)."""
+    with profiler.stage('plotly charts', figure_points(fig)):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def zoom_range(chart_key):
+    """x-range of the box last drawn on a chart, or None for the full range."""
+    event = st.session_state.get(chart_key)
+    boxes = event['selection']['box'] if event else []
+    return boxes[-1]['x'] if boxes else None
+
+
+def long_series_chart(frame, x, y, chart_key, color=None, **line_args):
+    """Line chart of a long series, downsampled server-side to the chart width.
+
+    Dragging a box selects an x-range; the rerun re-aggregates that range at
+    full resolution and double-clicking clears it.
+    """
+    x_range = zoom_range(chart_key)
+    points = downsample(frame, x, y, by=color, width=chart_width, x_range=x_range)
+    fig = px.line(points, x=x, y=y, color=color, **line_args)
+    fig.update_layout(dragmode='select', selectdirection='h')
+    if x_range:
+        fig.update_xaxes(range=x_range)
+    plotly_chart(fig, use_container_width=True, key=chart_key, on_select="rerun", selection_mode="box")
+    st.caption(f"Showing {len(points):,} of {len(frame):,} points (peaks kept). "
+               "Drag across the chart to zoom in; double-click to reset.")
+
+
+# Rows shown per page of a query result table
+PAGE_ROWS = 500
+# Storms drawn in the storm scatter; larger selections are sampled uniformly
+SCATTER_POINTS = 5000
+
+
+def paged_table(frame, positions, key, page_rows=PAGE_ROWS):
+    """Show one page of ``frame.iloc[positions]`` (all rows when None) with station metadata attached to it only."""
+    positions = np.arange(len(frame)) if positions is None else positions
+    pages = max(1, -(-len(positions) // page_rows))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=key) if pages > 1 else 1
+    start, stop = (page - 1) * page_rows, min(page * page_rows, len(positions))
+    page_frame = frame.iloc[positions[start:stop]]
+    st.dataframe(attach(page_frame, stations) if 'AWS_ID' in page_frame.columns else page_frame,
+                 use_container_width=True)
+    if pages > 1:
+        st.caption(f"Rows {start + 1:,}-{stop:,} of {len(positions):,}")
+
+
+def exceedance_chart(index, threshold, title):
+    """Count-versus-threshold curve of an index, with the current threshold marked."""
+    curve = index.exceedance()
+    fig = px.line(curve, x="Threshold", y="Count", log_y=True, line_shape="hv", title=title)
+    fig.add_vline(x=threshold, line_dash="dash", line_color="#002b5c")
+    fig.update_layout(height=250, margin=dict(l=10, r=10, t=40, b=10))
+    plotly_chart(fig, use_container_width=True)
+
+
+ALL_STATIONS = "All stations (summary)"
+
+
+def summary_box_figure(stats, outliers, x, y, color=None, title=None):
+    """Box plot drawn from precomputed group statistics: one box per group plus its capped outliers."""
+    fig = go.Figure()
+    palette = px.colors.qualitative.Plotly
+    groups = stats.groupby(color, observed=True, sort=True) if color else [(None, stats)]
+    for i, (name, part) in enumerate(groups):
+        extremes = outliers if color is None else outliers[outliers[color] == name]
+        label = None if name is None else str(name)
+        shade = palette[i % len(palette)]
+        fig.add_trace(go.Box(x=part[x], q1=part['Q1'], median=part['Median'], q3=part['Q3'], mean=part['Mean'],
+                             lowerfence=part['Lower_Whisker'], upperfence=part['Upper_Whisker'],
+                             name=label, legendgroup=label, offsetgroup=label, marker_color=shade, boxpoints=False))
+        fig.add_trace(go.Scatter(x=extremes[x], y=extremes[y], mode='markers', name=label, legendgroup=label,
+                                 offsetgroup=label, marker_color=shade, showlegend=False))
+    fig.update_layout(title=title, boxmode='group', scattermode='group', xaxis_title=x, yaxis_title=y,
+                      showlegend=color is not None)
+    return fig
+
+
+def distribution_chart(frame, x, y, chart_key, color=None, title=None, summary=None):
+    """Whole-network box plot built from per-group summaries, or the raw points of one chosen station.
+
+    ``summary`` is a precomputed ``(stats, outliers)`` pair for ``frame``; it is computed here when omitted.
+    """
+    view = st.selectbox("Show:", [ALL_STATIONS, *frame['AWS_ID'].unique().tolist()], key=chart_key,
+                        format_func=lambda v: v if v == ALL_STATIONS else f"Raw points - station {v}")
+    if view == ALL_STATIONS:
+        by = [x] if color in (None, x) else [x, color]
+        stats, outliers = summary if summary is not None else box_summary(frame, y, by)
+        plotly_chart(summary_box_figure(stats, outliers, x, y, color, title), use_container_width=True)
+        st.caption(f"{len(stats):,} boxes summarising {int(stats['Count'].sum()):,} rows; "
+                   f"{len(outliers):,} of {int(stats['Outliers'].sum()):,} outliers drawn (most extreme kept).")
+    else:
+        fig = px.box(frame[frame['AWS_ID'] == view], x=x, y=y, points='all', title=f"{title} - {view}")
+        plotly_chart(fig, use_container_width=True)
+
+
+def surface_figure(grid, rasters, title, labels=None, zmax=None):
+    """Heatmap of one raster, or an animation with a slider over a stack of rasters named by ``labels``."""
+    rasters = np.asarray(rasters)
+    stack = rasters if rasters.ndim == 3 else rasters[None]
+    zmax = zmax if zmax is not None else np.nanmax(stack) if np.isfinite(stack).any() else 1.0
+    heatmap = dict(x=grid.lon, y=grid.lat, zmin=0, zmax=zmax or 1.0, colorscale="Blues", colorbar_title="mm")
+    fig = go.Figure(go.Heatmap(z=stack[0], **heatmap))
+    for polygon in getattr(grid.boundary, 'geoms', [grid.boundary]):
+        lon, lat = polygon.exterior.xy
+        fig.add_trace(go.Scatter(x=list(lon), y=list(lat), mode='lines', line=dict(color="#002b5c", width=1.5),
+                                 hoverinfo='skip', showlegend=False))
+    sites = stations.loc[grid.station_ids, ['Latitude', 'Longitude']]
+    fig.add_trace(go.Scatter(x=sites['Longitude'], y=sites['Latitude'], mode='markers', text=sites.index.astype(str),
+                             marker=dict(size=4, color="#333333"), hovertemplate="AWS %{text}<extra></extra>",
+                             showlegend=False))
+    if len(stack) > 1:
+        fig.frames = [go.Frame(data=[go.Heatmap(z=z, **heatmap)], traces=[0], name=str(label))
+                      for z, label in zip(stack, labels)]
+        fig.update_layout(
+            updatemenus=[dict(type="buttons", showactive=False, x=0, y=-0.08, xanchor="left", buttons=[
+                dict(label="Play", method="animate",
+                     args=[None, dict(frame=dict(duration=400, redraw=True), fromcurrent=True)]),
+                dict(label="Pause", method="animate",
+                     args=[[None], dict(frame=dict(duration=0, redraw=False), mode="immediate")])])],
+            sliders=[dict(x=0.12, len=0.88, y=-0.02, steps=[
+                dict(label=str(label), method="animate",
+                     args=[[str(label)], dict(frame=dict(duration=0, redraw=True), mode="immediate")])
+                for label in labels])])
+    fig.update_layout(title=title, height=600, xaxis_title="Longitude", yaxis_title="Latitude")
+    fig.update_yaxes(scaleanchor="x", scaleratio=1 / np.cos(np.radians(grid.lat0)))
+    return fig
 
-    df = pd.read_csv(uploaded_file)
-    df.columns = df.columns.str.strip().str.replace('\n', ' ').str.replace(' ', '_')
+
+# =========================
+# MAIN BODY
+# =========================
+if data is not None:
+    stations = data.stations
+    df = data.hourly
+    daily = data.daily
+
+    with st.sidebar.expander("Event Definition"):
+        event_threshold = st.number_input("Wet-hour threshold (mm):", min_value=0.0, value=0.0, step=0.1)
+        event_gap = st.slider("Minimum dry gap between events (hours)", 1, 12, 1)
+        event_missing = st.slider("Missing hours tolerated inside an event", 0, 6, 0)
+    events = data.events_for(event_threshold, event_gap, event_missing)
+
+    with st.sidebar.expander("Chart Settings"):
+        chart_width = st.select_slider("Chart width (px) for long series", [500, 1000, 1500, 2000, 3000], value=1000,
+                                       help="Long series are reduced to the min and max of each 2-pixel bucket.")
+
+    stats = ingest.cache_stats()
+    st.sidebar.caption(f" Preprocess cache **{'hit' if cache_hit else 'miss'}** (key {data.key[:10]}) - "
+                       f"{'nothing re-parsed' if cache_hit else 'data loaded'}. "
+                       f"Hits: {stats['hits']}, misses: {stats['misses']}, "
+                       f"entries: {stats['entries']}/{stats['max_entries']}")
 
     # ---------- Preview Section ----------
-    with st.expander(" **Data Preview and Station Map**"):
+    with st.expander(" **Data Preview and Station Map**"), profiler.stage('preview'):
         col1, col2 = st.columns([1, 1])
         with col1:
             st.subheader(" Data Preview")
-            st.dataframe(df.head(20), use_container_width=True)
+            st.dataframe(data.preview, use_container_width=True)
 
         with col2:
             st.subheader(" AWS Station Locations")
-            if {'Latitude', 'Longitude'}.issubset(df.columns):
-                stations = df[['AWS_ID', 'Latitude', 'Longitude']].drop_duplicates()
-                fig = px.scatter_mapbox(stations, lat="Latitude", lon="Longitude",
+            if {'Latitude', 'Longitude'}.issubset(stations.columns):
+                station_locs = stations[['Latitude', 'Longitude']].reset_index()
+                fig = px.scatter_mapbox(station_locs, lat="Latitude", lon="Longitude",
                                         hover_name="AWS_ID", zoom=9, mapbox_style="open-street-map")#,
                                         #title="AWS Station Locations")
                 fig.update_layout(
                 margin=dict(l=10, r=10, t=10, b=10),
                 height=410,  # 🔹 Adjust to take up vertical space
-                mapbox=dict(center={"lat": stations["Latitude"].mean(),
-                                    "lon": stations["Longitude"].mean()}, zoom=10))
-                st.plotly_chart(fig, use_container_width=True)
+                mapbox=dict(center={"lat": station_locs["Latitude"].mean(),
+                                    "lon": station_locs["Longitude"].mean()}, zoom=10))
+                plotly_chart(fig, use_container_width=True)
             else:
                 st.warning(" Latitude/Longitude columns not found in uploaded file.")
 
-    # ---------- Preprocessing ----------
-    df.rename(columns={'Hourly__Rainfall_(mm)': 'Hourly_Rain'}, inplace=True, errors='ignore')
-    df['DateTime'] = pd.to_datetime(df['Date_&_Time'], format='%d-%m-%Y %H:%M', errors='coerce')
-    df.dropna(subset=['DateTime'], inplace=True)
-    df['Date'] = df['DateTime'].dt.date
-    df['Month'] = df['DateTime'].dt.month
-    df['Year'] = df['DateTime'].dt.year
-    df['Hourly_Rain'] = pd.to_numeric(df['Hourly_Rain'], errors='coerce').fillna(0)
-
-    meta_cols = ['AWS_ID', 'District', 'Mandal', 'Location', 'Circle', 'Latitude', 'Longitude']
-
-    # ---------- Aggregated Datasets ----------
-    daily = df.groupby(meta_cols + ['Year', 'Month', 'Date']).agg(
-        Daily_Rainfall=('Hourly_Rain', 'sum'),
-        Max_Hourly_Rain=('Hourly_Rain', 'max'),
-        Hours_Rained=('Hourly_Rain', lambda x: (x > 0).sum())
-    ).reset_index()
-    # ---------- Reorder Columns ----------
-    
-    daily['Daily_Intensity'] = daily.apply(
-        lambda x: x['Daily_Rainfall'] / x['Hours_Rained'] if x['Hours_Rained'] > 0 else 0, axis=1
-    )
-    daily = daily[['AWS_ID', 'Year', 'Month', 'Date',
-                'Daily_Rainfall', 'Max_Hourly_Rain', 'Hours_Rained','Daily_Intensity', 'Latitude', 'Longitude',
-                'District', 'Mandal', 'Location', 'Circle']]
-    df_sorted = df.sort_values(['AWS_ID', 'DateTime']).copy()
-    df_sorted['RainFlag'] = (df_sorted['Hourly_Rain'] > 0).astype(int)
-    df_sorted['EventStart'] = (df_sorted['RainFlag'].diff().fillna(0) == 1).astype(int)
-    df_sorted['EventID'] = (df_sorted['EventStart'].cumsum() * df_sorted['RainFlag']).astype(int)
-
-    events = df_sorted[df_sorted['EventID'] > 0].groupby(meta_cols + ['EventID']).agg(
-        Start=('DateTime', 'min'),
-        End=('DateTime', 'max'),
-        Duration_hrs=('DateTime', 'count'),
-        Total_Rain=('Hourly_Rain', 'sum'),
-        Max_Hourly=('Hourly_Rain', 'max')
-    ).reset_index()
-
-    events['Average_Intensity'] = events['Total_Rain'] / events['Duration_hrs']
-    events = events[['AWS_ID',
-                'EventID', 'Start', 'End','Duration_hrs','Total_Rain','Max_Hourly', 'Average_Intensity','Latitude', 'Longitude',
-                'District', 'Mandal', 'Location', 'Circle']]
+    # ---------- Data Quality Section ----------
+    with st.expander(" **Data Quality and Completeness**"), profiler.stage('data quality'):
+        report = data.quality
+        grid = data.hour_grid
+        st.caption("Missing, unparsed, negative, spiking (> 150 mm/hr) and stuck (same reading for 6+ hours) "
+                   "hours are left out of every table and count as missing hours, not dry ones.")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Mean Completeness", f"{report['Completeness'].mean():.1%}")
+        col2.metric("Missing Hours", f"{int(report['Missing'].sum()):,}")
+        col3.metric("Rejected Readings", f"{int(report[['Invalid', 'Negative', 'Spikes', 'Stuck']].sum().sum()):,}")
+        col4.metric("Duplicate Hours", f"{int(report['Duplicates'].sum()):,}")
+        if data.rejected_timestamps:
+            st.warning(f"{data.rejected_timestamps:,} rows with an unreadable Date_&_Time were dropped.")
+        out_of_range = int(report['Out_Of_Range'].sum())
+        if out_of_range:
+            st.warning(f"{out_of_range:,} records with a timestamp far from the rest of their station's record "
+                       "(a mistyped year?) were left out; see Out_Of_Range in the table below.")
+        st.caption(f"Station x hour grid: {len(grid.stations)} x {grid.rain.shape[1]:,} cells in "
+                   f"{grid.nbytes / 2**20:,.1f} MB; the long hourly table takes "
+                   f"{df.memory_usage(deep=True).sum() / 2**20:,.1f} MB.")
+
+        col5, col6 = st.columns([1.2, 1.8])
+        with col5:
+            st.dataframe(report.style.format({'Completeness': '{:.1%}'}), hide_index=True, use_container_width=True)
+        with col6:
+            # Share of valid hours per station and day, reduced on the dense grid.
+            day_valid = grid.valid.reshape(len(grid.stations), grid.n_days, 24).mean(axis=2)
+            fig = px.imshow(day_valid, x=grid.datetimes[::24], y=grid.stations.astype(str),
+                            color_continuous_scale="Blues", zmin=0, zmax=1, aspect="auto",
+                            labels=dict(x="Day", y="AWS_ID", color="Valid share"),
+                            title="Daily Share of Valid Hours by Station")
+            plotly_chart(fig, use_container_width=True)
+
     # ---------- Tabs ----------
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         " **Data Summary**",
         " **Custom Queries**",
         " **Visualization**",
-        " **Station Analysis**"
+        " **Station Analysis**",
+        " **Circle Rollups**",
+        " **Storm Tracking**"
     ])
 
     # =========================
     # TAB 1 - DATA SUMMARY
     # =========================
-    with tab1:
+    with tab1, profiler.stage('tab: data summary'):
         st.subheader("Rainfall Summary")
         st.info("View daily or event-level rainfall summaries with customizable thresholds.")
         summary_option = st.radio("Select summary type:", ["Daily Rainfall Summary", "Rain Events Summary"], horizontal=True)
 
         col1, col2 = st.columns([1.3, 1])
 
-    # ---- LEFT COLUMN: Data Filtering ----
-    with col1:
-        if summary_option == "Daily Rainfall Summary":
-            daily_threshold = st.number_input("Enter daily rainfall threshold (mm):", value=0.0)
+        # ---- LEFT COLUMN: Data Filtering ----
+        with col1:
+            if summary_option == "Daily Rainfall Summary":
+                daily_threshold = st.number_input("Enter daily rainfall threshold (mm):", value=0.0)
+                daily_index = data.threshold_index('daily', 'Daily_Rainfall')
+                st.caption(f"{daily_index.count(daily_threshold):,} days at or above this threshold")
+
+                # Store results persistently in session_state
+                if st.button("Show Daily Summary"):
+                    st.session_state['filtered_daily'] = daily_index.select(daily_threshold)
+                    st.session_state['daily_threshold'] = daily_threshold
+
+                # Display stored results if available
+                if 'filtered_daily' in st.session_state:
+                    st.success(f"Days with rainfall ≥ {st.session_state['daily_threshold']} mm: "
+                               f"{len(st.session_state['filtered_daily'])}")
+                    paged_table(st.session_state['filtered_daily'], None, "daily_summary_page")
 
-            # Store results persistently in session_state
-            if st.button("Show Daily Summary"):
-                st.session_state['filtered_daily'] = daily[daily['Daily_Rainfall'] >= daily_threshold]
-                st.session_state['daily_threshold'] = daily_threshold
+            else:
+                event_thresh = st.number_input("Enter event total rainfall threshold (mm):", value=0.0)
+                event_index = data.threshold_index('events', 'Total_Rain', (event_threshold, event_gap, event_missing))
+                st.caption(f"{event_index.count(event_thresh):,} events at or above this threshold")
 
-            # Display stored results if available
-            if 'filtered_daily' in st.session_state:
-                st.success(f"Days with rainfall ≥ {st.session_state['daily_threshold']} mm: "
-                           f"{len(st.session_state['filtered_daily'])}")
-                st.dataframe(st.session_state['filtered_daily'])
+                if st.button("Show Event Summary"):
+                    st.session_state['filtered_events'] = event_index.select(event_thresh)
+                    st.session_state['event_thresh'] = event_thresh
 
-        else:
-            event_thresh = st.number_input("Enter event total rainfall threshold (mm):", value=0.0)
-
-            if st.button("Show Event Summary"):
-                st.session_state['filtered_events'] = events[events['Total_Rain'] >= event_thresh]
-                st.session_state['event_thresh'] = event_thresh
-
-            if 'filtered_events' in st.session_state:
-                st.success(f"Events with total rainfall ≥ {st.session_state['event_thresh']} mm: "
-                           f"{len(st.session_state['filtered_events'])}")
-                st.dataframe(st.session_state['filtered_events'])
-
-    # ---- RIGHT COLUMN: Reactive Visualization ----
-    with col2:
-        st.markdown("###### Quick Visualization")
-        plot_type = st.selectbox("Select plot type:", ["Box", "Bar", "Line", "Spatial Map"])
-
-        # For Daily Rainfall Summary
-        if summary_option == "Daily Rainfall Summary" and 'filtered_daily' in st.session_state:
-            filtered_daily = st.session_state['filtered_daily']
-
-            if plot_type == "Box":
-                fig = px.box(filtered_daily, x="Month", y="Daily_Rainfall", color="AWS_ID",
-                             title="Monthly Rainfall Distribution")
-            elif plot_type == "Bar":
-                fig = px.bar(filtered_daily, x="AWS_ID", y="Daily_Rainfall", color="Month",
-                             title="Rainfall by Station and Month")
-            elif plot_type == "Line":
-                fig = px.line(filtered_daily, x="Date", y="Daily_Rainfall", color="AWS_ID",
-                              title="Daily Rainfall Trends")
-            else:
-                spatial_avg = filtered_daily.groupby(["AWS_ID", "Latitude", "Longitude"])["Daily_Rainfall"].mean().reset_index()
-                fig = px.scatter_mapbox(spatial_avg, lat="Latitude", lon="Longitude", color="Daily_Rainfall",
-                                        size="Daily_Rainfall", hover_name="AWS_ID", mapbox_style="open-street-map",
-                                        color_continuous_scale="turbo", title="Spatial Distribution of Daily Rainfall")
-
-            st.plotly_chart(fig, use_container_width=True)
-
-        # For Rain Events Summary
-        elif summary_option == "Rain Events Summary" and 'filtered_events' in st.session_state:
-            filtered_events = st.session_state['filtered_events']
-
-            if plot_type == "Box":
-                fig = px.box(filtered_events, x="AWS_ID", y="Average_Intensity",
-                             title="Event Intensity Distribution Across Stations")
-            elif plot_type == "Bar":
-                fig = px.bar(filtered_events, x="AWS_ID", y="Total_Rain",
-                             title="Total Event Rainfall by Station")
-            elif plot_type == "Line":
-                fig = px.line(filtered_events, x="Start", y="Total_Rain", color="AWS_ID",
-                              title="Temporal Evolution of Events")
-            else:
-                spatial_ev = filtered_events.groupby(["AWS_ID", "Latitude", "Longitude"])["Total_Rain"].mean().reset_index()
-                fig = px.scatter_mapbox(spatial_ev, lat="Latitude", lon="Longitude", color="Total_Rain",
-                                        size="Total_Rain", hover_name="AWS_ID", mapbox_style="open-street-map",
-                                        color_continuous_scale="turbo", title="Spatial Distribution of Rain Events")
+                if 'filtered_events' in st.session_state:
+                    st.success(f"Events with total rainfall ≥ {st.session_state['event_thresh']} mm: "
+                               f"{len(st.session_state['filtered_events'])}")
+                    paged_table(st.session_state['filtered_events'], None, "event_summary_page")
 
-            st.plotly_chart(fig, use_container_width=True)
+        # ---- RIGHT COLUMN: Reactive Visualization ----
+        with col2:
+            st.markdown("###### Quick Visualization")
+            plot_type = st.selectbox("Select plot type:", ["Box", "Bar", "Line", "Spatial Map"])
+
+            # For Daily Rainfall Summary
+            if summary_option == "Daily Rainfall Summary" and 'filtered_daily' in st.session_state:
+                filtered_daily = st.session_state['filtered_daily']
+
+                if plot_type == "Box":
+                    fig = None
+                    distribution_chart(filtered_daily, "Month", "Daily_Rainfall", "daily_box_view", color="AWS_ID",
+                                       title="Monthly Rainfall Distribution")
+                elif plot_type == "Bar":
+                    fig = px.bar(group_totals(filtered_daily, "Daily_Rainfall", ["AWS_ID", "Month"]), x="AWS_ID", y="Sum",
+                                 color="Month", labels={"Sum": "Daily_Rainfall"}, hover_data=["Count"],
+                                 title="Rainfall by Station and Month")
+                elif plot_type == "Line":
+                    fig = None
+                    long_series_chart(filtered_daily, "Date", "Daily_Rainfall", "daily_trend_chart", color="AWS_ID",
+                                      title="Daily Rainfall Trends")
+                else:
+                    spatial_avg = attach(filtered_daily.groupby("AWS_ID", observed=True)["Daily_Rainfall"].mean().reset_index(),
+                                         stations, ['Latitude', 'Longitude'])
+                    fig = px.scatter_mapbox(spatial_avg, lat="Latitude", lon="Longitude", color="Daily_Rainfall",
+                                            size="Daily_Rainfall", hover_name="AWS_ID", mapbox_style="open-street-map",
+                                            color_continuous_scale="turbo", title="Spatial Distribution of Daily Rainfall")
+
+                if fig is not None:
+                    plotly_chart(fig, use_container_width=True)
+
+            # For Rain Events Summary
+            elif summary_option == "Rain Events Summary" and 'filtered_events' in st.session_state:
+                filtered_events = st.session_state['filtered_events']
+
+                if plot_type == "Box":
+                    fig = None
+                    distribution_chart(filtered_events, "AWS_ID", "Average_Intensity", "event_box_view",
+                                       title="Event Intensity Distribution Across Stations")
+                elif plot_type == "Bar":
+                    fig = px.bar(group_totals(filtered_events, "Total_Rain", "AWS_ID"), x="AWS_ID", y="Sum",
+                                 labels={"Sum": "Total_Rain"}, hover_data=["Count"],
+                                 title="Total Event Rainfall by Station")
+                elif plot_type == "Line":
+                    fig = None
+                    long_series_chart(filtered_events, "Start", "Total_Rain", "event_trend_chart", color="AWS_ID",
+                                      title="Temporal Evolution of Events")
+                else:
+                    spatial_ev = attach(filtered_events.groupby("AWS_ID", observed=True)["Total_Rain"].mean().reset_index(),
+                                        stations, ['Latitude', 'Longitude'])
+                    fig = px.scatter_mapbox(spatial_ev, lat="Latitude", lon="Longitude", color="Total_Rain",
+                                            size="Total_Rain", hover_name="AWS_ID", mapbox_style="open-street-map",
+                                            color_continuous_scale="turbo", title="Spatial Distribution of Rain Events")
+
+                if fig is not None:
+                    plotly_chart(fig, use_container_width=True)
     # =========================
     # TAB 2 - CUSTOM QUERIES
     # =========================
-    with tab2:
+    with tab2, profiler.stage('tab: custom queries'):
         st.subheader(" Threshold-Based Queries")
 
         # --- Hourly Rainfall Query ---
         with st.expander("Hourly Rainfall Threshold Query"):
             hr_thresh = st.number_input("Enter hourly rainfall threshold (mm):", value=10.0, key="hourly_q")
+            hourly_index = data.threshold_index('hourly', 'Hourly_Rain')
+            st.caption(f"{hourly_index.count(hr_thresh):,} records at or above this threshold")
+            exceedance_chart(hourly_index, hr_thresh, "Hourly records at or above each threshold")
             if st.button("Run Hourly Query"):
-                filtered_hr = df[df["Hourly_Rain"] >= hr_thresh]
-                st.write(f"Records ≥ {hr_thresh} mm/hour: {len(filtered_hr)}")
+                st.session_state['hourly_q_thresh'] = hr_thresh
+            if 'hourly_q_thresh' in st.session_state:
+                hr_positions = hourly_index.positions(st.session_state['hourly_q_thresh'])
+                filtered_hr = df.iloc[hr_positions]
+                st.write(f"Records ≥ {st.session_state['hourly_q_thresh']} mm/hour: {len(filtered_hr)}")
 
                 col1, col2 = st.columns([1.2, 1.8])
                 with col1:
-                    st.dataframe(filtered_hr, use_container_width=True)
+                    paged_table(df, hr_positions, "hourly_q_page")
                 with col2:
                     fig = px.histogram(filtered_hr, x="Hourly_Rain", nbins=30, color="AWS_ID",
                                     title="Distribution of Hourly Rainfall ≥ Threshold")
-                    st.plotly_chart(fig, use_container_width=True)
+                    plotly_chart(fig, use_container_width=True)
 
         # --- Daily Rainfall Query ---
         with st.expander("Daily Rainfall Threshold Query"):
             daily_thresh = st.number_input("Enter daily rainfall threshold (mm):", value=50.0, key="daily_q")
+            daily_index = data.threshold_index('daily', 'Daily_Rainfall')
+            st.caption(f"{daily_index.count(daily_thresh):,} days at or above this threshold")
+            exceedance_chart(daily_index, daily_thresh, "Station-days at or above each threshold")
             if st.button("Run Daily Query"):
-                high_daily = daily[daily["Daily_Rainfall"] >= daily_thresh]
-                st.write(f"Days ≥ {daily_thresh} mm/day: {len(high_daily)}")
+                st.session_state['daily_q_thresh'] = daily_thresh
+            if 'daily_q_thresh' in st.session_state:
+                daily_positions = daily_index.positions(st.session_state['daily_q_thresh'])
+                high_daily = daily.iloc[daily_positions]
+                st.write(f"Days ≥ {st.session_state['daily_q_thresh']} mm/day: {len(high_daily)}")
 
                 col3, col4 = st.columns([1.2, 1.8])
                 with col3:
-                    st.dataframe(high_daily, use_container_width=True)
+                    paged_table(daily, daily_positions, "daily_q_page")
                 with col4:
-                    fig = px.box(high_daily, x="AWS_ID", y="Daily_Rainfall", color="AWS_ID",
-                                title="Boxplot of Daily Rainfall Across Stations (≥ Threshold)")
-                    st.plotly_chart(fig, use_container_width=True)
+                    fig = summary_box_figure(*box_summary(high_daily, "Daily_Rainfall", "AWS_ID"), "AWS_ID",
+                                             "Daily_Rainfall", color="AWS_ID",
+                                             title="Boxplot of Daily Rainfall Across Stations (≥ Threshold)")
+                    plotly_chart(fig, use_container_width=True)
 
         # --- Event Duration Query ---
         with st.expander("Event Duration Query"):
             duration_thresh = st.number_input("Enter event duration threshold (hours):", value=5, key="event_q")
+            duration_index = data.threshold_index('events', 'Duration_hrs', (event_threshold, event_gap, event_missing))
+            st.caption(f"{duration_index.count(duration_thresh):,} events at or above this duration")
+            exceedance_chart(duration_index, duration_thresh, "Events at or above each duration")
             if st.button("Run Event Duration Query"):
-                long_events = events[events["Duration_hrs"] >= duration_thresh]
-                st.write(f"Events ≥ {duration_thresh} hours: {len(long_events)}")
+                st.session_state['event_q_thresh'] = duration_thresh
+            if 'event_q_thresh' in st.session_state:
+                duration_positions = duration_index.positions(st.session_state['event_q_thresh'])
+                long_events = events.iloc[duration_positions]
+                st.write(f"Events ≥ {st.session_state['event_q_thresh']} hours: {len(long_events)}")
 
                 col5, col6 = st.columns([1.2, 1.8])
                 with col5:
-                    st.dataframe(long_events, use_container_width=True)
+                    paged_table(events, duration_positions, "event_q_page")
                 with col6:
                     fig = px.scatter(long_events, x="Duration_hrs", y="Average_Intensity",
                                     color="AWS_ID", size="Total_Rain", hover_data=["Start", "End"],
                                     title="Duration vs Intensity of Events (≥ Threshold)")
-                    st.plotly_chart(fig, use_container_width=True)
+                    plotly_chart(fig, use_container_width=True)
         st.subheader(" Filtering the data")
         with st.expander("**Filtering by Station and Period**"):
-            st.write("Filter the rainfall dataset by station and period")
+            st.write("Filter the rainfall dataset by any combination of criteria (all must hold)")
 
             col1, col2, col3 = st.columns(3)
             with col1:
-                aws_selected = st.selectbox("Select AWS Station", options=df['AWS_ID'].unique())
+                aws_selected = st.multiselect("AWS Stations", options=stations.index)
+                circles_selected = st.multiselect("Circles", options=sorted(data.members()['Circle'].unique()))
             with col2:
-                start_date = st.date_input("Start Date", value=pd.to_datetime(df['Date']).min())
+                start_date = st.date_input("Start Date", value=df['Date'].min())
+                end_date = st.date_input("End Date", value=df['Date'].max())
             with col3:
-                end_date = st.date_input("End Date", value=pd.to_datetime(df['Date']).max())
-            # Ensure Date column is in datetime format
-            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-
-            # Filter the dataset
-            query_df = df[(df['AWS_ID'] == aws_selected) &
-                        (df['Date'] >= pd.to_datetime(start_date)) &
-                        (df['Date'] <= pd.to_datetime(end_date))].copy()
-
-            if not query_df.empty:
-                st.success(f" {len(query_df)} records found for {aws_selected} between {start_date} and {end_date}")
-                # -------- SELECT TYPE OF ANALYSIS --------
-                analysis_type = st.radio(
-                    "Select the Summary Type:",
-                    ("Daily Summary", "Event Summary"),
-                    horizontal=True
-                )
-                meta_cols = ['AWS_ID', 'District', 'Mandal', 'Location', 'Circle', 'Latitude', 'Longitude']
-
-                if analysis_type == "Daily Summary":
-                    # ---------- Daily Summary ----------
-                    daily_query = query_df.groupby(['AWS_ID', 'Year', 'Month', 'Date']).agg(
-                        Daily_Rainfall=('Hourly_Rain', 'sum'),
-                        Max_Hourly_Rain=('Hourly_Rain', 'max'),
-                        Hours_Rained=('Hourly_Rain', lambda x: (x > 0).sum())
-                    ).reset_index()
-
-                    daily_query['Daily_Intensity'] = daily_query.apply(
-                        lambda x: x['Daily_Rainfall'] / x['Hours_Rained'] if x['Hours_Rained'] > 0 else 0, axis=1
-                    )
-
-                    daily_query = daily_query.merge(df[meta_cols].drop_duplicates(), on='AWS_ID', how='left')
-
-                    daily_query = daily_query[[
-                        'AWS_ID', 'Year', 'Month', 'Date',
-                        'Daily_Rainfall', 'Max_Hourly_Rain', 'Hours_Rained', 'Daily_Intensity',
-                        'District', 'Mandal', 'Location', 'Circle', 'Latitude', 'Longitude'
-                    ]]
-
-                    st.subheader(" Daily Summary")
-                    st.dataframe(daily_query, use_container_width=True)
-
-                elif analysis_type == "Event Summary":
-                    # ---------- Event Summary ----------
-                    df_sorted = query_df.sort_values(['DateTime']).copy()
-                    df_sorted['RainFlag'] = (df_sorted['Hourly_Rain'] > 0).astype(int)
-                    df_sorted['EventStart'] = (df_sorted['RainFlag'].diff().fillna(0) == 1).astype(int)
-                    df_sorted['EventID'] = (df_sorted['EventStart'].cumsum() * df_sorted['RainFlag']).astype(int)
-
-                    events_query = df_sorted[df_sorted['EventID'] > 0].groupby(['AWS_ID', 'EventID']).agg(
-                        Start=('DateTime', 'min'),
-                        End=('DateTime', 'max'),
-                        Duration_hrs=('DateTime', 'count'),
-                        Total_Rain=('Hourly_Rain', 'sum'),
-                        Max_Hourly=('Hourly_Rain', 'max')
-                    ).reset_index()
-
-                    events_query['Average_Intensity'] = events_query['Total_Rain'] / events_query['Duration_hrs']
-                    events_query = events_query.merge(df[meta_cols].drop_duplicates(), on='AWS_ID', how='left')
-
-                    events_query = events_query[[
-                        'AWS_ID', 'EventID', 'Start', 'End',
-                        'Duration_hrs', 'Total_Rain', 'Max_Hourly', 'Average_Intensity',
-                        'District', 'Mandal', 'Location', 'Circle', 'Latitude', 'Longitude'
-                    ]]
-
-                    st.subheader(" Event Summary")
-                    st.dataframe(events_query, use_container_width=True)
+                months_selected = st.multiselect("Months", options=list(range(1, 13)))
+                seasons_selected = st.multiselect("Seasons", options=["Winter", "Pre-Monsoon", "Monsoon", "Post-Monsoon"])
+
+            # -------- SELECT TYPE OF ANALYSIS --------
+            analysis_type = st.radio(
+                "Select the Summary Type:",
+                ("Hourly Records", "Daily Summary", "Event Summary"),
+                index=1,
+                horizontal=True
+            )
+            col4, col5, col6 = st.columns(3)
+            with col4:
+                min_rain = st.number_input("Minimum rainfall (mm)", min_value=0.0, value=0.0, step=0.5, key="query_rain")
+            with col5:
+                min_intensity = st.number_input("Minimum intensity (mm/hr)", min_value=0.0, value=0.0, step=0.5,
+                                                key="query_intensity", disabled=analysis_type == "Hourly Records")
+            with col6:
+                hour_range = st.slider("Hour of day (hourly records / event start)", 0, 23, (0, 23),
+                                       disabled=analysis_type == "Daily Summary")
+
+            query = Query(stations=aws_selected or None, circles=circles_selected or None,
+                          start=start_date, end=end_date, months=months_selected or None,
+                          seasons=seasons_selected or None, min_rain=min_rain or None,
+                          min_intensity=min_intensity or None)
+            if hour_range != (0, 23) and analysis_type != "Daily Summary":
+                query = query.where(hours=range(hour_range[0], hour_range[1] + 1))
+
+            # Precomputed tables are filtered; nothing is rebuilt from the hourly rows.
+            table = {"Hourly Records": "hourly", "Daily Summary": "daily", "Event Summary": "events"}[analysis_type]
+            result = query.run(data, table, (event_threshold, event_gap, event_missing))
+
+            if not result.empty:
+                st.success(f" {len(result)} {analysis_type.lower()} rows match between {start_date} and {end_date}")
+                st.subheader(f" {analysis_type}")
+                paged_table(result, None, "query_page")
             else:
-                st.warning("No data found for the selected station and date range.")
+                st.warning("No data found for the selected criteria.")
         # =========================
     # TAB 3 - VISUALIZATION PANEL
     # =========================
-    with tab3:
+    with tab3, profiler.stage('tab: visualization'):
         st.subheader(" Advanced Visualizations")
 
         vis_option = st.selectbox("Select visualization type:", [
             "Daily Rainfall Trend (Station-wise)",
             "Monthly Intensity Boxplot",
             "Event Duration vs Total Rain",
-            "Spatial Distribution (Average Rainfall)"
+            "Spatial Distribution (Average Rainfall)",
+            "Interpolated Rainfall Surface (IDW)",
+            "Storm Animation (Hourly IDW)",
+            "Diurnal Pattern (Hour of Day)"
         ])
 
         if vis_option == "Daily Rainfall Trend (Station-wise)":
-            station_choice = st.selectbox("Select AWS station:", sorted(daily["AWS_ID"].unique()))
-            df_station = daily[daily["AWS_ID"] == station_choice]
-            fig = px.line(df_station, x="Date", y="Daily_Rainfall", title=f"Daily Rainfall - {station_choice}")
-            st.plotly_chart(fig, use_container_width=True)
+            station_choice = st.selectbox("Select AWS station:", stations.index)
+            df_station = data.by_station['daily'][station_choice]
+            long_series_chart(df_station, "Date", "Daily_Rainfall", "station_trend_chart",
+                              title=f"Daily Rainfall - {station_choice}")
 
         elif vis_option == "Monthly Intensity Boxplot":
-            fig = px.box(daily, x="Month", y="Daily_Intensity", color="AWS_ID",
-                         title="Monthly Distribution of Daily Intensity")
-            st.plotly_chart(fig, use_container_width=True)
+            distribution_chart(daily, "Month", "Daily_Intensity", "intensity_box_view", color="AWS_ID",
+                               title="Monthly Distribution of Daily Intensity",
+                               summary=data.box_summary('daily', "Daily_Intensity", ["Month", "AWS_ID"]))
 
         elif vis_option == "Event Duration vs Total Rain":
             fig = px.scatter(events, x="Duration_hrs", y="Total_Rain", color="AWS_ID",
                              size="Average_Intensity", hover_data=["Start", "End"],
                              title="Event Duration vs Total Rainfall")
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
+
+        elif vis_option.endswith("IDW)") and not {'Latitude', 'Longitude'}.issubset(stations.columns):
+            st.warning(" Latitude/Longitude columns not found in uploaded file.")
+
+        elif vis_option.endswith("IDW)"):
+            with st.expander("Interpolation settings"):
+                cell_km = st.select_slider("Grid cell size (km)", [0.25, 0.5, 1.0, 2.0], value=0.5)
+                neighbours = st.slider("Nearest stations per cell", 1, 16, 8)
+                power = st.slider("Distance power", 1.0, 4.0, 2.0, step=0.5)
+            # Station-to-cell weights are built once per setting; every map below is a matrix product.
+            grid = data.grid(BOUNDARY_PATH, cell_km, neighbours, power)
+            st.caption(f"{int(grid.inside.sum()):,} grid cells inside the GHMC boundary, "
+                       f"{len(grid.station_ids)} stations.")
+
+            if vis_option == "Interpolated Rainfall Surface (IDW)":
+                surface_choice = st.radio("Surface:", ["Average daily rainfall", "Single day"], horizontal=True)
+                if surface_choice == "Average daily rainfall":
+                    values, title = station_series(daily, "Daily_Rainfall"), "Average Daily Rainfall"
+                else:
+                    day = pd.Timestamp(st.date_input("Day", value=daily['Date'].max(),
+                                                     min_value=daily['Date'].min(), max_value=daily['Date'].max()))
+                    values = station_series(daily[daily['Date'] == day], "Daily_Rainfall")
+                    title = f"Rainfall on {day:%d-%m-%Y}"
+                if values.empty:
+                    st.warning("No data for the selected day.")
+                else:
+                    plotly_chart(surface_figure(grid, grid.surface(values), title), use_container_width=True)
+
+            else:
+                storm_days = st.date_input("Storm period", value=(daily['Date'].max(), daily['Date'].max()),
+                                           min_value=daily['Date'].min(), max_value=daily['Date'].max())
+                if len(storm_days) == 2:
+                    start, end = pd.Timestamp(storm_days[0]), pd.Timestamp(storm_days[1]) + pd.Timedelta(hours=23)
+                    frames = data.hour_grid.window(start, end)
+                    if frames.empty:
+                        st.warning("No hourly data in the selected period.")
+                    else:
+                        rasters = grid.surface(frames)
+                        plotly_chart(surface_figure(grid, rasters, "Hourly Rainfall",
+                                                    labels=frames.index.strftime('%d-%m %H:00')),
+                                     use_container_width=True)
+                        st.caption(f"{len(frames)} hourly maps; colour scale fixed to the period maximum.")
+
+        elif vis_option == "Diurnal Pattern (Hour of Day)":
+            # Served from the station x month x hour cube built at ingest; no hourly rows are rescanned.
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                diurnal_stations = st.multiselect("AWS Stations", options=stations.index, key="diurnal_stations")
+                diurnal_circles = st.multiselect("Circles", options=sorted(data.members()['Circle'].unique()),
+                                                 key="diurnal_circles")
+            with col2:
+                diurnal_seasons = st.multiselect("Seasons", options=["Winter", "Pre-Monsoon", "Monsoon", "Post-Monsoon"],
+                                                 key="diurnal_seasons")
+                diurnal_rows = st.radio("Heatmap rows:", ["Month", "Station"], horizontal=True)
+            with col3:
+                measure = st.selectbox("Measure:", list(MEASURES), format_func=MEASURES.get)
+
+            query = Query(stations=diurnal_stations or None, circles=diurnal_circles or None,
+                          seasons=diurnal_seasons or None)
+            chosen, months = query.station_ids(stations), query.month_set()
+            if chosen is not None and len(chosen) == 0:
+                st.warning("No stations match the selection.")
+            else:
+                cube = data.diurnal
+                matrix = cube.matrix(measure, diurnal_rows.lower(), chosen, months)
+                fig = px.imshow(matrix, aspect="auto", color_continuous_scale="Blues",
+                                labels={"x": "Hour of day", "y": diurnal_rows, "color": MEASURES[measure]},
+                                title=f"{MEASURES[measure]} by {diurnal_rows.lower()} and hour of day")
+                fig.update_yaxes(type="category")
+                plotly_chart(fig, use_container_width=True)
+
+                profile = cube.profile(chosen, months)
+                fig = px.line(profile, x="Hour", y=measure, markers=True, hover_data=["Valid_Hours"],
+                              title=f"Diurnal profile of the selection - {MEASURES[measure]}")
+                plotly_chart(fig, use_container_width=True)
+                st.caption(f"{int(profile['Valid_Hours'].sum()):,} valid station-hours in the selection; "
+                           f"cube size {cube.nbytes / 2**10:.0f} KB.")
 
         else:
-            spatial_avg = daily.groupby(["AWS_ID", "Latitude", "Longitude"])["Daily_Rainfall"].mean().reset_index()
+            spatial_avg = attach(daily.groupby("AWS_ID", observed=True)["Daily_Rainfall"].mean().reset_index(),
+                                 stations, ['Latitude', 'Longitude'])
             fig = px.scatter_mapbox(spatial_avg, lat="Latitude", lon="Longitude",
                                     color="Daily_Rainfall", size="Daily_Rainfall",
                                     hover_name="AWS_ID", color_continuous_scale="Blues",
                                     mapbox_style="open-street-map", zoom=9,
                                     title="Spatial Distribution of Average Daily Rainfall")
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
 
     # =========================
     # TAB 4 - STATION ANALYSIS
     # =========================
-    with tab4:
+    with tab4, profiler.stage('tab: station analysis'):
         st.subheader("Station-wise Rainfall Frequency and Intensity Analysis")
 
         # Layout: selection + menu on left, results on right
         left_col, right_col = st.columns([0.4, 1.6])
 
         with left_col:
-            station_select = st.selectbox("Select a Station", sorted(df["AWS_ID"].unique()))
+            station_select = st.selectbox("Select a Station", stations.index)
             st.markdown("##### Station Metadata")
-            meta_info = df[df["AWS_ID"] == station_select][['District', 'Mandal', 'Location', 'Circle']].drop_duplicates()
+            meta_info = stations.loc[[station_select], ['District', 'Mandal', 'Location', 'Circle']]
             st.dataframe(meta_info, hide_index=True, use_container_width=True)
 
             # --- Analysis menu ---
@@ -484,47 +769,38 @@ if uploaded_file is not None:
                     "Rainy Days per Month and Season",
                     "High-Intensity and Maximum Rainfall Events",
                     "Monthly Distribution of Event Intensities",
+                    "Wet and Dry Spells",
                     "Event-to-Event Gap (Same Day)",
                     "Events by Hour Gap (1–6 hrs)",
-                    "Maximum Rainfall Intensity (Hourly/Event/Daily)"
+                    "Maximum Rainfall Intensity (Hourly/Event/Daily)",
+                    "Intensity-Duration (1–24 hrs)"
                 ],
                 index=0
             )
 
         with right_col:
-            df_station = df[df["AWS_ID"] == station_select]
-            daily_station = daily[daily["AWS_ID"] == station_select]
-            event_station = events[events["AWS_ID"] == station_select]
+            # Row-range slices and derived tables, memoized per station
+            station_view = data.station(station_select, event_threshold, event_gap, event_missing)
+            df_station = station_view['hourly']
+            daily_station = station_view['daily']
+            event_station = station_view['events']
 
             # ---------- 1️ Rainy Hours per Day ----------
             if analysis_choice == "Rainy Hours per Day":
                 st.markdown("####  Number of Rainy Hours per Day")
-                daily_rain_counts = df_station.groupby('Date')['Hourly_Rain'].apply(lambda x: (x > 0).sum()).reset_index(name='Hours_Rained')
+                daily_rain_counts = station_view['rainy_hours']
                 col1, col2 = st.columns([1, 2])
                 with col1:
                     st.dataframe(daily_rain_counts, use_container_width=True)
                 with col2:
                     fig = px.bar(daily_rain_counts, x='Date', y='Hours_Rained', title=f'Number of Rainy Hours per Day - {station_select}',color_discrete_sequence=["#A6B1B8"])
-                    st.plotly_chart(fig, use_container_width=True)
+                    plotly_chart(fig, use_container_width=True)
 
             # ---------- 2 Rainy Days per Month and Season ----------
             elif analysis_choice == "Rainy Days per Month and Season":
                 st.markdown("####  Number of Rainy Days per Month and Season")
-                daily_station['RainDay'] = (daily_station['Daily_Rainfall'] > 0).astype(int)
-
-                def get_season(month):
-                    if month in [1, 2]:
-                        return 'Winter'
-                    elif month in [3, 4, 5]:
-                        return 'Pre-Monsoon'
-                    elif month in [6, 7, 8]:
-                        return 'Monsoon'
-                    else:
-                        return 'Post-Monsoon'
-
-                daily_station['Season'] = daily_station['Month'].apply(get_season)
-                monthly_rain_days = daily_station.groupby('Month')['RainDay'].sum().reset_index(name='Rainy_Days')
-                seasonal_rain_days = daily_station.groupby('Season')['RainDay'].sum().reset_index(name='Rainy_Days')
+                monthly_rain_days = station_view['monthly_rainy_days']
+                seasonal_rain_days = station_view['seasonal_rainy_days']
 
                 col3, col4 = st.columns([1, 2])
                 with col3:
@@ -534,12 +810,12 @@ if uploaded_file is not None:
                     st.dataframe(seasonal_rain_days, hide_index=True, use_container_width=True)
                 with col4:
                     fig = px.bar(monthly_rain_days, x='Month', y='Rainy_Days', title=f'Rainy Days per Month - {station_select}',color_discrete_sequence=["#A6B1B8"])
-                    st.plotly_chart(fig, use_container_width=True)
+                    plotly_chart(fig, use_container_width=True)
 
             # ---------- 3️ High-Intensity and Maximum Rainfall Events ----------
             elif analysis_choice == "High-Intensity and Maximum Rainfall Events":
                 st.markdown("####  High-Intensity and Maximum Rainfall Events")
-                intense_events = event_station[event_station['Average_Intensity'] > 5]
+                intense_events = station_view['intense_events']
 
                 col5, col6 = st.columns([1, 2])
                 with col5:
@@ -550,23 +826,263 @@ if uploaded_file is not None:
                     fig = px.histogram(intense_events, x="Average_Intensity", nbins=20,
                                     color_discrete_sequence=["#959799"],
                                     title=f"Distribution of High-Intensity Events (>5 mm/hr) - {station_select}")
-                    st.plotly_chart(fig, use_container_width=True)
+                    plotly_chart(fig, use_container_width=True)
 
             # ---------- 4️ Monthly Distribution of Event Intensities ----------
             elif analysis_choice == "Monthly Distribution of Event Intensities":
                 st.markdown("####  Monthly Distribution of Event Intensities")
-                monthly_intensity = event_station.copy()
-                monthly_intensity['Month'] = monthly_intensity['Start'].dt.month
-                fig = px.box(monthly_intensity, x="Month", y="Average_Intensity",
+                fig = px.box(event_station, x="Month", y="Average_Intensity",
                             title=f"Monthly Distribution of Event Intensities - {station_select}",
                             color_discrete_sequence=["#A6B1B8"])
-                st.plotly_chart(fig, use_container_width=True)
-            
+                plotly_chart(fig, use_container_width=True)
+
+            # ---------- 5 Wet and Dry Spells ----------
+            elif analysis_choice == "Wet and Dry Spells":
+                st.markdown("####  Wet and Dry Spells")
+                st.caption("A spell is a run of consecutive rainy (or dry) days; a missing day ends the spell.")
+                spells = station_view['spells']
+                spell_stats = spell_summary(spells).iloc[0]
+
+                col7, col8 = st.columns([1, 2])
+                with col7:
+                    st.metric("Longest Wet Spell (days)", f"{spell_stats['Longest_Wet_Spell_days']}")
+                    if spell_stats['Longest_Wet_Spell_days']:
+                        st.caption(f"{spell_stats['Longest_Wet_Spell_Start']:%d-%m-%Y} to "
+                                   f"{spell_stats['Longest_Wet_Spell_End']:%d-%m-%Y}")
+                    st.metric("Longest Dry Spell (days)", f"{spell_stats['Longest_Dry_Spell_days']}")
+                    if spell_stats['Longest_Dry_Spell_days']:
+                        st.caption(f"{spell_stats['Longest_Dry_Spell_Start']:%d-%m-%Y} to "
+                                   f"{spell_stats['Longest_Dry_Spell_End']:%d-%m-%Y}")
+                    st.dataframe(spells.drop(columns='AWS_ID'), hide_index=True, use_container_width=True)
+                with col8:
+                    distribution = spell_distribution(spells)
+                    distribution['Spell'] = distribution['Wet'].map({True: 'Wet', False: 'Dry'})
+                    fig = px.bar(distribution, x='Length_days', y='Spells', color='Spell', barmode='group',
+                                 title=f"Spell Length Distribution - {station_select}",
+                                 color_discrete_map={'Wet': "#5B7C99", 'Dry': "#A6B1B8"})
+                    plotly_chart(fig, use_container_width=True)
+
+            # ---------- 6 Event-to-Event Gap (Same Day) ----------
+            elif analysis_choice == "Event-to-Event Gap (Same Day)":
+                st.markdown("####  Dry Gap Between Consecutive Events on the Same Day")
+                same_day_gaps = station_view['same_day_gaps']
+
+                col9, col10 = st.columns([1, 2])
+                with col9:
+                    st.metric("Same-Day Event Pairs", f"{len(same_day_gaps)}")
+                    if len(same_day_gaps):
+                        st.metric("Median Gap (hrs)", f"{same_day_gaps['Gap_hrs'].median():.1f}")
+                    st.dataframe(same_day_gaps, hide_index=True, use_container_width=True)
+                with col10:
+                    fig = px.histogram(same_day_gaps, x="Gap_hrs", nbins=24,
+                                       color_discrete_sequence=["#A6B1B8"],
+                                       title=f"Gap Between Same-Day Events - {station_select}")
+                    fig.update_layout(xaxis_title="Dry hours between events", yaxis_title="Event pairs")
+                    plotly_chart(fig, use_container_width=True)
+
+            # ---------- 7 Events by Hour Gap (1–6 hrs) ----------
+            elif analysis_choice == "Events by Hour Gap (1–6 hrs)":
+                st.markdown("####  Events by Minimum Dry Gap (1–6 hrs)")
+                st.caption("Events re-segmented with each minimum dry gap; wet-hour threshold and "
+                           "missing-hour tolerance follow the Event Definition in the sidebar.")
+                gap_summary = station_view['gap_summary']
+
+                col11, col12 = st.columns([1, 2])
+                with col11:
+                    st.dataframe(gap_summary.round(2), hide_index=True, use_container_width=True)
+                with col12:
+                    fig = px.bar(gap_summary, x='Min_Gap_hrs', y='Events',
+                                 hover_data=['Mean_Duration_hrs', 'Mean_Total_Rain', 'Mean_Intensity'],
+                                 title=f"Number of Events by Minimum Dry Gap - {station_select}",
+                                 color_discrete_sequence=["#A6B1B8"])
+                    fig.update_layout(xaxis_title="Minimum dry gap (hrs)")
+                    plotly_chart(fig, use_container_width=True)
+
+            # ---------- 8 Maximum Rainfall Intensity ----------
+            elif analysis_choice == "Maximum Rainfall Intensity (Hourly/Event/Daily)":
+                st.markdown("####  Maximum Rainfall Intensity")
+                station_max = station_view['maxima']
+                maxima = data.maxima(event_threshold, event_gap, event_missing)
+
+                col13, col14, col15 = st.columns(3)
+                for col, label, unit, fmt in [(col13, 'Hourly', 'mm/hr', '%d-%m-%Y %H:%M'),
+                                              (col14, 'Event', 'mm/hr', '%d-%m-%Y %H:%M'),
+                                              (col15, 'Daily', 'mm/day', '%d-%m-%Y')]:
+                    with col:
+                        st.metric(f"Max {label} Intensity ({unit})", f"{station_max[f'Max_{label}']:.2f}")
+                        if pd.notna(station_max[f'Max_{label}_Time']):
+                            st.caption(f"{station_max[f'Max_{label}_Time']:{fmt}}")
+
+                comparison = pd.DataFrame({
+                    'Measure': ['Hourly (mm/hr)', 'Event (mm/hr)', 'Daily (mm/day)'],
+                    'Station': [station_max['Max_Hourly'], station_max['Max_Event'], station_max['Max_Daily']],
+                    'All Stations (mean)': [maxima['Max_Hourly'].mean(), maxima['Max_Event'].mean(),
+                                            maxima['Max_Daily'].mean()],
+                    'All Stations (max)': [maxima['Max_Hourly'].max(), maxima['Max_Event'].max(),
+                                           maxima['Max_Daily'].max()],
+                }).melt(id_vars='Measure', var_name='Series', value_name='Maximum')
+                fig = px.bar(comparison, x='Measure', y='Maximum', color='Series', barmode='group',
+                             title=f"Maximum Intensity - {station_select} vs All Stations",
+                             color_discrete_sequence=["#5B7C99", "#A6B1B8", "#959799"])
+                plotly_chart(fig, use_container_width=True)
+
+            # ---------- 9 Intensity-Duration ----------
+            elif analysis_choice == "Intensity-Duration (1–24 hrs)":
+                st.markdown("####  Maximum Rainfall Intensity by Duration")
+                st.caption("Largest rainfall depth over any 1, 2, 3, 6, 12 or 24 consecutive clock hours; "
+                           "missing hours count as dry.")
+                annual_maxima = station_view['annual_maxima']
+
+                col16, col17 = st.columns([1, 2])
+                with col16:
+                    st.write("**Annual Maximum Depth (mm)**")
+                    st.dataframe(annual_maxima.pivot(index='Year', columns='Duration_hrs', values='Max_Depth'),
+                                 use_container_width=True)
+                    st.write("**Annual Maximum Intensity (mm/hr)**")
+                    st.dataframe(annual_maxima.pivot(index='Year', columns='Duration_hrs', values='Intensity').round(2),
+                                 use_container_width=True)
+                with col17:
+                    fig = px.line(annual_maxima, x='Duration_hrs', y='Intensity', color=annual_maxima['Year'].astype(str),
+                                  markers=True, log_x=True, log_y=True, hover_data=['Max_Depth', 'End'],
+                                  title=f"Intensity-Duration Curve - {station_select}")
+                    fig.update_layout(xaxis_title="Duration (hrs)", yaxis_title="Intensity (mm/hr)",
+                                      legend_title="Year")
+                    fig.update_xaxes(tickvals=[1, 2, 3, 6, 12, 24])
+                    plotly_chart(fig, use_container_width=True)
+
+                with st.expander("Monthly maxima"):
+                    st.dataframe(station_view['monthly_maxima'].drop(columns='AWS_ID'), hide_index=True,
+                                 use_container_width=True)
+
+    # =========================
+    # TAB 5 - CIRCLE ROLLUPS
+    # =========================
+    with tab5, profiler.stage('tab: circle rollups'):
+        st.subheader("Circle, Mandal and District Rollups")
+        st.info("Station tables aggregated to administrative units; coverage is the share of reporting "
+                "stations above the threshold.")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            unit = st.radio("Unit:", ["Circle", "Mandal", "District"], horizontal=True)
+        with col2:
+            level = st.radio("Table:", ["Daily", "Hourly", "Events"], horizontal=True)
+        with col3:
+            unit_threshold = st.number_input("Rainfall threshold (mm):", min_value=0.0,
+                                             value=2.5 if level == "Daily" else 0.0, step=0.5,
+                                             disabled=level == "Events", key="unit_threshold")
+
+        members = data.members(BOUNDARY_PATH if os.path.exists(BOUNDARY_PATH) else None)
+        with st.expander("Station membership"):
+            if 'Inside_Boundary' in members.columns and not members['Inside_Boundary'].all():
+                st.warning(f"{int((~members['Inside_Boundary']).sum())} station(s) lie outside the GHMC boundary.")
+            st.dataframe(members, use_container_width=True)
+
+        if level == "Events":
+            unit_events = data.rollup(unit, 'events', event_params=(event_threshold, event_gap, event_missing))
+            col4, col5 = st.columns([1.2, 1.8])
+            with col4:
+                st.dataframe(unit_events.round(2), hide_index=True, use_container_width=True)
+            with col5:
+                fig = px.bar(unit_events, x=unit, y='Events',
+                             hover_data=['Stations', 'Mean_Total_Rain', 'Max_Intensity'], title=f"Rain Events per {unit}", color_discrete_sequence=["#5B7C99"])
+                plotly_chart(fig, use_container_width=True)
+        else:
+            time_col = 'Date' if level == "Daily" else 'DateTime'
+            unit_table = data.rollup(unit, level.lower(), unit_threshold)
+            steps_over = f"{'Days' if level == 'Daily' else 'Hours'}_Over"
+            overview = unit_table.assign(**{steps_over: unit_table['Stations_Over'] > 0}).groupby(unit, sort=True).agg(
+                Stations=('Stations', 'first'), Mean=('Mean', 'mean'), Max=('Max', 'max'),
+                Mean_Coverage=('Coverage', 'mean'), **{steps_over: (steps_over, 'sum')},
+            ).reset_index()
+
+            col4, col5 = st.columns([1.2, 1.8])
+            with col4:
+                st.dataframe(overview.round(2), hide_index=True, use_container_width=True)
+            with col5:
+                measure = st.selectbox("Measure:", ['Mean', 'Max', 'Coverage', 'Stations_Over'])
+                chosen = st.multiselect(f"{unit}s:", overview[unit], default=list(overview[unit][:5]))
+                long_series_chart(unit_table[unit_table[unit].isin(chosen)], time_col, measure,
+                                  f"{unit}_{level}_rollup_chart", color=unit,
+                                  title=f"{level} {measure.replace('_', ' ')} by {unit}")
+
+            with st.expander(f"{level} rollup table"):
+                st.dataframe(unit_table, hide_index=True, use_container_width=True)
+
+    # =========================
+    # TAB 6 - STORM TRACKING
+    # =========================
+    with tab6, profiler.stage('tab: storm tracking'):
+        st.subheader("Storms Linked Across Stations")
+        st.caption("Station events (sidebar definition) that overlap in time at stations within the link "
+                   "radius are joined into one storm.")
 
-   
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            link_km = st.slider("Link radius (km)", 1.0, 15.0, 5.0, step=0.5)
+        with col2:
+            link_gap = st.slider("Hours allowed between neighbouring events", 0, 6, 1)
+        with col3:
+            min_storm_stations = st.number_input("Minimum stations per storm", min_value=1, value=3, step=1)
+
+        storms_table, storm_members = data.storms(link_km, link_gap, (event_threshold, event_gap, event_missing))
+        shown = storms_table[storms_table['Stations'] >= min_storm_stations]
+        st.write(f"{len(storms_table):,} storms from {len(storm_members):,} station events; "
+                 f"{len(shown):,} reached at least {min_storm_stations} station(s).")
+
+        if shown.empty:
+            st.warning("No storms match the selection.")
+        else:
+            col4, col5 = st.columns([1.2, 1.8])
+            with col4:
+                storm_order = shown.sort_values('Total_Rain', ascending=False)
+                paged_table(storm_order.round(2), None, "storm_page")
+            with col5:
+                # Uniform sample, so mid-size storms are drawn in proportion rather than only the extremes.
+                points = shown if len(shown) <= SCATTER_POINTS else shown.sample(SCATTER_POINTS, random_state=0)
+                fig = px.scatter(points, x='Start', y='Stations',
+                                 size='Total_Rain', color='Max_Hourly', hover_data=['Storm_ID', 'Peak_Station',
+                                                                                    'Duration_hrs', 'Speed_kmh'],
+                                 color_continuous_scale="Blues", title="Storms by Start and Footprint")
+                plotly_chart(fig, use_container_width=True)
+                if len(points) < len(shown):
+                    st.caption(f"Showing a uniform sample of {len(points):,} of {len(shown):,} storms.")
+
+            storm_id = int(st.number_input("Storm ID to map:", min_value=int(storms_table['Storm_ID'].min()),
+                                           max_value=int(storms_table['Storm_ID'].max()),
+                                           value=int(storm_order['Storm_ID'].iloc[0]), step=1))
+            storm = storms_table.set_index('Storm_ID').loc[storm_id]
+            track = storm_track(storm_members, data.neighbours(link_km), storm_id)
+            fig = px.scatter_mapbox(track.dropna(subset=['Latitude', 'Longitude']), lat="Latitude", lon="Longitude",
+                                    color="Onset_hrs", size="Total_Rain", hover_name="AWS_ID",
+                                    hover_data=["Total_Rain", "Max_Hourly", "Events"],
+                                    color_continuous_scale="Viridis", mapbox_style="open-street-map", zoom=9,
+                                    title=f"Storm {storm_id}: onset hours after {storm['Start']:%d-%m-%Y %H:00}")
+            plotly_chart(fig, use_container_width=True)
+            movement = ("stationary or simultaneous onset" if pd.isna(storm['Speed_kmh'])
+                        else f"moving {storm['Speed_kmh']:.1f} km/h towards {storm['Heading_deg']:.0f}°")
+            st.caption(f"{int(storm['Stations'])} stations over {int(storm['Duration_hrs'])} hours, "
+                       f"peak {storm['Peak_Rain']:.1f} mm at {storm['Peak_Station']}, {movement}.")
 
 else:
-    st.info(" Please upload a CSV file to start the analysis.")
+    st.info(" Please upload a CSV file or open a Parquet store to start the analysis.")
+
+# ---------- PERFORMANCE PROFILE ----------
+with st.sidebar.expander("Performance Profile"):
+    st.toggle("Trace peak memory (slower)", key="profile_memory",
+              help="Records the peak Python allocation of each stage with tracemalloc from the next rerun on.")
+    log_profile = st.checkbox("Write each rerun to a log file", key="profile_log")
+    log_path = st.text_input("Log file (JSON lines)", value=LOG_FILE, key="profile_log_path", disabled=not log_profile)
+    timings = pd.DataFrame(profiler.records(), columns=['stage', 'seconds', 'rows', 'peak_mb'])
+    st.dataframe(timings.style.format({'seconds': '{:.3f}', 'rows': '{:,.0f}', 'peak_mb': '{:.1f}'}, na_rep=''),
+                 hide_index=True, use_container_width=True)
+    rss = peak_rss_mb()
+    st.caption(f"Rerun wall time {profiler.elapsed:.2f} s"
+               + (f"; process peak RSS {rss:,.0f} MB" if rss is not None else "") + ". "
+               "Data stages run only on a cache miss; chart serialization is counted inside the tabs too.")
+    if log_profile:
+        profiler.log(log_path, source=data_source, data_key=data.key if data is not None else None,
+                     cache_hit=cache_hit if data is not None else None)
 
 # ---------- FOOTER ----------
 st.markdown("""
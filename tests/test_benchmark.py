@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall import benchmark, synthetic
+
+
+def test_year_is_reproducible_and_shaped_like_an_export():
+    stations = synthetic.station_table(n_stations=3)
+    frame = synthetic.year_frame(stations, 1999)
+    pd.testing.assert_frame_equal(frame, synthetic.year_frame(stations, 1999))
+    assert not frame.equals(synthetic.year_frame(stations, 1999, seed=1))
+
+    assert list(frame.columns) == synthetic.COLUMNS
+    assert frame['AWS_ID'].unique().tolist() == [10001, 10002, 10003]
+    # Some hours are dropped from the 8,760 of each station.
+    assert 0.9 * 3 * 8760 < len(frame) < 3 * 8760
+    rain = frame['Hourly__Rainfall_(mm)'].to_numpy()
+    assert (rain >= 0).all() and (rain % synthetic.TIP_MM == 0).all()
+    assert 0.0 < (rain > 0).mean() < 0.2
+    month = pd.to_datetime(frame['Date_&_Time'], format=synthetic.TIME_FORMAT).dt.month
+    assert rain[month.between(6, 10).to_numpy()].sum() > 0.6 * rain.sum()
+
+
+def test_longer_records_extend_backwards(tmp_path):
+    one = synthetic.write_dataset(str(tmp_path / 'one'), years=1, n_stations=2)
+    two = synthetic.write_dataset(str(tmp_path / 'two'), years=2, n_stations=2, last_year=2025)
+    assert [p.rsplit('_', 1)[1] for p in two] == ['2024.csv', '2025.csv']
+    with open(one[0]) as a, open(two[1]) as b:
+        assert a.read() == b.read()
+
+
+def test_existing_files_are_reused(tmp_path):
+    path, = synthetic.write_dataset(str(tmp_path), years=1, n_stations=2)
+    with open(path, 'w') as f:
+        f.write('kept\n')
+    assert synthetic.write_dataset(str(tmp_path), years=1, n_stations=2) == [path]
+    with open(path) as f:
+        assert f.read() == 'kept\n'
+
+
+def test_compare_flags_real_slowdowns_only():
+    baseline = {'stages': [{'stage': 'parse', 'seconds': 1.0}, {'stage': 'daily', 'seconds': 0.01},
+                           {'stage': 'events', 'seconds': 2.0}]}
+    result = {'stages': [{'stage': 'parse', 'seconds': 1.3}, {'stage': 'daily', 'seconds': 0.03},
+                         {'stage': 'events', 'seconds': 2.4}, {'stage': 'storms', 'seconds': 9.0}]}
+    # daily tripled but by 0.02 s only; events is within 25 %; storms has no baseline.
+    assert benchmark.compare(result, baseline) == [('parse', 1.0, 1.3)]
+
+
+def test_pipeline_mode_stages(tmp_path):
+    paths = synthetic.write_dataset(str(tmp_path), years=1, n_stations=2)
+    records, n_rows = benchmark.measure(paths, mode='pipeline')
+    stages = [r['stage'] for r in records]
+    assert stages[:3] == ['discover', 'parse', 'combine'] and 'storms' in stages
+    assert n_rows == len(pd.read_csv(paths[0]))
+    assert all(r['peak_mb'] is not None and r['seconds'] >= 0 for r in records)
+
+
+def test_dashboard_mode_stages(tmp_path):
+    pytest.importorskip('plotly')
+    paths = synthetic.write_dataset(str(tmp_path), years=1, n_stations=2)
+    records, _ = benchmark.measure(paths)
+    assert [r['stage'] for r in records][-1] == 'figures'
+    assert np.isfinite([r['seconds'] for r in records]).all()
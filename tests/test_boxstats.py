@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from rainfall.boxstats import BOX_COLS, box_summary, group_totals
+
+
+def test_box_by_hand():
+    frame = pd.DataFrame({
+        'AWS_ID': [1] * 6 + [2],
+        'Daily_Rainfall': [4.0, 100.0, 1.0, np.nan, 3.0, 2.0, 5.0],
+    })
+    stats, outliers = box_summary(frame, 'Daily_Rainfall', 'AWS_ID')
+    assert list(stats.columns) == ['AWS_ID'] + BOX_COLS
+    one, two = stats.set_index('AWS_ID').loc[1], stats.set_index('AWS_ID').loc[2]
+    # 1, 2, 3, 4, 100 (the missing day is ignored): quartiles 2 and 4, fences -1 and 7.
+    assert one[['Count', 'Sum', 'Min', 'Q1', 'Median', 'Q3', 'Max']].tolist() == [5, 110.0, 1.0, 2.0, 3.0, 4.0, 100.0]
+    assert one[['Lower_Whisker', 'Upper_Whisker', 'Outliers']].tolist() == [1.0, 4.0, 1]
+    # A single value is its own box.
+    assert two[['Count', 'Q1', 'Median', 'Q3', 'Lower_Whisker', 'Upper_Whisker', 'Outliers']].tolist() == \
+        [1, 5.0, 5.0, 5.0, 5.0, 5.0, 0]
+    assert outliers.values.tolist() == [[1, 100.0]]
+
+
+def test_outliers_are_capped_at_each_end():
+    frame = pd.DataFrame({'Month': 7, 'Circle': 'Uppal', 'v': [10.0] * 5 + [50.0, 60.0, -40.0]})
+    stats, outliers = box_summary(frame, 'v', ['Month', 'Circle'], max_outliers=1)
+    # Quartiles 10 and 20: fences -5 and 35 leave three outliers, of which the extremes are kept.
+    assert stats[['Q1', 'Q3', 'Outliers']].values.tolist() == [[10.0, 20.0, 3]]
+    assert outliers.values.tolist() == [[7, 'Uppal', -40.0], [7, 'Uppal', 60.0]]
+
+
+def test_nothing_to_summarise():
+    stats, outliers = box_summary(pd.DataFrame({'AWS_ID': [1], 'v': [np.nan]}), 'v', 'AWS_ID')
+    assert stats.empty and list(stats.columns) == ['AWS_ID'] + BOX_COLS
+    assert outliers.empty
+
+
+def test_group_totals():
+    frame = pd.DataFrame({'Month': [6, 6, 7], 'AWS_ID': [2, 2, 2], 'Daily_Rainfall': [1.5, np.nan, 4.0]})
+    assert group_totals(frame, 'Daily_Rainfall', ['Month', 'AWS_ID']).values.tolist() == [[6, 2, 1.5, 1],
+                                                                                          [7, 2, 4.0, 1]]
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from rainfall.daily import DAILY_COLS, build_daily, daily_parts, daily_table, merge_parts
+
+
+def hourly(rows):
+    return pd.DataFrame(rows, columns=['AWS_ID', 'DateTime', 'Hourly_Rain']).astype({'DateTime': 'datetime64[ns]'})
+
+
+ROWS = [
+    # Station 12: a wet day, a dry day and one hour on the next day.
+    (12, '1997-02-28 00:00', 0.5),
+    (12, '1997-02-28 01:00', 0.0),
+    (12, '1997-02-28 02:00', 2.5),
+    (12, '1997-02-28 23:00', 0.25),
+    (12, '1997-03-01 10:00', 0.0),
+    (12, '1997-03-01 11:00', 0.0),
+    (12, '1997-03-02 00:00', 4.0),
+    # Station 3 has a single hour, out of order with station 12.
+    (3, '1997-03-01 05:00', 1.0),
+]
+
+
+def test_station_days_by_hand():
+    daily = build_daily(hourly(ROWS))
+    assert list(daily.columns) == DAILY_COLS
+    assert daily['AWS_ID'].tolist() == [3, 12, 12, 12]
+    assert daily['Date'].dt.strftime('%Y-%m-%d').tolist() == ['1997-03-01', '1997-02-28', '1997-03-01', '1997-03-02']
+    assert daily['Month'].tolist() == [3, 2, 3, 3]
+    assert daily['Daily_Rainfall'].tolist() == [1.0, 3.25, 0.0, 4.0]
+    assert daily['Max_Hourly_Rain'].tolist() == [1.0, 2.5, 0.0, 4.0]
+    # Smallest wet hour; a dry day reports 0 rather than the +inf sentinel.
+    assert daily['Min_Hourly_Rain'].tolist() == [1.0, 0.25, 0.0, 4.0]
+    assert daily['Hours_Rained'].tolist() == [1, 3, 0, 1]
+    assert daily['Daily_Intensity'].tolist() == [1.0, 3.25 / 3, 0.0, 4.0]
+    assert daily['Hours_Recorded'].tolist() == [1, 4, 2, 1]
+
+
+def test_parts_merge_across_a_split_day():
+    frame = hourly(ROWS)
+    whole = build_daily(frame)
+    # Split inside 1997-02-28 of station 12, as a chunk boundary would.
+    merged = daily_table(merge_parts([daily_parts(frame.iloc[:2]), daily_parts(frame.iloc[2:])]))
+    pd.testing.assert_frame_equal(merged, whole)
+
+
+def test_no_rows():
+    daily = build_daily(hourly([]))
+    assert list(daily.columns) == DAILY_COLS and len(daily) == 0
+    assert daily['Daily_Rainfall'].dtype == np.float64
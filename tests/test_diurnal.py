@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall import quality
+from rainfall.diurnal import build_cube
+from rainfall.summaries import build_hourly_profile
+
+
+@pytest.fixture
+def grid():
+    """Three stations over the June/July month boundary, with gaps, NaN readings, a duplicate and a one-row station."""
+    rng = np.random.default_rng(5)
+    frames = []
+    for station in (4, 5):
+        hours = np.sort(rng.choice(24 * 8, 150, replace=False))
+        rain = rng.choice([0.0, 0.25, 1.0, 4.0, np.nan], size=len(hours), p=[0.55, 0.2, 0.1, 0.1, 0.05])
+        frames.append(pd.DataFrame({'AWS_ID': station, 'Hourly_Rain': rain,
+                                    'DateTime': pd.Timestamp('2025-06-27 03:00') + pd.to_timedelta(hours, 'h')}))
+    # A repeated record of station 4: the first reading is kept.
+    frames.append(frames[0].iloc[[10]].assign(Hourly_Rain=7.0))
+    frames.append(pd.DataFrame({'AWS_ID': [6], 'Hourly_Rain': [2.5], 'DateTime': [pd.Timestamp('2025-07-01 13:00')]}))
+    return quality.assess(pd.concat(frames, ignore_index=True))[1]
+
+
+def naive_cube(hourly):
+    """Sum, wet-hour and valid-hour counts per station, month and hour of day, by groupby."""
+    hourly = hourly.dropna(subset=['Hourly_Rain'])
+    keys = [hourly['AWS_ID'], hourly['DateTime'].dt.month, hourly['DateTime'].dt.hour]
+    return hourly.groupby(keys)['Hourly_Rain'].agg(total='sum', wet=lambda r: (r > 0).sum(), hours='size')
+
+
+def test_cube_matches_groupby(grid):
+    cube = build_cube(grid)
+    expected = naive_cube(grid.to_hourly())
+    station = cube.stations.get_indexer(expected.index.get_level_values(0))
+    month = expected.index.get_level_values(1) - 1
+    hour = expected.index.get_level_values(2)
+    for measure in ('total', 'wet', 'hours'):
+        dense = np.zeros((len(cube.stations), 12, 24))
+        dense[station, month, hour] = expected[measure]
+        np.testing.assert_allclose(getattr(cube, measure), dense)
+
+
+def test_profile_of_a_slice(grid):
+    cube = build_cube(grid)
+    hourly = grid.to_hourly()
+    july = hourly[(hourly['DateTime'].dt.month == 7) & hourly['AWS_ID'].isin([4, 6])].dropna(subset=['Hourly_Rain'])
+    by_hour = july.groupby(july['DateTime'].dt.hour)['Hourly_Rain']
+    profile = cube.profile(stations=[4, 6], months=[7]).set_index('Hour')
+    expected_hours = by_hour.size().reindex(range(24), fill_value=0)
+    np.testing.assert_array_equal(profile['Valid_Hours'], expected_hours)
+    np.testing.assert_allclose(profile['Mean_Hourly_Rain'],
+                               (by_hour.sum() / by_hour.size()).reindex(range(24), fill_value=0.0))
+    np.testing.assert_allclose(profile['Rainy_Hour_Frequency'],
+                               by_hour.agg(lambda r: (r > 0).sum()).reindex(range(24), fill_value=0))
+
+
+def test_station_profiles_match_hourly_profile(grid):
+    expected = build_hourly_profile(grid.to_hourly().dropna(subset=['Hourly_Rain']))
+    pd.testing.assert_frame_equal(build_cube(grid).station_profiles(), expected,
+                                  check_dtype=False, check_categorical=False)
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from rainfall.downsample import MIN_BUCKETS, bucket_extremes, downsample, n_buckets
+
+
+def test_bucket_extremes():
+    key = np.array([0, 0, 0, 1, 1, 2])
+    y = np.array([5.0, 1.0, 3.0, 2.0, 2.0, 7.0])
+    # Bucket 0 keeps its min (row 1) and max (row 0); a single-row bucket keeps its row once.
+    assert bucket_extremes(key, y).tolist() == [0, 1, 3, 4, 5]
+
+
+def test_bucket_budget():
+    assert n_buckets(width=1000) == 500
+    assert n_buckets(width=1000, n_series=100, max_points=50_000) == 250
+    assert n_buckets(width=4) == MIN_BUCKETS
+
+
+def test_spikes_survive():
+    times = pd.date_range('1999-01-01', periods=24 * 100, freq='h')
+    rain = np.zeros(len(times))
+    rain[1234] = 87.5
+    frame = pd.DataFrame({'DateTime': times, 'Hourly_Rain': rain})
+    kept = downsample(frame, 'DateTime', 'Hourly_Rain', width=20)
+    assert len(kept) <= 2 * 10
+    assert kept['Hourly_Rain'].max() == 87.5 and kept.index.is_monotonic_increasing
+    assert kept.loc[1234, 'DateTime'] == times[1234]
+
+
+def test_series_share_the_x_buckets():
+    frame = pd.DataFrame({'AWS_ID': [1] * 500 + [2] * 3, 'x': list(range(500)) + [0, 1, 2],
+                          'y': list(np.arange(500) % 7) + [9.0, 8.0, 7.0]})
+    kept = downsample(frame, 'x', 'y', by='AWS_ID', width=20)
+    assert (kept['AWS_ID'] == 1).sum() == 2 * 10
+    # The short series lies within the first bucket of the shared axis and keeps its extremes.
+    assert kept[kept['AWS_ID'] == 2]['y'].tolist() == [9.0, 7.0]
+
+
+def test_small_frames_and_zoom():
+    frame = pd.DataFrame({'x': pd.date_range('2000-01-01', periods=5, freq='D'), 'y': [1.0, 2, 3, 4, 5]})
+    assert downsample(frame, 'x', 'y') is frame
+    zoomed = downsample(frame, 'x', 'y', x_range=('2000-01-04', '2000-01-02'))
+    assert zoomed['y'].tolist() == [2.0, 3.0, 4.0]
+    assert downsample(frame.iloc[:0], 'x', 'y').empty
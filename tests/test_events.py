@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall.events import EVENT_COLS, build_events, build_gap_events
+
+
+def naive_events(df, threshold=0.0, min_gap_hours=1, max_missing_hours=0):
+    """Row-by-row reference of the event definition in ``rainfall.events``."""
+    rows = []
+    for station, group in df.groupby('AWS_ID', sort=True):
+        hours = (group['DateTime'] - pd.Timestamp(0)) // pd.Timedelta(hours=1)
+        hours = hours.to_numpy()
+        rain = group['Hourly_Rain'].fillna(0.0).to_numpy()
+        events = []
+        for i in np.flatnonzero(rain > threshold):
+            if events:
+                last = events[-1][1]
+                dry = hours[i] - hours[last] - 1
+                missing = dry - (i - last - 1)
+                if dry < min_gap_hours and missing <= max_missing_hours:
+                    events[-1][1] = i
+                    continue
+            events.append([i, i])
+        for number, (a, b) in enumerate(events, start=1):
+            total = rain[a:b + 1].sum()
+            duration = hours[b] - hours[a] + 1
+            rows.append([station, number, group['DateTime'].iloc[a], group['DateTime'].iloc[b], duration,
+                         total, rain[a:b + 1].max(), total / duration])
+    return pd.DataFrame(rows, columns=EVENT_COLS)
+
+
+def hourly_fixture(seed):
+    """Three stations with dry and wet hours, absent hours, NaN readings and a one-row station."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for station in (1, 2):
+        hours = np.sort(rng.choice(200, 150, replace=False))
+        rain = rng.choice([0.0, 0.25, 0.5, 2.0, np.nan], size=len(hours), p=[0.5, 0.15, 0.15, 0.1, 0.1])
+        frames.append(pd.DataFrame({'AWS_ID': station, 'DateTime': pd.Timestamp('2025-07-01') + pd.to_timedelta(hours, 'h'),
+                                    'Hourly_Rain': rain}))
+    frames.append(pd.DataFrame({'AWS_ID': [3], 'DateTime': [pd.Timestamp('2025-07-02')], 'Hourly_Rain': [1.5]}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def compare(actual, expected):
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected, check_dtype=False)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('params', [(0.0, 1, 0), (0.0, 3, 0), (0.3, 2, 1), (0.0, 4, 3)])
+def test_events_match_naive_reference(seed, params):
+    df = hourly_fixture(seed)
+    compare(build_events(df, *params), naive_events(df, *params))
+
+
+def test_nan_inside_and_between_events():
+    times = pd.date_range('2025-07-01', periods=7, freq='h')
+    df = pd.DataFrame({'AWS_ID': 1, 'DateTime': times, 'Hourly_Rain': [1.0, np.nan, 2.0, 0.0, np.nan, 0.0, 3.0]})
+    events = build_events(df, min_gap_hours=2)
+    assert events['Total_Rain'].tolist() == [3.0, 3.0]
+    assert events['Max_Hourly'].tolist() == [2.0, 3.0]
+    assert not events[['Total_Rain', 'Average_Intensity']].isna().any().any()
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_gap_events_match_single_gap_runs(seed):
+    df = hourly_fixture(seed)
+    stacked = build_gap_events(df, gaps=range(1, 5))
+    for gap in range(1, 5):
+        compare(stacked[stacked['Min_Gap_hrs'] == gap].drop(columns='Min_Gap_hrs'), naive_events(df, 0.0, gap, 0))
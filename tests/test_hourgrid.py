@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall import quality
+from rainfall.daily import build_daily
+from rainfall.events import build_events
+
+
+@pytest.fixture
+def grid():
+    rng = np.random.default_rng(3)
+    frames = []
+    for station in (7, 8, 9):
+        hours = np.sort(rng.choice(24 * 6, 100, replace=False))
+        rain = rng.choice([0.0, 0.25, 1.0, 3.5, np.nan], size=len(hours), p=[0.5, 0.2, 0.15, 0.1, 0.05])
+        frames.append(pd.DataFrame({'AWS_ID': station, 'Hourly_Rain': rain,
+                                    'DateTime': pd.Timestamp('2025-06-30 05:00') + pd.to_timedelta(hours, 'h')}))
+    return quality.assess(pd.concat(frames, ignore_index=True))[1]
+
+
+def test_grid_is_day_aligned(grid):
+    assert grid.first_hour % 24 == 0
+    assert grid.rain.shape[1] % 24 == 0
+    assert grid.rain.dtype == np.float32
+
+
+@pytest.mark.parametrize('params', [(0.0, 1, 0), (0.0, 3, 0), (0.3, 2, 2)])
+def test_grid_events_match_long_frame(grid, params):
+    expected = build_events(grid.to_hourly(), *params)
+    pd.testing.assert_frame_equal(grid.events(*params), expected, check_dtype=False, check_categorical=False)
+
+
+def test_grid_daily_matches_long_frame(grid):
+    daily = grid.daily()
+    assert daily['Date'].dtype == 'datetime64[ns]'
+    pd.testing.assert_frame_equal(daily, build_daily(grid.to_hourly()), check_dtype=False)
+
+
+def test_window_drops_hours_without_readings(grid):
+    frame = grid.window('2025-06-30', '2025-07-01 23:00')
+    assert list(frame.columns) == [7, 8, 9]
+    assert not frame.isna().all(axis=1).any()
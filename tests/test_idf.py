@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall.idf import MAXIMA_COLS, RollingWindows, build_annual_maxima, build_monthly_maxima
+
+
+def hourly(rows):
+    frame = pd.DataFrame(rows, columns=['AWS_ID', 'DateTime', 'Hourly_Rain'])
+    return frame.astype({'DateTime': 'datetime64[ns]'})
+
+
+def test_windows_skip_missing_hours_and_stay_in_station():
+    # Station 1 records hours 0, 1, 2 and 5; station 2 starts right after in the key order.
+    windows = RollingWindows(np.array([1, 1, 1, 1, 2, 2]), np.array([0, 1, 2, 5, 6, 7]),
+                             np.array([1.0, 2.0, 4.0, 8.0, 16.0, 32.0]), max_duration=6)
+    assert windows.depth(1).tolist() == [1.0, 2.0, 4.0, 8.0, 16.0, 32.0]
+    assert windows.depth(2).tolist() == [1.0, 3.0, 6.0, 8.0, 16.0, 48.0]
+    # (t - 4, t]: the missing hours 3 and 4 add nothing.
+    assert windows.depth(4).tolist() == [1.0, 3.0, 7.0, 12.0, 16.0, 48.0]
+    with pytest.raises(ValueError):
+        windows.depth(7)
+
+
+def test_annual_maxima_by_hand():
+    rows = [
+        # Station 6 across the turn of 1999: the 2-hour window over midnight belongs to 2000.
+        (6, '1999-12-31 22:00', 3.0),
+        (6, '1999-12-31 23:00', 5.0),
+        (6, '2000-01-01 00:00', 5.0),
+        (6, '2000-01-01 01:00', 0.0),
+        (6, '2000-01-01 02:00', 5.0),
+        # A single-hour station.
+        (9, '2000-06-01 12:00', 2.0),
+    ]
+    maxima = build_annual_maxima(hourly(rows), durations=(1, 2, 3))
+    assert list(maxima.columns) == ['AWS_ID', 'Year', 'Duration_hrs', 'Max_Depth', 'Intensity', 'End']
+    assert maxima[['AWS_ID', 'Year', 'Duration_hrs', 'Max_Depth']].values.tolist() == [
+        [6, 1999, 1, 5.0], [6, 1999, 2, 8.0], [6, 1999, 3, 8.0],
+        [6, 2000, 1, 5.0], [6, 2000, 2, 10.0], [6, 2000, 3, 13.0],
+        [9, 2000, 1, 2.0], [9, 2000, 2, 2.0], [9, 2000, 3, 2.0],
+    ]
+    assert maxima['Intensity'].tolist()[3:6] == [5.0, 5.0, 13.0 / 3]
+    # Ties resolve to the earliest window: the 1-hour maximum of 2000 ends at midnight, not at 02:00.
+    assert maxima.loc[3, 'End'] == pd.Timestamp('2000-01-01 00:00')
+
+
+def test_monthly_maxima_split_by_month():
+    rows = [(1, '2021-07-31 23:00', 4.0), (1, '2021-08-01 00:00', 1.0)]
+    maxima = build_monthly_maxima(hourly(rows), durations=(1, 2))
+    assert maxima[['Month', 'Duration_hrs', 'Max_Depth']].values.tolist() == [[7, 1, 4.0], [7, 2, 4.0],
+                                                                              [8, 1, 1.0], [8, 2, 5.0]]
+
+
+def test_no_hours():
+    assert list(build_monthly_maxima(hourly([])).columns) == MAXIMA_COLS
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall import incremental, pipeline, store, synthetic
+
+TABLES = {
+    'hourly': ['AWS_ID', 'DateTime'],
+    'daily': ['AWS_ID', 'Date'],
+    'events': ['AWS_ID', 'EventID'],
+    'hourly_profile': ['AWS_ID', 'Hour'],
+    'rainy_days': ['AWS_ID'],
+}
+
+
+@pytest.fixture(scope='module')
+def feeds(tmp_path_factory):
+    """A year split into a history file and a later feed, plus both as one file in arrival order.
+
+    The feed re-sends some of the last history hours with revised readings,
+    repeats a few of its own records and starts a station the history never saw.
+    """
+    folder = tmp_path_factory.mktemp('incremental')
+    raw = pd.read_csv(synthetic.write_dataset(str(folder / 'clean'), years=1, n_stations=5)[0], dtype=str)
+    datetimes = pd.to_datetime(raw['Date_&_Time'], format='%d-%m-%Y %H:%M')
+    cut = pd.Timestamp('2025-08-20 13:00')
+    history, feed = raw[datetimes < cut], raw[datetimes >= cut]
+
+    resent = history[datetimes[history.index] >= cut - pd.Timedelta(hours=5)]
+    resent = resent.assign(**{'Hourly__Rainfall_(mm)': '3.25'})
+    rng = np.random.default_rng(0)
+    repeats = feed.iloc[rng.choice(len(feed), 10, replace=False)].assign(**{'Hourly__Rainfall_(mm)': '0.5'})
+    newcomer = feed.iloc[:3].assign(AWS_ID='99999', Latitude='17.5', Longitude='78.5',
+                                    **{'Hourly__Rainfall_(mm)': ['0', '1.5', '-']})
+    feed = pd.concat([resent, feed, repeats, newcomer]).reset_index(drop=True)
+
+    # Inputs are read in name order and the later file wins, as for dated feeds.
+    paths = {name: str(folder / f'{number}_{name}.csv') for number, name in enumerate(('history', 'feed'))}
+    history.to_csv(paths['history'], index=False)
+    feed.to_csv(paths['feed'], index=False)
+    return paths
+
+
+def read(root, name):
+    frame = store.read_table(root, name).drop(columns=['Year', 'Month'], errors='ignore')
+    frame['AWS_ID'] = frame['AWS_ID'].astype(np.int64)
+    return frame.sort_values(TABLES[name], kind='stable').reset_index(drop=True)
+
+
+def test_append_matches_full_run(feeds, tmp_path):
+    full, appended = str(tmp_path / 'full'), str(tmp_path / 'appended')
+    pipeline.run([feeds['history'], feeds['feed']], str(tmp_path / 'out_full'), workers=1, store_folder=full)
+    pipeline.run([feeds['history']], str(tmp_path / 'out_history'), workers=1, store_folder=appended)
+    incremental.main([appended, feeds['feed']])
+
+    for name in TABLES:
+        expected, actual = read(full, name), read(appended, name)
+        pd.testing.assert_frame_equal(actual[expected.columns], expected, check_exact=False)
+    assert 99999 in store.read_stations(appended).index.astype(np.int64)
+    assert store.manifest(appended)['period'] == store.manifest(full)['period']
+
+
+def test_second_append_of_the_same_feed_changes_nothing(feeds, tmp_path):
+    root = str(tmp_path / 'store')
+    pipeline.run([feeds['history']], str(tmp_path / 'out'), workers=1, store_folder=root)
+    incremental.main([root, feeds['feed']])
+    before = {name: read(root, name) for name in TABLES}
+    incremental.main([root, feeds['feed']])
+    for name in TABLES:
+        pd.testing.assert_frame_equal(read(root, name), before[name])
+
+
+def test_append_continues_an_event_longer_than_a_month(tmp_path):
+    # Station 5 rains every hour for 40 days up to the history's end; the feed's first hour is wet too.
+    hours = pd.date_range('2025-06-01', periods=40 * 24 + 2, freq='h')
+    rows = pd.DataFrame({'AWS_ID': 5, 'Date_&_Time': hours.strftime('%d-%m-%Y %H:%M'), 'Hourly  Rainfall (mm)': 0.5})
+    rows.iloc[-1, 2] = 0.0
+    history, feed = str(tmp_path / '0_history.csv'), str(tmp_path / '1_feed.csv')
+    rows.iloc[:-2].to_csv(history, index=False)
+    rows.iloc[-2:].to_csv(feed, index=False)
+
+    root = str(tmp_path / 'store')
+    pipeline.run([history], str(tmp_path / 'out'), workers=1, store_folder=root)
+    incremental.main([root, feed])
+
+    events = read(root, 'events')
+    assert events[['EventID', 'Start', 'End']].values.tolist() == [[1, hours[0], hours[-2]]]
+    assert events['Total_Rain'].tolist() == [0.5 * (40 * 24 + 1)]
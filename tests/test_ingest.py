@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from rainfall import ingest
+
+ONE_STATION = b"""AWS_ID,Date_&_Time,Hourly  Rainfall (mm)
+7,31-12-1998 23:00,0.5
+7,01-01-1999 00:00,1.5
+7,01-01-1999 01:00,0
+"""
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    ingest._cache.clear()
+    yield
+    ingest._cache.clear()
+
+
+def test_cache_builds_once_per_key_and_evicts_least_recent():
+    cache = ingest.PreprocessCache(max_entries=2)
+    built = []
+
+    def build(key):
+        return lambda: built.append(key) or key.upper()
+
+    assert cache.get('a', build('a')) == ('A', False)
+    assert cache.get('b', build('b')) == ('B', False)
+    assert cache.get('a', build('a')) == ('A', True)
+    # 'b' is now the least recently used entry and makes room for 'c'.
+    assert cache.get('c', build('c')) == ('C', False)
+    assert list(cache.entries) == ['a', 'c']
+    assert cache.get('b', build('b')) == ('B', False)
+    assert built == ['a', 'b', 'c', 'b']
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_load_reuses_the_parse_of_identical_bytes():
+    first, hit = ingest.load(ONE_STATION)
+    assert not hit
+    again, hit = ingest.load(bytes(ONE_STATION))
+    assert hit and again is first
+    _, hit = ingest.load(ONE_STATION.replace(b'1.5', b'2.5'))
+    assert not hit
+    assert ingest.cache_stats() == {'entries': 2, 'max_entries': ingest.CACHE_MAX_ENTRIES, 'hits': 1, 'misses': 2}
+
+
+def test_preprocess_one_station_before_2000():
+    data = ingest.preprocess(ONE_STATION)
+    assert data.key == ingest.file_key(ONE_STATION)
+    assert data.stations.index.tolist() == [7] and data.stations.columns.empty
+    assert data.daily[['Date', 'Daily_Rainfall', 'Hours_Recorded']].values.tolist() == [
+        [pd.Timestamp('1998-12-31'), 0.5, 1],
+        [pd.Timestamp('1999-01-01'), 1.5, 2],
+    ]
+    # The wet hours either side of midnight are one event.
+    assert data.events[['Start', 'End', 'Total_Rain']].values.tolist() == [
+        [pd.Timestamp('1998-12-31 23:00'), pd.Timestamp('1999-01-01 00:00'), 2.0]]
+
+
+def test_preprocess_header_only():
+    data = ingest.preprocess(b"AWS_ID,Date_&_Time,Hourly  Rainfall (mm)\n")
+    assert data.hourly.empty and data.daily.empty and data.events.empty and data.quality.empty
+    assert data.rejected_timestamps == 0
@@ -0,0 +1,81 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall import pipeline
+
+
+def station_rows(*lengths):
+    return pd.DataFrame({'AWS_ID': np.repeat(np.arange(1, len(lengths) + 1), lengths)})
+
+
+@pytest.mark.parametrize('lengths, n_shards, expected', [
+    # The last station holds most rows: split points past its first row fall back to it.
+    ((2, 10), 2, [[1], [2]]),
+    ((2, 10), 8, [[1], [2]]),
+    ((1, 1, 1, 50), 4, [[1, 2, 3], [4]]),
+    # The first station holds most rows.
+    ((50, 1, 1, 1), 4, [[1], [2, 3, 4]]),
+    ((3, 3, 3, 3), 2, [[1, 2], [3, 4]]),
+    ((7,), 4, [[1]]),
+])
+def test_shard_keeps_stations_whole(lengths, n_shards, expected):
+    hourly = station_rows(*lengths)
+    shards = pipeline.shard(hourly, n_shards)
+    assert [s['AWS_ID'].unique().tolist() for s in shards] == expected
+    pd.testing.assert_frame_equal(pd.concat(shards), hourly)
+
+
+def test_shard_of_nothing():
+    assert pipeline.shard(station_rows(), 4) == []
+
+
+def write_export(path, rows):
+    """An AWS export with only the columns the pipeline needs (no address or coordinates)."""
+    pd.DataFrame(rows, columns=['AWS_ID', 'Date_&_Time', 'Hourly  Rainfall (mm)']).to_csv(path, index=False)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_with_one_long_station(tmp_path, workers):
+    long_hours = pd.date_range('2024-12-31 22:00', periods=30 * 24, freq='h')
+    rows = [(501, '01-01-2025 00:00', 1.5), (501, '01-01-2025 01:00', 0.5)]
+    rows += [(502, t.strftime('%d-%m-%Y %H:%M'), 2.0 if t.hour == 6 else 0.0) for t in long_hours]
+    write_export(tmp_path / 'uneven.csv', rows)
+
+    stations, n_rows, tables, _ = pipeline.run([str(tmp_path / 'uneven.csv')], str(tmp_path / 'out'), workers=workers)
+    assert n_rows == 2 + len(long_hours)
+    assert list(stations.columns) == []
+    daily = tables['daily'].set_index(['AWS_ID', 'Date'])['Daily_Rainfall']
+    assert daily[(501, pd.Timestamp('2025-01-01'))] == 2.0
+    assert daily.loc[502].sum() == 2.0 * 30
+    assert tables['events'].groupby('AWS_ID').size().to_dict() == {501: 1, 502: 30}
+    assert (tmp_path / 'out' / pipeline.OUTPUT_FILES['daily']).exists()
+
+
+def test_run_on_an_export_with_no_rows(tmp_path):
+    write_export(tmp_path / 'empty.csv', [])
+    _, n_rows, tables, _ = pipeline.run([str(tmp_path / 'empty.csv')], str(tmp_path / 'out'), workers=2)
+    assert n_rows == 0
+    assert all(len(tables[name]) == 0 for name in pipeline.OUTPUT_FILES)
+    written = pd.read_csv(tmp_path / 'out' / pipeline.OUTPUT_FILES['daily'])
+    assert written.empty and 'Daily_Rainfall' in written.columns
+
+
+def test_notebook_screens_like_the_pipeline(tmp_path, monkeypatch):
+    notebook = json.loads((Path(__file__).parent.parent / 'Rainfall analysis.ipynb').read_text(encoding='utf-8'))
+    source = ''.join(notebook['cells'][0]['source'])
+    write_export(tmp_path / 'dirty.csv', [(7, '01-07-2025 00:00', 1.0), (7, '01-07-2025 01:00', '-'),
+                                         (7, '01-07-2025 02:00', 1.0), (7, '01-07-2025 02:00', 4.0)])
+    source = source.replace(source.split('input_file = ')[1].split('\n')[0], repr(str(tmp_path / 'dirty.csv')))
+    monkeypatch.chdir(tmp_path)
+    namespace = {}
+    exec(compile(source, 'Rainfall analysis.ipynb', 'exec'), namespace)
+
+    # The unreadable hour is missing, not a dry 0 mm hour, and the repeated hour keeps its first record.
+    daily = namespace['daily'].iloc[0]
+    assert daily[['Daily_Rainfall', 'Min_Hourly_Rain', 'Hours_Rained']].tolist() == [2.0, 1.0, 2]
+    assert namespace['quality'].loc[0, ['Invalid', 'Duplicates']].tolist() == [1, 1]
+    assert (tmp_path / 'GHMC_rainfall_store').is_dir()
@@ -0,0 +1,69 @@
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from rainfall.profiling import StageTimer
+
+
+@pytest.fixture
+def traced():
+    timer = StageTimer(trace_memory=True)
+    yield timer
+    tracemalloc.stop()
+
+
+def test_rows_and_time_add_up_per_stage():
+    timer = StageTimer()
+    for rows in (3, 4):
+        with timer.stage('parse', rows):
+            time.sleep(0.01)
+    with timer.stage('daily'):
+        pass
+    assert list(timer.stages) == ['parse', 'daily']
+    assert timer.stages['parse'] >= 0.02
+    assert timer.records()[0]['rows'] == 7
+    assert timer.records()[1] == {'stage': 'daily', 'seconds': timer.stages['daily'], 'rows': None, 'peak_mb': None}
+
+
+def test_failing_stage_is_still_recorded():
+    timer = StageTimer()
+    with pytest.raises(KeyError):
+        with timer.stage('read_csv', 10):
+            raise KeyError('AWS_ID')
+    assert timer.rows == {'read_csv': 10} and 'read_csv' in timer.stages
+
+
+def test_inner_peak_counts_towards_outer_stage(traced):
+    with traced.stage('tab'):
+        with traced.stage('chart'):
+            block = np.ones(2**20)  # 8 MB
+            del block
+        with traced.stage('table'):
+            pass
+    peaks = {r['stage']: r['peak_mb'] for r in traced.records()}
+    assert peaks['chart'] >= 8
+    assert peaks['tab'] >= peaks['chart']
+    assert peaks['table'] < 1
+
+
+def test_log_appends_one_line_per_rerun(tmp_path):
+    path = tmp_path / 'profile.jsonl'
+    timer = StageTimer()
+    with timer.stage('quality', 5):
+        pass
+    timer.log(str(path), source='upload', file='2025.csv')
+    timer.log(str(path), source='rerun')
+    first, second = [json.loads(line) for line in path.read_text().splitlines()]
+    assert first['source'] == 'upload' and first['file'] == '2025.csv'
+    assert second['source'] == 'rerun'
+    assert first['stages'][0]['stage'] == 'quality' and first['stages'][0]['rows'] == 5
+    assert first['elapsed_seconds'] <= second['elapsed_seconds']
+
+
+def test_report_lists_stages_and_total():
+    timer = StageTimer()
+    timer.stages = {'parse': 1.5, 'write csv': 0.25}
+    assert timer.report().splitlines() == ['  parse          1.50 s', '  write csv      0.25 s', '  total          1.75 s']
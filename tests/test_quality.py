@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+from rainfall import ingest, pipeline, quality, synthetic
+
+DIRTY_CSV = """AWS_ID,Date_&_Time,Latitude,Longitude,Hourly  Rainfall (mm)
+1,01-07-2025 00:00,17.4,78.4,0.5
+1,01-07-2025 01:00,17.4,78.4,abc
+1,01-07-2025 02:00,17.4,78.4,-1
+1,01-07-2025 02:00,17.4,78.4,0.25
+1,xx-07-2025 03:00,17.4,78.4,1
+1,01-07-2025 04:00,17.4,78.4,500
+1,01-07-2025 05:00,17.4,78.4,0
+1,01-07-1925 05:00,17.4,78.4,0
+2,01-07-2025 00:00,17.41,78.41,2
+"""
+
+
+def typed(station, times, rain):
+    return pd.DataFrame({'AWS_ID': station, 'DateTime': pd.to_datetime(times), 'Hourly_Rain': rain})
+
+
+def test_dirty_upload_flags():
+    data = ingest.preprocess(DIRTY_CSV.encode())
+    report = data.quality.set_index('AWS_ID')
+    # 'abc' is invalid, 'xx' a bad timestamp and the 1925 typo out of range; the duplicate keeps its first
+    # (negative) row.
+    columns = ['Invalid', 'Bad_Timestamps', 'Out_Of_Range', 'Duplicates', 'Negative', 'Spikes', 'Stuck']
+    assert report.loc[1, columns].tolist() == [1, 1, 1, 1, 1, 1, 0]
+    assert report.loc[1, 'Valid_Hours'] == 2
+    assert report.loc[1, 'Missing'] == 1
+    assert data.hourly['Hourly_Rain'].tolist() == [0.5, 0.0, 2.0]
+
+
+def test_pipeline_report_matches_dashboard(tmp_path):
+    path = tmp_path / 'dirty.csv'
+    path.write_text(DIRTY_CSV)
+    _, _, tables, _ = pipeline.run([str(path)], str(tmp_path / 'out'), workers=1)
+    written = pd.read_csv(tmp_path / 'out' / pipeline.QUALITY_FILE)
+    data = ingest.preprocess(DIRTY_CSV.encode())
+    expected = data.quality
+    # One row has the unreadable 'xx-07-2025 03:00'.
+    assert tables['rejected'] == data.rejected_timestamps == 1
+    for column in ['Valid_Hours', 'Missing', 'Invalid', 'Bad_Timestamps', 'Out_Of_Range', 'Duplicates', 'Negative',
+                   'Spikes', 'Stuck']:
+        assert written[column].tolist() == expected[column].tolist(), column
+
+
+def test_combine_keeps_later_file_for_repeated_hours():
+    first = typed([1], ['2025-07-01 00:00'], [1.0])
+    second = typed([1], ['2025-07-01 00:00'], [2.0])
+    stations = pd.DataFrame(index=pd.Index([1], name='AWS_ID'))
+    _, hourly, rejected = pipeline.combine([(stations, first, 0), (stations, second, 2)])
+    assert len(hourly) == 2
+    assert rejected == 2
+    cleaned, _, report = quality.assess(hourly)
+    assert cleaned['Hourly_Rain'].tolist() == [2.0]
+    assert report['Duplicates'].tolist() == [1]
+
+
+def test_drizzle_is_not_stuck():
+    times = pd.date_range('2025-07-01', periods=8, freq='h')
+    drizzle = typed([1] * 8, times, [0.25] * 8)
+    stuck = typed([2] * 8, times, [2.0] * 7 + [0.5])
+    hourly, grid, report = quality.assess(pd.concat([drizzle, stuck], ignore_index=True))
+    assert report.set_index('AWS_ID')['Stuck'].tolist() == [0, 7]
+    assert (hourly['AWS_ID'] == 1).sum() == 8
+
+
+def test_stuck_runs_matches_naive_scan():
+    rng = np.random.default_rng(1)
+    n_hours = 48
+    rain = rng.choice([0.0, 0.25, 1.0, 2.0, np.nan], size=3 * n_hours, p=[0.2, 0.2, 0.25, 0.3, 0.05])
+    flagged = quality.stuck_runs(rain, n_hours, stuck_hours=3, stuck_min_mm=1.0)
+
+    expected = np.zeros(len(rain), dtype=bool)
+    for row in range(3):
+        values = rain[row * n_hours:(row + 1) * n_hours]
+        start = 0
+        for i in range(1, n_hours + 1):
+            if i == n_hours or values[i] != values[start] or not values[start] >= 1.0:
+                if values[start] >= 1.0 and i - start >= 3:
+                    expected[row * n_hours + start:row * n_hours + i] = True
+                start = i
+    np.testing.assert_array_equal(flagged, expected)
+
+
+def test_far_off_timestamp_does_not_stretch_grid():
+    df = typed([1, 1, 1], ['2025-07-01 00:00', '2025-07-01 01:00', '2099-01-01 00:00'], [1.0, 0.0, 1.0])
+    grid, unplaced = quality.build_grid(df)
+    assert grid.rain.shape == (1, 24)
+    assert unplaced.loc[1].tolist() == [0, 1]
+
+
+def test_records_before_2000_are_kept():
+    df = typed([1] * 4, ['1996-03-01 00:00', '1996-03-01 01:00', '1999-12-31 23:00', '2000-01-01 00:00'],
+               [0.5, 1.0, 2.0, 0.0])
+    hourly, _, report = quality.assess(df)
+    assert len(hourly) == 4
+    assert report.loc[0, ['Out_Of_Range', 'First']].tolist() == [0, pd.Timestamp('1996-03-01')]
+
+
+def test_caller_bounds_the_period():
+    df = typed([1] * 4, ['1990-05-01 00:00', '2025-07-01 00:00', '2025-07-01 01:00', '2025-07-03 00:00'],
+               [1.0, 1.0, 1.0, 1.0])
+    # Without bounds nothing is judged by the clock; 2025-07-03 is within a year of the rest.
+    assert quality.assess(df)[2].loc[0, 'Out_Of_Range'] == 1
+    report = quality.assess(df, valid_from='2025-01-01', reference='2025-07-01 12:00')[2]
+    assert report.loc[0, ['Out_Of_Range', 'Valid_Hours']].tolist() == [2, 2]
+
+
+def test_station_with_only_bad_timestamps_is_reported():
+    df = pd.concat([typed([1], ['2025-07-01 00:00'], [1.0]),
+                    typed([2, 2], [None, None], [1.0, 2.0])], ignore_index=True)
+    report = quality.assess(df)[2].set_index('AWS_ID')
+    assert report.loc[2, ['Bad_Timestamps', 'Expected_Hours', 'Valid_Hours']].tolist() == [2, 0, 0]
+    assert pd.isna(report.loc[2, 'First'])
+
+
+def test_no_placeable_rows():
+    hourly, grid, report = quality.assess(typed([], [], []))
+    assert len(hourly) == len(report) == 0 and grid.rain.shape == (0, 0)
+    # Every row unreadable: the stations are still reported, with nothing expected.
+    report = quality.assess(typed([3, 4], [None, None], [1.0, 0.0]))[2]
+    assert report[['AWS_ID', 'Bad_Timestamps', 'Expected_Hours']].values.tolist() == [[3, 1, 0], [4, 1, 0]]
+
+
+def test_thirty_years_of_two_stations(tmp_path):
+    paths = synthetic.write_dataset(str(tmp_path / 'data'), years=30, n_stations=2)
+    _, n_rows, tables, _ = pipeline.run(paths, str(tmp_path / 'out'), workers=1)
+    report = tables['quality']
+    assert report['First'].min().year == synthetic.LAST_YEAR - 29
+    assert report[['Bad_Timestamps', 'Out_Of_Range']].sum().sum() == 0
+    assert n_rows == report['Valid_Hours'].sum()
+
+
+def test_cli_reports_unreadable_timestamps(tmp_path, capsys):
+    path = tmp_path / 'dirty.csv'
+    path.write_text(DIRTY_CSV)
+    pipeline.main([str(path), '-o', str(tmp_path / 'out'), '--workers', '1', '--chunksize', '3'])
+    assert "1 rows with an unreadable Date_&_Time were dropped." in capsys.readouterr().out
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from rainfall import ingest, pipeline
+from rainfall.query import Query
+
+# Two circles, one station without a circle; 1999 monsoon and winter hours.
+UPLOAD = """AWS_ID,Circle,Date_&_Time,Hourly  Rainfall (mm)
+11,Uppal,01-07-1999 05:00,12.0
+11,Uppal,01-07-1999 06:00,3.0
+11,Uppal,15-12-1999 05:00,1.0
+12,Uppal,01-07-1999 05:00,0.5
+13,Kapra,02-07-1999 18:00,40.0
+14,,02-07-1999 18:00,8.0
+"""
+
+
+@pytest.fixture(scope='module')
+def data():
+    return ingest.preprocess(UPLOAD.encode())
+
+
+def test_circle_and_station_select_the_union(data):
+    query = Query(circles=['Uppal'], stations=[14])
+    assert query.station_ids(data.stations).tolist() == [11, 12, 14]
+    assert Query().station_ids(data.stations) is None
+
+
+def test_hourly_predicates(data):
+    monsoon = Query(seasons=['Monsoon'], hours=[5, 6])
+    assert monsoon.run(data, 'hourly')['Hourly_Rain'].tolist() == [12.0, 3.0, 0.5]
+    heavy = monsoon.where(circles=('Uppal',), min_rain=1.0, max_rain=10.0)
+    assert heavy.run(data, 'hourly')[['AWS_ID', 'Hourly_Rain']].values.tolist() == [[11, 3.0]]
+    winter = Query(months=[12], start='1999-12-15', end='1999-12-15')
+    assert winter.run(data, 'hourly')['DateTime'].tolist() == [pd.Timestamp('1999-12-15 05:00')]
+    # Months and seasons intersect.
+    assert Query(months=[12], seasons=['Monsoon']).run(data, 'hourly').empty
+
+
+def test_daily_and_event_tables(data):
+    days = Query(stations=[11], min_intensity=5.0).run(data, 'daily')
+    assert days[['Date', 'Daily_Rainfall']].values.tolist() == [[pd.Timestamp('1999-07-01'), 15.0]]
+    events = Query(circles=['Kapra', 'Uppal'], min_duration=2).run(data, 'events')
+    assert events[['AWS_ID', 'Total_Rain']].values.tolist() == [[11, 15.0]]
+
+
+def test_criteria_that_do_not_apply(data):
+    with pytest.raises(ValueError, match='hour-of-day'):
+        Query(hours=[5]).run(data, 'daily')
+    with pytest.raises(ValueError, match='events table only'):
+        Query(min_duration=2).run(data, 'hourly')
+    with pytest.raises(ValueError, match='Unknown query table'):
+        Query().run(data, 'storms')
+
+
+def test_store_reads_match_memory(data, tmp_path):
+    path = tmp_path / 'upload.csv'
+    path.write_text(UPLOAD)
+    root = str(tmp_path / 'store')
+    pipeline.run([str(path)], str(tmp_path / 'out'), workers=1, store_folder=root)
+    query = Query(circles=['Uppal'], months=[7], min_rain=1.0)
+    for table in ('hourly', 'daily', 'events'):
+        expected = query.run(data, table).reset_index(drop=True)
+        # The stored hourly table has no Date or Hour column; compare what both carry.
+        read = query.read(root, table, columns=list(expected.columns))
+        pd.testing.assert_frame_equal(read, expected[read.columns], check_dtype=False, check_categorical=False)
+    assert query.read(root, 'hourly', columns=['Hourly_Rain'])['Hourly_Rain'].tolist() == [12.0, 3.0]
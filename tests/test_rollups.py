@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from rainfall.rollups import EVENT_ROLLUP_COLS, ROLLUP_COLS, event_rollup, membership, rollup
+
+STATIONS = pd.DataFrame({'Circle': ['Uppal ', 'Uppal', None], 'District': ['Medchal', 'Medchal', 'Hyderabad']},
+                        index=pd.Index([1, 2, 3], name='AWS_ID'))
+
+
+def test_membership_fills_missing_units():
+    members = membership(STATIONS, inside=[True, True, False])
+    assert members['Circle'].tolist() == ['Uppal', 'Uppal', 'Unassigned']
+    # The export has no Mandal column at all.
+    assert members['Mandal'].tolist() == ['Unassigned'] * 3
+    assert members['Inside_Boundary'].tolist() == [True, True, False]
+
+
+def test_daily_rollup_by_hand():
+    daily = pd.DataFrame({
+        'AWS_ID': [1, 2, 3, 1, 9],
+        'Date': pd.to_datetime(['1999-07-01', '1999-07-01', '1999-07-01', '1999-07-02', '1999-07-02']),
+        'Daily_Rainfall': [10.0, 0.0, 4.0, 2.5, 7.0],
+    })
+    result = rollup(daily, membership(STATIONS), 'Circle', 'Daily_Rainfall', 'Date', threshold=1.0)
+    assert list(result.columns) == ['Circle', 'Date'] + ROLLUP_COLS
+    assert result['Circle'].tolist() == ['Unassigned', 'Unassigned', 'Uppal', 'Uppal']
+    assert result['Date'].dt.day.tolist() == [1, 2, 1, 2]
+    # Station 9 is not in the dimension, so it reports under 'Unassigned' without counting as a member.
+    assert result['Stations'].tolist() == [1, 1, 2, 2]
+    assert result['Stations_Reporting'].tolist() == [1, 1, 2, 1]
+    assert result['Mean'].tolist() == [4.0, 7.0, 5.0, 2.5]
+    assert result['Max'].tolist() == [4.0, 7.0, 10.0, 2.5]
+    assert result['Stations_Over'].tolist() == [1, 1, 1, 1]
+    assert result['Coverage'].tolist() == [1.0, 1.0, 0.5, 1.0]
+
+
+def test_event_rollup_by_district():
+    events = pd.DataFrame({'AWS_ID': [1, 1, 2], 'EventID': [1, 2, 1], 'Total_Rain': [3.0, 9.0, 6.0],
+                           'Average_Intensity': [1.5, 3.0, 6.0], 'Duration_hrs': [2, 3, 1]})
+    result = event_rollup(events, membership(STATIONS), 'District')
+    assert list(result.columns) == ['District'] + EVENT_ROLLUP_COLS
+    # Hyderabad's only station had no events, so the district is absent.
+    assert result.values.tolist() == [['Medchal', 2, 2, 3, 6.0, 9.0, 3.5, 6.0, 2.0]]
+
+
+def test_empty_table():
+    empty = pd.DataFrame({'AWS_ID': [], 'DateTime': [], 'Hourly_Rain': np.array([], dtype=float)})
+    result = rollup(empty, membership(STATIONS), 'District', 'Hourly_Rain', 'DateTime')
+    assert result.empty and list(result.columns) == ['District', 'DateTime'] + ROLLUP_COLS
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+from rainfall.spatial import KM_PER_DEGREE, IDWGrid, inside_boundary, station_series
+
+BOUNDARY = shapely.Polygon([(78.30, 17.30), (78.50, 17.28), (78.55, 17.50), (78.35, 17.52)])
+
+
+def station_table(seed, n=12):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'Latitude': rng.uniform(17.25, 17.55, n), 'Longitude': rng.uniform(78.28, 78.57, n)},
+                        index=pd.Index(np.arange(101, 101 + n), name='AWS_ID'))
+
+
+def naive_weights(grid, stations, k, power):
+    """Dense cells x stations IDW weights from all-pairs distances."""
+    cell_lon, cell_lat = np.meshgrid(grid.lon, grid.lat)
+    km_lon = KM_PER_DEGREE * np.cos(np.radians(grid.lat0))
+    weights = np.zeros((grid.inside.sum(), len(stations)))
+    for row, (lon, lat) in enumerate(zip(cell_lon[grid.inside], cell_lat[grid.inside])):
+        distance = np.hypot((stations['Longitude'].to_numpy() - lon) * km_lon,
+                            (stations['Latitude'].to_numpy() - lat) * KM_PER_DEGREE)
+        nearest = np.argsort(distance)[:k]
+        if distance[nearest[0]] == 0:
+            weights[row, nearest[0]] = 1.0
+        else:
+            weights[row, nearest] = distance[nearest] ** -power
+    return weights
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+@pytest.mark.parametrize('k, power', [(8, 2.0), (3, 1.0), (50, 2.0)])
+def test_weights_match_all_pairs(seed, k, power):
+    stations = station_table(seed)
+    grid = IDWGrid(stations, BOUNDARY, cell_km=1.0, k=k, power=power)
+    np.testing.assert_allclose(grid.weights.toarray(), naive_weights(grid, stations, k, power), rtol=1e-9)
+
+
+def test_station_on_a_cell_takes_it_alone():
+    stations = station_table(2)
+    probe = IDWGrid(stations, BOUNDARY, cell_km=1.0)
+    row, column = np.argwhere(probe.inside)[len(np.argwhere(probe.inside)) // 2]
+    stations.loc[200] = [probe.lat[row], probe.lon[column]]
+    grid = IDWGrid(stations, BOUNDARY, cell_km=1.0)
+    values = pd.Series(np.arange(len(stations), dtype=float), index=stations.index)
+    assert grid.surface(values)[row, column] == pytest.approx(values[200])
+
+
+def test_interpolate_skips_missing_stations():
+    stations = station_table(3)
+    # A station without coordinates is left out of the grid.
+    stations.loc[300] = [np.nan, np.nan]
+    grid = IDWGrid(stations, BOUNDARY, cell_km=1.0, k=4)
+    assert 300 not in grid.station_ids
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame(rng.uniform(0, 10, (3, len(grid.station_ids))), columns=grid.station_ids)
+    frame.iloc[1, :5] = np.nan
+    frame.iloc[2] = np.nan
+    cells = grid.interpolate(frame)
+
+    weights = naive_weights(grid, stations.dropna(), 4, 2.0)
+    for step in range(3):
+        value = frame.iloc[step].to_numpy()
+        present = np.isfinite(value)
+        norm = weights[:, present].sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            expected = np.where(norm > 0, weights[:, present] @ value[present] / norm, np.nan)
+        np.testing.assert_allclose(cells[step], expected)
+    assert np.isnan(cells[2]).all()
+
+
+def test_single_station_fills_the_grid():
+    stations = station_table(4, n=1)
+    grid = IDWGrid(stations, BOUNDARY, cell_km=1.0)
+    surface = grid.surface(pd.Series([2.5], index=stations.index))
+    np.testing.assert_allclose(surface[grid.inside], 2.5)
+    assert np.isnan(surface[~grid.inside]).all()
+
+
+def test_no_coordinates():
+    with pytest.raises(ValueError):
+        IDWGrid(pd.DataFrame({'Latitude': [np.nan], 'Longitude': [np.nan]}), BOUNDARY)
+
+
+def test_inside_boundary_and_station_series():
+    stations = pd.DataFrame({'Latitude': [17.40, 17.00, np.nan], 'Longitude': [78.42, 78.42, 78.42]},
+                            index=pd.Index([1, 2, 3], name='AWS_ID'))
+    assert inside_boundary(stations, BOUNDARY).tolist() == [True, False, False]
+
+    times = pd.to_datetime(['2025-07-01 00:00', '2025-07-01 00:00', '2025-07-01 01:00', '2025-07-01 02:00'])
+    frame = pd.DataFrame({'AWS_ID': [1, 1, 2, 1], 'DateTime': times, 'Rain': [1.0, 2.0, 4.0, 8.0]})
+    assert station_series(frame, 'Rain').to_dict() == {1: pytest.approx(11 / 3), 2: 4.0}
+    steps = station_series(frame, 'Rain', 'DateTime', end=times[2])
+    assert steps.shape == (2, 2) and steps.loc[times[0], 1] == 3.0 and np.isnan(steps.loc[times[0], 2])
@@ -0,0 +1,62 @@
+import pandas as pd
+
+from rainfall.spells import SPELL_COLS, SPELL_SUMMARY_COLS, build_spells, spell_distribution, spell_summary
+
+
+def daily(rows):
+    return pd.DataFrame(rows, columns=['AWS_ID', 'Date', 'Daily_Rainfall']).astype({'Date': 'datetime64[ns]'})
+
+
+# Station 4: wet, wet, dry, (2 Jan missing), wet, dry, dry.  Station 1 has a single wet day.
+DAYS = daily([
+    (4, '1996-12-29', 3.0),
+    (4, '1996-12-30', 1.0),
+    (4, '1996-12-31', 0.0),
+    (4, '1997-01-01', 2.0),
+    # 1997-01-02 is missing.
+    (4, '1997-01-03', 0.0),
+    (4, '1997-01-04', 0.0),
+    (1, '1996-12-30', 0.5),
+])
+
+
+def test_runs_break_on_station_change_and_missing_days():
+    spells = build_spells(DAYS)
+    assert list(spells.columns) == SPELL_COLS
+    assert spells[['AWS_ID', 'Wet', 'Length_days', 'Total_Rain']].values.tolist() == [
+        [1, True, 1, 0.5],
+        [4, True, 2, 4.0],
+        [4, False, 1, 0.0],
+        [4, True, 1, 2.0],
+        # The gap ends the wet day; the dry run after it starts afresh.
+        [4, False, 2, 0.0],
+    ]
+    assert spells['Start'].dt.strftime('%m-%d').tolist() == ['12-30', '12-29', '12-31', '01-01', '01-03']
+    assert spells['End'].dt.strftime('%m-%d').tolist() == ['12-30', '12-30', '12-31', '01-01', '01-04']
+
+
+def test_threshold_turns_light_days_dry():
+    spells = build_spells(DAYS[DAYS['AWS_ID'] == 4], threshold=1.0)
+    assert spells[['Wet', 'Length_days']].values.tolist() == [[True, 1], [False, 2], [True, 1], [False, 2]]
+
+
+def test_summary_and_distribution():
+    summary = spell_summary(build_spells(DAYS)).set_index('AWS_ID')
+    assert list(summary.reset_index().columns) == SPELL_SUMMARY_COLS
+    assert summary.loc[4, ['Wet_Spells', 'Longest_Wet_Spell_days', 'Dry_Spells', 'Longest_Dry_Spell_days']].tolist() \
+        == [2, 2, 2, 2]
+    assert summary.loc[4, 'Mean_Wet_Spell_days'] == 1.5
+    assert summary.loc[4, 'Longest_Dry_Spell_Start'] == pd.Timestamp('1997-01-03')
+    # Never dry: no dry spells and no dates.
+    assert summary.loc[1, ['Dry_Spells', 'Longest_Dry_Spell_days']].tolist() == [0, 0]
+    assert pd.isna(summary.loc[1, 'Longest_Dry_Spell_Start'])
+
+    distribution = spell_distribution(build_spells(DAYS))
+    assert distribution.values.tolist() == [[1, True, 1, 1], [4, False, 1, 1], [4, False, 2, 1],
+                                            [4, True, 1, 1], [4, True, 2, 1]]
+
+
+def test_no_days():
+    spells = build_spells(daily([]))
+    assert list(spells.columns) == SPELL_COLS and spells.empty
+    assert spell_summary(spells).empty
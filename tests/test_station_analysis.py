@@ -0,0 +1,113 @@
+import pandas as pd
+import pytest
+
+from rainfall import ingest
+from rainfall.events import build_events, build_gap_events
+from rainfall.station_analysis import (GAP_HOURS, StationIndex, daily_tables, gap_summary, same_day_gaps, season,
+                                       station_maxima)
+
+# Station 20 has three days (two of them wet), station 31 a single hour.
+UPLOAD = b"""AWS_ID,Date_&_Time,Hourly  Rainfall (mm)
+20,30-06-1999 22:00,1.0
+20,30-06-1999 23:00,2.0
+20,01-07-1999 00:00,0
+20,01-07-1999 01:00,0
+20,02-07-1999 05:00,4.0
+31,15-12-1999 12:00,0.5
+"""
+
+
+def test_index_slices_contiguous_blocks():
+    frame = pd.DataFrame({'AWS_ID': [5, 5, 5, 2, 9, 9], 'v': range(6)})
+    index = StationIndex(frame)
+    assert index.bounds == {5: (0, 3), 2: (3, 4), 9: (4, 6)}
+    assert index[9]['v'].tolist() == [4, 5]
+    assert 2 in index and 7 not in index
+    # An unknown station is an empty slice, not an error.
+    assert index[7].empty and list(index[7].columns) == ['AWS_ID', 'v']
+
+
+def test_index_of_nothing():
+    assert StationIndex(pd.DataFrame({'AWS_ID': []})).bounds == {}
+
+
+def test_index_rejects_interleaved_stations():
+    with pytest.raises(ValueError, match='not grouped by AWS_ID'):
+        StationIndex(pd.DataFrame({'AWS_ID': [1, 2, 1]}))
+
+
+def test_seasons():
+    assert season([1, 4, 7, 10, 12]).tolist() == ['Winter', 'Pre-Monsoon', 'Monsoon', 'Post-Monsoon', 'Post-Monsoon']
+
+
+def test_daily_tables_of_one_station():
+    daily = ingest.preprocess(UPLOAD).daily
+    tables = daily_tables(daily[daily['AWS_ID'] == 20])
+    assert tables['rainy_hours']['Hours_Rained'].tolist() == [2, 0, 1]
+    assert tables['monthly_rainy_days'].values.tolist() == [[6, 1], [7, 1]]
+    assert tables['seasonal_rainy_days'].values.tolist() == [['Monsoon', 2]]
+    assert tables['spells'][['Wet', 'Length_days']].values.tolist() == [[True, 1], [False, 1], [True, 1]]
+
+
+def test_station_tables_are_memoized():
+    data = ingest.preprocess(UPLOAD)
+    first = data.station(31)
+    assert first['hourly']['Hourly_Rain'].tolist() == [0.5]
+    assert first['events']['Total_Rain'].tolist() == [0.5]
+    again = data.station(31)
+    assert all(again[name] is first[name] for name in first)
+    # Another event definition reuses the station's hourly and daily tables.
+    wider = data.station(31, min_gap_hours=3)
+    assert wider['daily'] is first['daily'] and wider['events'] is not first['events']
+    assert data.station(20)['daily']['Date'].dt.day.tolist() == [30, 1, 2]
+
+
+def hours(station, start, rain):
+    times = pd.date_range(start, periods=len(rain), freq='h')
+    return pd.DataFrame({'AWS_ID': station, 'DateTime': times, 'Hourly_Rain': rain})
+
+
+# Station 3: wet 00-01, dry 02-03, wet 04, dry 05-07, wet 08 on one day, then wet at 23:00 and 00:00.
+SHOWERS = pd.concat([
+    hours(3, '1998-08-10 00:00', [1.0, 2.0, 0, 0, 0.5, 0, 0, 0, 6.0]),
+    hours(3, '1998-08-10 23:00', [1.0, 1.0]),
+], ignore_index=True)
+
+
+def test_same_day_gaps():
+    gaps = same_day_gaps(build_events(SHOWERS))
+    assert gaps[['Previous_EventID', 'EventID', 'Gap_hrs']].values.tolist() == [[1, 2, 2], [2, 3, 3], [3, 4, 14]]
+    assert gaps['Date'].tolist() == [pd.Timestamp('1998-08-10')] * 3
+    # Events either side of midnight are on different days.
+    across = pd.concat([hours(3, '1998-08-10 22:00', [1.0]), hours(3, '1998-08-11 01:00', [1.0])])
+    assert len(same_day_gaps(build_events(across))) == 0
+
+
+def test_events_for_each_gap():
+    stacked = build_gap_events(SHOWERS, gaps=[1, 3, 4])
+    per_gap = stacked.groupby('Min_Gap_hrs')['Total_Rain'].apply(list).to_dict()
+    assert per_gap == {1: [3.0, 0.5, 6.0, 2.0], 3: [3.5, 6.0, 2.0], 4: [9.5, 2.0]}
+
+    summary = gap_summary(stacked).set_index('Min_Gap_hrs')
+    assert summary.index.tolist() == list(GAP_HOURS)
+    assert summary['Events'].tolist() == [4, 0, 3, 2, 0, 0]
+    assert summary.loc[4, 'Max_Total_Rain'] == 9.5
+
+
+def test_maxima_per_station():
+    hourly = pd.concat([SHOWERS, hours(8, '1998-08-10 00:00', [6.0, 0, 6.0])], ignore_index=True)
+    daily = pd.DataFrame({'AWS_ID': [3, 3, 8], 'Date': pd.to_datetime(['1998-08-10', '1998-08-11', '1998-08-10']),
+                          'Daily_Rainfall': [10.5, 1.0, 12.0]})
+    maxima = station_maxima(hourly, daily, build_events(hourly))
+    assert maxima['Max_Hourly'].tolist() == [6.0, 6.0]
+    # Ties go to the earliest hour.
+    assert maxima.loc[8, 'Max_Hourly_Time'] == pd.Timestamp('1998-08-10 00:00')
+    assert maxima['Max_Event'].tolist() == [6.0, 6.0]
+    assert maxima['Max_Daily'].tolist() == [10.5, 12.0]
+
+
+def test_maxima_of_a_station_without_events():
+    hourly = hours(4, '1998-01-01', [0.0, 0.0])
+    daily = pd.DataFrame({'AWS_ID': [4], 'Date': [pd.Timestamp('1998-01-01')], 'Daily_Rainfall': [0.0]})
+    maxima = station_maxima(hourly, daily, build_events(hourly))
+    assert maxima.loc[4, 'Max_Event'] == 0.0 and pd.isna(maxima.loc[4, 'Max_Event_Time'])
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from rainfall.stations import attach, build_stations, station_key
+
+
+def test_numeric_ids_become_int32():
+    assert station_key(pd.Series(['0012', '7', '7'])).tolist() == [12, 7, 7]
+    assert station_key(pd.Series(['0012', '7'])).dtype == np.int32
+
+
+def test_other_ids_stay_text():
+    key = station_key(pd.Series(['A-1', '7', '7.5']))
+    assert isinstance(key.dtype, pd.CategoricalDtype)
+    assert key.tolist() == ['A-1', '7', '7.5']
+
+
+def test_first_row_of_each_station_wins():
+    raw = pd.DataFrame({
+        'AWS_ID': ['9', '2', '9'],
+        'District': ['Hyderabad', 'Medchal', 'Renamed'],
+        'Mandal': ['Amberpet', 'Alwal', 'Amberpet'],
+        'Location': ['Golnaka', 'Bolarum', 'Golnaka'],
+        'Circle': ['Amberpet', 'Alwal', 'Amberpet'],
+        'Latitude': ['17.39', 'n/a', '17.40'],
+        'Longitude': ['78.51', '78.50', '78.52'],
+        'Hourly_Rain': [1.0, 0.0, 2.0],
+    })
+    stations = build_stations(raw)
+    assert stations.index.tolist() == [2, 9]
+    assert list(stations.columns) == ['District', 'Mandal', 'Location', 'Circle', 'Latitude', 'Longitude']
+    assert stations.loc[9, 'District'] == 'Hyderabad'
+    assert stations['District'].dtype == 'category'
+    # An unreadable coordinate is missing rather than an error.
+    assert np.isnan(stations.loc[2, 'Latitude']) and stations.loc[9, 'Longitude'] == 78.51
+
+
+def test_export_without_optional_metadata():
+    # Only the id column: no address or coordinates in the export.
+    stations = build_stations(pd.DataFrame({'AWS_ID': ['5', '5', '6'], 'Hourly_Rain': [0.0, 1.0, 2.0]}))
+    assert stations.index.tolist() == [5, 6] and stations.columns.empty
+    facts = pd.DataFrame({'AWS_ID': [6, 5], 'Total_Rain': [2.0, 1.0]})
+    pd.testing.assert_frame_equal(attach(facts, stations, front=True), facts)
+
+
+def test_attach_places_metadata():
+    stations = build_stations(pd.DataFrame({'AWS_ID': ['5', '6'], 'Circle': ['Uppal', 'Malkajgiri']}))
+    facts = pd.DataFrame({'AWS_ID': [6, 5, 7], 'Total_Rain': [2.0, 1.0, 3.0]})
+    assert list(attach(facts, stations).columns) == ['AWS_ID', 'Total_Rain', 'Circle']
+    front = attach(facts, stations, front=True)
+    assert list(front.columns) == ['AWS_ID', 'Circle', 'Total_Rain']
+    # A station missing from the dimension keeps its facts, with no metadata.
+    assert front['Circle'].tolist()[:2] == ['Malkajgiri', 'Uppal'] and pd.isna(front['Circle'].iloc[2])
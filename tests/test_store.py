@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+import pytest
+
+from rainfall import ingest, store
+from rainfall.daily import build_daily
+from rainfall.events import build_events
+
+
+def stations(*ids):
+    # No address or coordinate columns, as in a bare export.
+    return pd.DataFrame(index=pd.Index(ids, name='AWS_ID', dtype='int32'))
+
+
+def hours(aws_id, start, n, rain=1.0):
+    times = pd.date_range(start, periods=n, freq='h')
+    return pd.DataFrame({'AWS_ID': pd.Series(aws_id, index=range(n), dtype='int32'), 'DateTime': times,
+                         'Hourly_Rain': rain})
+
+
+@pytest.fixture
+def root(tmp_path):
+    # Station 1 crosses a year-end before 2000; station 2 has one hour in 2024.
+    hourly = pd.concat([hours(1, '1999-12-31 22:00', 4), hours(2, '2024-06-15 12:00', 1, 5.0)], ignore_index=True)
+    path = str(tmp_path / 'store')
+    store.write_store(path, stations(1, 2), hourly=hourly, daily=build_daily(hourly), events=build_events(hourly),
+                      event_params=(0.0, 1, 0))
+    return path
+
+
+def test_partition_layout(root):
+    leaves = sorted(os.path.relpath(folder, root) for folder, _, files in os.walk(os.path.join(root, 'hourly'))
+                    if files)
+    assert leaves == [os.path.join('hourly', *parts) for parts in (
+        ('Year=1999', 'Month=12', 'AWS_ID=1'), ('Year=2000', 'Month=1', 'AWS_ID=1'),
+        ('Year=2024', 'Month=6', 'AWS_ID=2'))]
+    info = store.manifest(root)
+    assert info['rows'] == {'stations': 2, 'hourly': 5, 'daily': 3, 'events': 2}
+    assert info['period'] == ['1999-12-31 22:00:00', '2024-06-15 12:00:00']
+    assert info['event_params'] == [0.0, 1, 0]
+
+
+def test_station_and_inclusive_date_filters(root):
+    read = store.read_table(root, 'hourly', ['AWS_ID', 'DateTime'], stations=[1], start='2000-01-01',
+                            end='2000-01-01')
+    assert read['DateTime'].tolist() == [pd.Timestamp('2000-01-01 00:00'), pd.Timestamp('2000-01-01 01:00')]
+    assert list(read.columns) == ['AWS_ID', 'DateTime']
+    assert store.read_table(root, 'hourly', stations=[2], end='2024-06-14').empty
+
+
+def test_filter_prunes_partitions(root):
+    dataset = store.open_table(root, 'hourly')
+    expr = store.table_filter('hourly', stations=[1], start='2000-01-01')
+    files = [os.path.relpath(f.path, root) for f in dataset.get_fragments(filter=expr)]
+    assert files == [os.path.join('hourly', 'Year=2000', 'Month=1', 'AWS_ID=1', 'part-0.parquet')]
+
+
+def test_replace_partitions_clears_emptied_ones(root):
+    drop = pd.DataFrame({'Year': [2024], 'Month': [6], 'AWS_ID': [2]})
+    assert store.replace_partitions(root, 'hourly', hours(2, '2024-06-15', 0), drop) == 0
+    assert store.read_table(root, 'hourly')['AWS_ID'].unique().tolist() == [1]
+
+
+def test_unknown_table(tmp_path):
+    with pytest.raises(ValueError, match='Unknown store table'):
+        store.write_store(str(tmp_path), stations(1), hourly_sums=pd.DataFrame())
+
+
+def test_dashboard_reads_the_store(root):
+    data, hit = ingest.load_store(root, stations=[1], start='1999-12-31', end='1999-12-31')
+    assert not hit
+    assert data.hourly['DateTime'].tolist() == [pd.Timestamp('1999-12-31 22:00'), pd.Timestamp('1999-12-31 23:00')]
+    assert data.stations.index.tolist() == [1]
+    assert data.daily[['Date', 'Daily_Rainfall']].values.tolist() == [[pd.Timestamp('1999-12-31'), 2.0]]
+    # The event runs into 2000 and is read whole, by its start.
+    assert data.events[['Start', 'Total_Rain']].values.tolist() == [[pd.Timestamp('1999-12-31 22:00'), 4.0]]
+    assert ingest.load_store(root, stations=[1], start='1999-12-31', end='1999-12-31')[1]
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall.events import build_events
+from rainfall.storms import KM_PER_DEGREE, NeighbourIndex, build_storms, link_events
+
+
+def naive_storms(events, stations, radius_km, max_gap_hours):
+    """All-pairs reference of the storm linking: sets of (AWS_ID, EventID) per storm."""
+    lat0 = stations['Latitude'].dropna().mean()
+    parent = list(range(len(events)))
+
+    def root(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    rows = list(events.itertuples(index=False))
+    for i, a in enumerate(rows):
+        for j, b in enumerate(rows[:i]):
+            if a.AWS_ID == b.AWS_ID:
+                continue
+            (lat_a, lon_a), (lat_b, lon_b) = stations.loc[a.AWS_ID], stations.loc[b.AWS_ID]
+            if np.isnan([lat_a, lon_a, lat_b, lon_b]).any():
+                continue
+            dx = (lon_a - lon_b) * KM_PER_DEGREE * np.cos(np.radians(lat0))
+            dy = (lat_a - lat_b) * KM_PER_DEGREE
+            gap = pd.Timedelta(hours=max_gap_hours)
+            if np.hypot(dx, dy) <= radius_km and a.Start <= b.End + gap and b.Start <= a.End + gap:
+                parent[root(i)] = root(j)
+    groups = {}
+    for i, event in enumerate(rows):
+        groups.setdefault(root(i), set()).add((event.AWS_ID, event.EventID))
+    return sorted(map(frozenset, groups.values()), key=sorted)
+
+
+def storm_fixture(seed):
+    """Six stations (one without coordinates) in two clusters, with randomly timed showers."""
+    rng = np.random.default_rng(seed)
+    stations = pd.DataFrame({'Latitude': [17.40, 17.42, 17.43, 17.60, 17.61, np.nan],
+                             'Longitude': [78.40, 78.41, 78.43, 78.60, 78.62, 78.50]},
+                            index=pd.Index([1, 2, 3, 4, 5, 6], name='AWS_ID'))
+    hours = pd.date_range('2025-07-01', periods=120, freq='h')
+    rain = rng.choice([0.0, 0.5, 2.0], size=(len(stations), len(hours)), p=[0.8, 0.15, 0.05])
+    df = pd.DataFrame({'AWS_ID': np.repeat(stations.index, len(hours)), 'DateTime': np.tile(hours, len(stations)),
+                       'Hourly_Rain': rain.ravel()})
+    return build_events(df), stations
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('radius_km, max_gap_hours', [(5.0, 0), (5.0, 2), (40.0, 1)])
+def test_storms_match_all_pairs_linking(seed, radius_km, max_gap_hours):
+    events, stations = storm_fixture(seed)
+    storms, members = build_storms(events, stations, radius_km, max_gap_hours)
+    linked = members.groupby('Storm_ID').apply(lambda g: frozenset(zip(g['AWS_ID'], g['EventID'])))
+    assert sorted(linked, key=sorted) == naive_storms(events, stations, radius_km, max_gap_hours)
+
+    grouped = members.groupby('Storm_ID')
+    assert storms['Storm_ID'].tolist() == list(range(1, len(storms) + 1))
+    assert storms['Start'].is_monotonic_increasing
+    np.testing.assert_array_equal(storms['Start'], grouped['Start'].min())
+    np.testing.assert_array_equal(storms['End'], grouped['End'].max())
+    np.testing.assert_array_equal(storms['Events'], grouped.size())
+    np.testing.assert_array_equal(storms['Stations'], grouped['AWS_ID'].nunique())
+    np.testing.assert_allclose(storms['Total_Rain'], grouped['Total_Rain'].sum())
+
+
+def test_link_batches_do_not_change_labels():
+    events, stations = storm_fixture(0)
+    index = NeighbourIndex(stations, 40.0)
+    whole = link_events(events, index, 1)
+    batched = link_events(events, index, 1, chunk=3)
+    # Same partition, whatever the component numbering.
+    assert len(set(zip(whole, batched))) == len(set(whole)) == len(set(batched))
+
+
+def test_stations_without_coordinates_stand_alone():
+    events, stations = storm_fixture(1)
+    storms, members = build_storms(events, stations.drop(columns=['Latitude', 'Longitude']))
+    assert len(storms) == len(events)
+    assert (storms['Stations'] == 1).all()
+    assert storms['Extent_km'].isna().all()
+
+
+def test_no_events():
+    events, stations = storm_fixture(0)
+    storms, members = build_storms(events.iloc[:0], stations)
+    assert storms.empty and members.empty
+
+
+def test_storm_moving_east():
+    # Three stations 3 km apart along a parallel, each raining from one hour after its western neighbour.
+    lat = 17.4
+    step = 3.0 / (KM_PER_DEGREE * np.cos(np.radians(lat)))
+    stations = pd.DataFrame({'Latitude': lat, 'Longitude': 78.4 + step * np.arange(3)},
+                            index=pd.Index([1, 2, 3], name='AWS_ID'))
+    hours = pd.date_range('2025-07-01', periods=6, freq='h')
+    rain = np.array([[1, 1, 0, 0, 0, 0], [0, 1, 1, 0, 0, 0], [0, 0, 1, 1, 0, 0]], dtype=float)
+    df = pd.DataFrame({'AWS_ID': np.repeat(stations.index, 6), 'DateTime': np.tile(hours, 3),
+                       'Hourly_Rain': rain.ravel()})
+    storms, _ = build_storms(build_events(df), stations)
+    assert len(storms) == 1
+    storm = storms.iloc[0]
+    assert storm['Start'] == hours[0] and storm['End'] == hours[3]
+    assert storm['Speed_kmh'] == pytest.approx(3.0)
+    assert storm['Heading_deg'] == pytest.approx(90.0)
+    assert storm['Extent_km'] == pytest.approx(3.0)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall import pipeline, synthetic
+
+
+@pytest.fixture(scope='module')
+def dirty_csv(tmp_path_factory):
+    folder = tmp_path_factory.mktemp('streaming')
+    raw = pd.read_csv(synthetic.write_dataset(str(folder / 'clean'), years=1, n_stations=6)[0], dtype=str)
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(raw), 40, replace=False)
+    raw.loc[rows[:10], 'Hourly__Rainfall_(mm)'] = '-'
+    raw.loc[rows[10:20], 'Hourly__Rainfall_(mm)'] = '-3'
+    raw.loc[rows[20:30], 'Hourly__Rainfall_(mm)'] = '400'
+    raw.loc[rows[30:], 'Date_&_Time'] = 'garbage'
+    # A stuck run and repeated hours, which the chunk boundaries below cut through.
+    raw.loc[raw.index[1000:1012], 'Hourly__Rainfall_(mm)'] = '2.5'
+    repeats = raw.iloc[rng.choice(len(raw), 30, replace=False)].assign(**{'Hourly__Rainfall_(mm)': '9.75'})
+    path = folder / 'dirty.csv'
+    pd.concat([raw, repeats]).sort_index(kind='stable').to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize('chunksize', [997, 4000])
+def test_streaming_matches_in_memory(dirty_csv, tmp_path, chunksize):
+    pipeline.run([dirty_csv], str(tmp_path / 'memory'), workers=1)
+    pipeline.run([dirty_csv], str(tmp_path / 'stream'), chunksize=chunksize)
+    for filename in list(pipeline.OUTPUT_FILES.values()) + [pipeline.QUALITY_FILE]:
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'memory' / filename),
+                                      pd.read_csv(tmp_path / 'stream' / filename), check_dtype=False)
+    report = pd.read_csv(tmp_path / 'stream' / pipeline.QUALITY_FILE)
+    columns = ['Invalid', 'Bad_Timestamps', 'Out_Of_Range', 'Duplicates', 'Negative', 'Spikes', 'Stuck']
+    assert report[columns].sum().tolist() == [10, 10, 0, 30, 10, 10, 12]
+
+
+@pytest.mark.parametrize('rows', [
+    [],
+    [('7', 'garbage', '1.0'), ('8', 'garbage', '-')],
+    # Valid but dry hours: daily rows, no events.
+    [('7', '01-07-2025 00:00', '0'), ('7', '01-07-2025 01:00', '0')],
+], ids=['header only', 'no readable timestamp', 'dry'])
+def test_streaming_without_events(tmp_path, rows):
+    path = tmp_path / 'sparse.csv'
+    pd.DataFrame(rows, columns=['AWS_ID', 'Date_&_Time', 'Hourly  Rainfall (mm)']).to_csv(path, index=False)
+    pipeline.run([str(path)], str(tmp_path / 'memory'), workers=1)
+    _, _, tables, _ = pipeline.run([str(path)], str(tmp_path / 'stream'), chunksize=1)
+    assert tables['events'].empty
+    for filename in list(pipeline.OUTPUT_FILES.values()) + [pipeline.QUALITY_FILE, pipeline.STORMS_FILE]:
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'memory' / filename),
+                                      pd.read_csv(tmp_path / 'stream' / filename), check_dtype=False)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from rainfall import ingest
+from rainfall.thresholds import ThresholdIndex
+
+HOURS = pd.DataFrame({'AWS_ID': [4, 4, 4, 8, 8, 8], 'Hourly_Rain': [2.5, np.nan, 0.0, 7.0, 2.5, 1.0]},
+                     index=[10, 11, 12, 13, 14, 15])
+
+
+def test_counts_at_and_above_threshold():
+    index = ThresholdIndex(HOURS, 'Hourly_Rain')
+    # The missing reading never meets a threshold.
+    assert len(index) == 5
+    assert [index.count(t) for t in (-1.0, 0.0, 1.0, 2.5, 2.6, 7.0, 8.0)] == [5, 5, 4, 3, 1, 1, 0]
+
+
+def test_selection_matches_a_mask_in_table_order():
+    index = ThresholdIndex(HOURS, 'Hourly_Rain')
+    assert index.positions(2.5).tolist() == [0, 3, 4]
+    pd.testing.assert_frame_equal(index.select(1.0), HOURS[HOURS['Hourly_Rain'] >= 1.0])
+
+
+def test_exceedance_curve():
+    curve = ThresholdIndex(HOURS, 'Hourly_Rain').exceedance()
+    assert curve.values.tolist() == [[0.0, 5], [1.0, 4], [2.5, 3], [7.0, 1]]
+
+
+def test_empty_column():
+    index = ThresholdIndex(HOURS.iloc[:0], 'Hourly_Rain')
+    assert index.count(0.0) == 0 and index.select(0.0).empty and index.exceedance().empty
+
+
+def test_dashboard_indexes_event_definitions_on_first_use():
+    data = ingest.preprocess(b"""AWS_ID,Date_&_Time,Hourly  Rainfall (mm)
+3,01-08-1999 00:00,1.0
+3,01-08-1999 01:00,0
+3,01-08-1999 02:00,2.0
+""")
+    assert data.threshold_index('events', 'Total_Rain').count(1.5) == 1
+    merged = data.threshold_index('events', 'Total_Rain', (0.0, 2, 0))
+    assert merged.count(1.5) == 1 and merged.select(0.0)['Total_Rain'].tolist() == [3.0]
+    assert data.threshold_index('events', 'Total_Rain', (0.0, 2, 0)) is merged
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rainfall.timestamps import AWS_FORMAT, LAYOUTS, NAT, decode_fixed, parse_aws, parse_date_hour
+
+AWS_STRINGS = [
+    '01-07-2025 03:00', '01-07-2025 03:00', '31-12-1999 23:59', '29-02-2024 12:00', '01-01-1969 00:00',
+    # Unpadded fields take the pandas fallback.
+    '1-7-2025 3:00', '01-7-2025 03:00',
+    # Impossible dates and times, stray text, seconds and missing values are NaT.
+    '29-02-2025 12:00', '31-04-2025 00:00', '01-13-2025 00:00', '01-07-2025 24:00', '01-07-2025 03:60',
+    '01/07/2025 03:00', 'O1-07-2025 03:00', '01-07-2025 03:00:00', '', ' 01-07-2025 03:00', None, np.nan,
+]
+
+
+def test_parse_aws_matches_pandas():
+    values = pd.Series(AWS_STRINGS, dtype=object)
+    datetimes, rejected = parse_aws(values)
+    expected = pd.to_datetime(values, format=AWS_FORMAT, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    np.testing.assert_array_equal(datetimes, expected)
+    assert rejected == int(np.isnat(expected).sum())
+
+
+def test_parse_aws_of_repeated_column():
+    rng = np.random.default_rng(0)
+    stamps = pd.date_range('2023-12-30', periods=24 * 90, freq='h').strftime(AWS_FORMAT)
+    values = pd.Series(rng.choice(np.append(stamps, ['bad', '']), 5000))
+    expected = pd.to_datetime(values, format=AWS_FORMAT, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    np.testing.assert_array_equal(parse_aws(values)[0], expected)
+
+
+@pytest.mark.parametrize('fmt', list(LAYOUTS))
+def test_decode_fixed_matches_strptime(fmt):
+    rng = np.random.default_rng(1)
+    stamps = pd.Timestamp('1950-01-01') + pd.to_timedelta(rng.integers(0, 150 * 525_600, 300), 'min')
+    text = np.append(stamps.strftime(fmt), ['00-01-2025 00:00'[:LAYOUTS[fmt][0]], 'x' * LAYOUTS[fmt][0]])
+    expected = []
+    for value in text:
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            expected.append(NAT)
+            continue
+        expected.append((parsed - datetime(1970, 1, 1)) // pd.Timedelta(minutes=1))
+    np.testing.assert_array_equal(decode_fixed(text, fmt), expected)
+
+
+def naive_date_hour(dates, hours):
+    """Row-by-row reference of the legacy date + hour schema (ISO or day-first dates)."""
+    result = []
+    for date, hour in zip(dates, hours):
+        day = pd.NaT
+        for fmt in ('%Y-%m-%d', '%d-%m-%Y'):
+            try:
+                day = pd.Timestamp(datetime.strptime(str(date), fmt))
+                break
+            except ValueError:
+                pass
+        try:
+            number = float(str(hour).split(':')[0].strip())
+        except ValueError:
+            number = np.nan
+        valid = 0 <= number <= 23 and number == int(number)
+        result.append(day + pd.Timedelta(hours=int(number)) if valid and day is not pd.NaT else pd.NaT)
+    return pd.to_datetime(pd.Series(result, dtype=object)).to_numpy(dtype='datetime64[ns]')
+
+
+# 'soon' matches no layout, so pandas tries (and fails) to infer one.
+@pytest.mark.filterwarnings('ignore:Could not infer format')
+def test_parse_date_hour_matches_naive():
+    dates = ['2025-07-01', '01-07-2025', '2025-07-01', '2024-02-29', '2025-02-29', 'soon', None, '2025-07-01',
+             '2025-07-01', '2025-07-01']
+    hours = [0, '23', '05:00', 12, 1, 2, 3, 24, 'x', np.nan]
+    datetimes, rejected = parse_date_hour(dates, hours)
+    expected = naive_date_hour(dates, hours)
+    np.testing.assert_array_equal(datetimes, expected)
+    assert rejected == int(np.isnat(expected).sum())